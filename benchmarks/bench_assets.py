@@ -0,0 +1,63 @@
+"""
+Writes the files of N small model directories (model.config, model.sdf and a mesh) and exports a
+world instancing N prototype models, once with the files written one after another in the calling
+thread and once through AssetWriter thread pools of different sizes. Reports time, files per second
+and MB/s. The gain grows with the latency of the filesystem, --dir can point at a network mount.
+
+    python benchmarks/bench_assets.py --count 2000 --threads 0 4 16 --dir /mnt/nfs/tmp
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from gazebo_world_gen.assets import AssetWriter
+from gazebo_world_gen.meshes import tetrahedron_mesh
+from gazebo_world_gen.models import model_config, model_sdf
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.world import World
+
+
+def write_models(directory, count, writer):
+    mesh = tetrahedron_mesh(1.0, 1.0, 1.0)
+    for i in range(count):
+        name = f"model_{i}"
+        parent = os.path.join(directory, name)
+        writer.save_mesh(mesh, os.path.join(parent, "meshes", f"{name}.stl"))
+        writer.write_text(os.path.join(parent, "model.config"), model_config(name))
+        writer.write_text(os.path.join(parent, "model.sdf"), model_sdf(name, f"{name}.stl"))
+    writer.wait()
+
+
+def export_instanced(directory, count, writer):
+    world = World(naming=CounterNaming())
+    world.asset_writer = writer
+    # Two instances of each of count distinct boxes
+    world.add_objects([Box(1 + i * 0.001, 1, 1, x=i, y=j) for i in range(count) for j in range(2)])
+    world.enable_instancing(os.path.join(directory, "models"))
+    world.save_gz_world(os.path.join(directory, "world.sdf"), stream=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=2000, help="model directories written")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0, 4, 16], help="writer threads, 0 writes in the calling thread")
+    parser.add_argument("--dir", help="directory to write in, a temporary one by default")
+    args = parser.parse_args()
+
+    for label, run in (("model directories", write_models), ("instanced world", export_instanced)):
+        for threads in args.threads:
+            with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+                start = time.perf_counter()
+                with AssetWriter(threads) as writer:
+                    run(tmp, args.count, writer)
+                elapsed = time.perf_counter() - start
+            stats = writer.stats()
+            print(f"{label:<18} {threads:>3} threads  {elapsed:6.2f} s  {stats['files'] / elapsed:8.0f} files/s  "
+                  f"{stats['bytes'] / 1e6 / elapsed:6.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Exports a world of N mesh shapes (ellipsoids, cones and pyramids) with their mesh collisions and
+with collision simplification at each tolerance, and prints the export time and the estimated
+collision cost before and after. Dimensions are drawn from --distinct values per class, since
+proxies are computed once per distinct set of dimensions.
+
+    python benchmarks/bench_collision.py --count 100000 --tolerances 0.01 0.05 0.2
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from gazebo_world_gen.collision import collision_proxies
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Cone, Ellipsoid, SquarePyramid
+from gazebo_world_gen.world import World
+
+
+def build(count, distinct, seed):
+    rng = np.random.default_rng(seed)
+    # Mostly round ellipsoids, like rocks and bushes
+    radii = np.round(rng.uniform(0.5, 1.5, distinct)[:, None] * rng.uniform(0.9, 1.1, (distinct, 3)), 3).tolist()
+    cones = np.round(rng.uniform(0.2, 2, (distinct, 2)), 3).tolist()
+    pyramids = np.round(rng.uniform(0.2, 2, (distinct, 3)), 3).tolist()
+    world = World(naming=CounterNaming())
+    shapes = []
+    for i, pick in enumerate(rng.integers(0, distinct, count).tolist()):
+        x, y = i % 500, i // 500
+        if i % 3 == 0:
+            shapes.append(Ellipsoid(*radii[pick], x=x, y=y))
+        elif i % 3 == 1:
+            shapes.append(Cone(*cones[pick], x=x, y=y))
+        else:
+            shapes.append(SquarePyramid(*pyramids[pick], x=x, y=y))
+    world.add_objects(shapes)
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=100, help="distinct dimensions per class")
+    parser.add_argument("--tolerances", type=float, nargs="+", default=[0.01, 0.05, 0.2])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    world = build(args.count, args.distinct, args.seed)
+    start = time.perf_counter()
+    world.get_gz_xml()
+    print(f"{'mesh collisions':<20} export {time.perf_counter() - start:6.2f} s")
+    for tolerance in args.tolerances:
+        collision_proxies.cache_clear()
+        simplifier = world.enable_collision_simplification(tolerance)
+        start = time.perf_counter()
+        world.get_gz_xml()
+        elapsed = time.perf_counter() - start
+        report = simplifier.report()
+        kinds = ", ".join(f"{n} {kind}" for kind, n in sorted(report["after"]["shapes"].items()))
+        print(f"tolerance {tolerance:<10} export {elapsed:6.2f} s  cost {report['before']['cost']:12,.0f} -> "
+              f"{report['after']['cost']:10,.0f} ({report['cost_ratio']:6.1%})  max error {report['max_error']:.3f}  {kinds}")
+
+
+if __name__ == "__main__":
+    main()
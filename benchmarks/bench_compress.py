@@ -0,0 +1,65 @@
+"""
+Saves a world of N shapes as plain and compact XML, uncompressed, gzip and zstd compressed, and
+compares write time, throughput in uncompressed MB/s, file size and the time to load each file back.
+zstd is skipped when the zstandard package is not installed.
+
+    python benchmarks/bench_compress.py --count 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cone, Sphere
+from gazebo_world_gen.world import World
+
+
+def build(count):
+    world = World(naming=CounterNaming())
+    for i in range(count):
+        shape_cls = (Box, Sphere, Cone)[i % 3]
+        dimensions = {Box: (1, 2, 3), Sphere: (0.5,), Cone: (1, 2)}[shape_cls]
+        world.add_object(shape_cls(*dimensions, x=i % 500, y=i // 500, yaw=0.1 * (i % 31)))
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--no-load", action="store_true", help="only measure writing")
+    args = parser.parse_args()
+
+    world = build(args.count)
+    xml_bytes = len(world.get_gz_xml().encode())
+    print(f"{args.count} shapes, {xml_bytes / 1e6:.1f} MB of XML")
+    try:
+        import zstandard  # noqa: F401
+        compressions = [None, "gzip", "zstd"]
+    except ImportError:
+        compressions = [None, "gzip"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for compact in (False, True):
+            for compression in compressions:
+                for level in ((None,) if compression is None else (1, None)):
+                    filename = os.path.join(tmp, "world.sdf")
+                    start = time.perf_counter()
+                    world.save_gz_world(filename, stream=True, compression=compression, compact=compact, level=level)
+                    elapsed = time.perf_counter() - start
+                    written = filename + {None: "", "gzip": ".gz", "zstd": ".zst"}[compression]
+                    size = os.path.getsize(written)
+                    label = f"{'compact' if compact else 'plain'} {compression or 'none'}" + (f" level {level}" if level else "")
+                    line = (f"{label:<24} write {elapsed:6.2f} s, {xml_bytes / 1e6 / elapsed:6.1f} MB/s, "
+                            f"{size / 1e6:7.2f} MB ({xml_bytes / size:5.1f}x)")
+                    if not args.no_load:
+                        start = time.perf_counter()
+                        World.load_gz_world(written)
+                        line += f", load {time.perf_counter() - start:.2f} s"
+                    print(line)
+                    os.remove(written)
+
+
+if __name__ == "__main__":
+    main()
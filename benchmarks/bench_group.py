@@ -0,0 +1,71 @@
+"""
+Moves a group of N boxes by changing the group's pose and computing the world poses of its members,
+and moves the same boxes one by one in a Python loop, then exports the group flattened and as a
+single model.
+
+    python benchmarks/bench_group.py --count 10000
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.geometry import rotation_matrix
+from gazebo_world_gen.group import ShapeGroup
+from gazebo_world_gen.shapes import Box
+
+
+def move_loop(shapes, pose):
+    # Turning and moving every shape by hand in plain Python, what a group replaces
+    rotation = rotation_matrix(*pose[3:])
+    for shape in shapes:
+        x, y, z = shape.x, shape.y, shape.z
+        shape.x = pose[0] + rotation[0][0] * x + rotation[0][1] * y + rotation[0][2] * z
+        shape.y = pose[1] + rotation[1][0] * x + rotation[1][1] * y + rotation[1][2] * z
+        shape.z = pose[2] + rotation[2][0] * x + rotation[2][1] * y + rotation[2][2] * z
+        local = rotation_matrix(shape.roll, shape.pitch, shape.yaw)
+        r = [[sum(rotation[i][k] * local[k][j] for k in range(3)) for j in range(3)] for i in range(3)]
+        shape.roll = math.atan2(r[2][1], r[2][2])
+        shape.pitch = math.asin(max(-1.0, min(1.0, -r[2][0])))
+        shape.yaw = math.atan2(r[1][0], r[0][0])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    poses = rng.uniform(-50, 50, (args.count, 6))
+    shapes = [Box(1, 1, 1, *pose) for pose in poses.tolist()]
+    group = ShapeGroup(shapes)
+    pose = (5, 2, 0, 0.1, 0.2, math.pi / 3)
+
+    start = time.perf_counter()
+    group.x, group.y, group.z, group.roll, group.pitch, group.yaw = pose
+    placed = group.leaf_poses()
+    grouped = time.perf_counter() - start
+    print(f"group: moved {len(placed)} shapes in {grouped * 1e3:.1f} ms")
+
+    batch_group = ShapeGroup([ShapeBatch(Box, np.ones((args.count, 3)), poses)], *pose)
+    start = time.perf_counter()
+    batch_group.leaf_poses()
+    print(f"group of a ShapeBatch: moved {args.count} shapes in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    start = time.perf_counter()
+    move_loop(shapes, pose)
+    loop = time.perf_counter() - start
+    print(f"loop: moved {len(shapes)} shapes in {loop * 1e3:.1f} ms, {loop / grouped:.0f}x slower")
+
+    for as_model in (False, True):
+        group.as_model = as_model
+        start = time.perf_counter()
+        size = sum(map(len, group.iter_gz_xml()))
+        print(f"export {'as one model' if as_model else 'flattened'}: {time.perf_counter() - start:.3f} s, {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
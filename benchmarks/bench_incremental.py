@@ -0,0 +1,51 @@
+"""
+Measures re-export time after editing a few objects, with and without World(cache_xml=True).
+
+    python benchmarks/bench_incremental.py --count 200000 --edits 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.world import World
+
+
+def build_world(count, cache_xml, rng):
+    world = World(naming=CounterNaming(), cache_xml=cache_xml)
+    for x, y in (np.round(rng.uniform(-100, 100, (count, 2)), 2)).tolist():
+        world.add_object(Box(width=1, height=1, depth=1, x=x, y=y, z=0.5))
+    return world
+
+
+def timed_export(world):
+    start = time.perf_counter()
+    world.get_gz_xml()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"shapes: {args.count}, edits per re-export: {args.edits}")
+    for cache_xml in (False, True):
+        rng = np.random.default_rng(args.seed)
+        world = build_world(args.count, cache_xml, rng)
+        first = timed_export(world)
+        objects = world.get_objects()
+        for i in rng.integers(0, len(objects), args.edits).tolist():
+            objects[i].yaw += 0.1
+        world.set_gravity((0, 0, -9.81))
+        second = timed_export(world)
+        print(f"  cache_xml={cache_xml!s:5s} first export {first:7.3f} s   re-export {second:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Exports N identical crates inline and with instancing, comparing file size, export time and the
+time to parse the world file. The parse time is measured with ElementTree, and with
+'gz sdf --check' as well when the gz tool is installed.
+
+    python benchmarks/bench_instancing.py --count 50000
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.world import World
+
+
+def build(count):
+    world = World()
+    for i in range(count):
+        world.add_object(Box(width=1, height=1, depth=1, x=i % 250, y=i // 250, z=0.5, color='0.6 0.4 0.2 1'))
+    return world
+
+
+def measure(label, world, filename):
+    start = time.perf_counter()
+    world.save_gz_world(filename, stream=True)
+    export = time.perf_counter() - start
+    start = time.perf_counter()
+    ET.parse(filename)
+    parse = time.perf_counter() - start
+    line = f"{label}: {os.path.getsize(filename) / 1e6:.1f} MB, export {export:.3f} s, ElementTree parse {parse:.3f} s"
+    if shutil.which("gz"):
+        start = time.perf_counter()
+        subprocess.run(["gz", "sdf", "--check", filename], capture_output=True)
+        line += f", gz sdf --check {time.perf_counter() - start:.3f} s"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world = build(args.count)
+        measure("inline", world, os.path.join(tmp, "inline.sdf"))
+        world.enable_instancing(os.path.join(tmp, "models"))
+        measure("instanced", world, os.path.join(tmp, "instanced.sdf"))
+        if not shutil.which("gz"):
+            print("gz not found, Gazebo's own parse time was not measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Saves a world of N shapes without instrumentation, with it and with it tracing memory, to show
+the overhead of each, and prints the report of the instrumented run.
+
+    python benchmarks/bench_instrumentation.py --count 100000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cone, Sphere
+from gazebo_world_gen.world import World
+
+
+def build(count):
+    world = World(naming=CounterNaming())
+    shapes = []
+    for i in range(count):
+        shape_cls = (Box, Sphere, Cone)[i % 3]
+        dimensions = {Box: (1, 2, 3), Sphere: (0.5,), Cone: (1, 2)}[shape_cls]
+        shapes.append(shape_cls(*dimensions, x=i % 500, y=i // 500, yaw=0.1 * (i % 31)))
+    world.add_objects(shapes)
+    return world, shapes
+
+
+def save(world, filename, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        world.save_gz_world(filename, stream=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    world, shapes = build(args.count)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "world.sdf")
+        print(f"{args.count} shapes")
+        print(f"disabled:         {save(world, filename, args.repeat):.2f} s")
+        instrumentation = world.enable_instrumentation()
+        print(f"enabled:          {save(world, filename, args.repeat):.2f} s")
+        report = instrumentation.report()
+        world.enable_instrumentation(trace_memory=True)
+        print(f"tracing memory:   {save(world, filename, 1):.2f} s")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Writes a world of N shapes and reads it back with World.load_gz_world and with a plain
+ElementTree parse of the whole file, comparing time and peak memory. Memory is traced in a
+second, slower pass so it doesn't distort the times.
+
+    python benchmarks/bench_load.py --count 100000
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cone, Sphere
+from gazebo_world_gen.world import World
+
+
+def build(count):
+    world = World(naming=CounterNaming())
+    for i in range(count):
+        shape_cls = (Box, Sphere, Cone)[i % 3]
+        dimensions = {Box: (1, 2, 3), Sphere: (0.5,), Cone: (1, 2)}[shape_cls]
+        world.add_object(shape_cls(*dimensions, x=i % 500, y=i // 500, yaw=0.1 * (i % 31)))
+    return world
+
+
+def peak(function):
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "world.sdf")
+        build(args.count).save_gz_world(filename, stream=True)
+        print(f"{args.count} shapes, {os.path.getsize(filename) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        world = World.load_gz_world(filename)
+        print(f"load_gz_world: {time.perf_counter() - start:.2f} s, {len(world.get_objects())} objects")
+        start = time.perf_counter()
+        ET.parse(filename)
+        print(f"ElementTree parse: {time.perf_counter() - start:.2f} s")
+        del world
+
+        print(f"load_gz_world peak: {peak(lambda: World.load_gz_world(filename)) / 1e6:.1f} MB, including the loaded shapes")
+        print(f"ElementTree parse peak: {peak(lambda: ET.parse(filename)) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Reports visual and collision triangle counts of a world of N ellipsoids for several level of
+detail settings. When the gz tool is installed, each world is also stepped headless in Gazebo
+and the wall time per step is reported. The models in gazebo_models must be on the resource path.
+
+    python benchmarks/bench_lod.py --count 1000 --iterations 1000
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from gazebo_world_gen.lod import assign_visual_lod, count_triangles
+from gazebo_world_gen.shapes import Ellipsoid
+from gazebo_world_gen.world import World
+
+CONFIGS = [
+    ("default mesh for both", None, None),
+    ("finest mesh for both", 0, None),
+    ("distance LOD, level 3 collision", "distance", 3),
+    ("distance LOD, primitive collision", "distance", "primitive"),
+]
+
+
+def build(count, visual_lod, collision, rng):
+    world = World()
+    side = int(np.ceil(np.sqrt(count)))
+    for i in range(count):
+        radii = rng.uniform(0.2, 0.5, 3).round(2).tolist()
+        shape = Ellipsoid(*radii, x=(i % side) * 1.5, y=(i // side) * 1.5, z=radii[2] + 2)
+        if visual_lod is not None and visual_lod != "distance":
+            shape.visual_lod = visual_lod
+        shape.collision = collision
+        world.add_object(shape)
+    if visual_lod == "distance":
+        assign_visual_lod(world.objects, (0, 0, 2), (5, 15, 30))
+    return world
+
+
+def step_time(filename, iterations):
+    start = time.perf_counter()
+    subprocess.run(["gz", "sim", "-s", "-r", "--iterations", str(iterations), filename], capture_output=True)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    has_gz = shutil.which("gz") is not None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, visual_lod, collision in CONFIGS:
+            world = build(args.count, visual_lod, collision, np.random.default_rng(0))
+            visual, collision_triangles = count_triangles(world.objects)
+            filename = os.path.join(tmp, "world.sdf")
+            world.save_gz_world(filename)
+            line = f"{label:>34}: {visual:>8} visual, {collision_triangles:>8} collision triangles"
+            if has_gz:
+                line += f", {step_time(filename, args.iterations) * 1e3:.3f} ms per step"
+            print(line)
+    if not has_gz:
+        print("gz not found, Gazebo step time was not measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares the memory used by a world of individual Shape objects with the same
+world stored as columnar ShapeBatch arrays.
+
+    python benchmarks/bench_memory.py --count 1000000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+import numpy as np
+
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.world import World
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    world = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return world, current
+
+
+def build_objects(poses, dimensions, colors):
+    world = World()
+    for pose, dims, color in zip(poses.tolist(), dimensions.tolist(), colors):
+        world.add_object(Box(*dims, *pose, color=color))
+    return world
+
+
+def build_batch(poses, dimensions, colors):
+    world = World()
+    world.add_object(ShapeBatch(Box, dimensions, poses, colors))
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    poses = rng.uniform(-100, 100, (args.count, 6))
+    dimensions = rng.uniform(0.1, 2, (args.count, 3))
+    rgba = rng.uniform(0, 1, (args.count, 4)).astype(np.float32)
+    color_strings = [' '.join(map(str, c)) for c in rgba.tolist()]
+
+    _, object_bytes = measure(lambda: build_objects(poses, dimensions, color_strings))
+    _, batch_bytes = measure(lambda: build_batch(poses, dimensions, rgba))
+
+    print(f"shapes:       {args.count}")
+    print(f"Shape objects: {object_bytes / 2**20:10.1f} MiB ({object_bytes / args.count:7.1f} B/shape)")
+    print(f"ShapeBatch:    {batch_bytes / 2**20:10.1f} MiB ({batch_bytes / args.count:7.1f} B/shape)")
+    print(f"ratio:         {object_bytes / batch_bytes:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
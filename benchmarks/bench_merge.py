@@ -0,0 +1,81 @@
+"""
+Exports N static shapes of a few colors as one model per shape, merged into one model per cell
+with a link per shape, and baked into one mesh per cell and color, comparing file size, the number
+of models, links and visuals, export time and the time to parse the world file. The parse time
+is measured with ElementTree, and with 'gz sdf --check' as well when the gz tool is installed.
+
+    python benchmarks/bench_merge.py --count 20000 --cell-size 20
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.shapes import Box, Cylinder
+from gazebo_world_gen.world import World
+
+COLORS = [(0.6, 0.4, 0.2, 1), (0.3, 0.3, 0.3, 1), (0.2, 0.5, 0.2, 1)]
+
+
+def build(count, seed=0):
+    rng = np.random.default_rng(seed)
+    world = World()
+    side = np.sqrt(count) * 2
+    for shape_cls, dims in ((Box, rng.uniform(0.5, 2, (count // 2, 3))), (Cylinder, rng.uniform(0.2, 1, (count - count // 2, 2)))):
+        poses = np.zeros((len(dims), 6))
+        poses[:, :2] = rng.uniform(0, side, (len(dims), 2))
+        poses[:, 5] = rng.uniform(0, np.pi, len(dims))
+        colors = np.array(COLORS)[rng.integers(len(COLORS), size=len(dims))]
+        world.add_object(ShapeBatch(shape_cls, dims, poses, colors))
+    return world
+
+
+def measure(label, world, filename, mesh_dir=None):
+    start = time.perf_counter()
+    world.save_gz_world(filename, stream=True)
+    export = time.perf_counter() - start
+    start = time.perf_counter()
+    root = ET.parse(filename).getroot()
+    parse = time.perf_counter() - start
+    counts = [len(list(root.iter(tag))) for tag in ("model", "link", "visual")]
+    size = os.path.getsize(filename)
+    meshes = sum(e.stat().st_size for e in os.scandir(mesh_dir)) if mesh_dir and os.path.isdir(mesh_dir) else 0
+    line = (f"{label}: {counts[0]} models, {counts[1]} links, {counts[2]} visuals, {size / 1e6:.1f} MB world"
+            f" + {meshes / 1e6:.1f} MB meshes, export {export:.3f} s, ElementTree parse {parse:.3f} s")
+    if shutil.which("gz"):
+        start = time.perf_counter()
+        subprocess.run(["gz", "sdf", "--check", filename], capture_output=True)
+        line += f", gz sdf --check {time.perf_counter() - start:.3f} s"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--cell-size", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world = build(args.count)
+        measure("one model per shape", world, os.path.join(tmp, "plain.sdf"))
+        world.enable_merging(args.cell_size, mode="links")
+        measure("merged links", world, os.path.join(tmp, "links.sdf"))
+        mesh_dir = os.path.join(tmp, "meshes")
+        world.enable_merging(args.cell_size, mode="mesh", mesh_dir=mesh_dir)
+        measure("merged meshes", world, os.path.join(tmp, "mesh.sdf"), mesh_dir)
+        mesh_dir = os.path.join(tmp, "stl")
+        world.enable_merging(args.cell_size, mode="mesh", mesh_dir=mesh_dir, extension=".stl")
+        measure("merged meshes as STL", world, os.path.join(tmp, "stl.sdf"), mesh_dir)
+        if not shutil.which("gz"):
+            print("gz not found, Gazebo's own load time was not measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Exports a world of N cones and ellipsoids drawn from a small set of sizes with a MeshCache, and
+compares it with writing one mesh file per shape. A second export shows the cost with a warm cache.
+
+    python benchmarks/bench_meshcache.py --count 10000 --sizes 50
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from gazebo_world_gen.meshcache import MeshCache
+from gazebo_world_gen.meshes import save_mesh
+from gazebo_world_gen.shapes import Cone, Ellipsoid, MeshShape
+from gazebo_world_gen.world import World
+
+
+def build(count, sizes, rng):
+    world = World()
+    radii = np.round(rng.uniform(0.2, 2.0, sizes), 2).tolist()
+    for i in range(count):
+        r = radii[rng.integers(sizes)]
+        shape = Cone(radius=r, height=2 * r) if i % 2 else Ellipsoid(r, r, r / 2)
+        shape.x, shape.y = i % 100, i // 100
+        world.add_object(shape)
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--sizes", type=int, default=50)
+    parser.add_argument("--extension", default=".dae")
+    parser.add_argument("--naive-count", type=int, default=500, help="shapes written one file each for comparison")
+    args = parser.parse_args()
+    world = build(args.count, args.sizes, np.random.default_rng(0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        MeshShape.mesh_cache = cache = MeshCache(os.path.join(tmp, "cache"), extension=args.extension)
+        for label in ("cold cache", "warm cache"):
+            start = time.perf_counter()
+            world.save_gz_world(os.path.join(tmp, "world.sdf"), stream=True)
+            print(f"{label}: {args.count} shapes in {time.perf_counter() - start:.3f} s, "
+                  f"{cache.misses} meshes generated, {cache.hits} reused, {cache.total_bytes / 1e6:.1f} MB")
+
+        shapes = world.get_objects()[:args.naive_count]
+        start = time.perf_counter()
+        for i, shape in enumerate(shapes):
+            dimensions = [getattr(shape, d) for d in shape.dimension_names]
+            save_mesh(shape.build_mesh(*dimensions), os.path.join(tmp, f"naive_{i}{args.extension}"))
+        elapsed = time.perf_counter() - start
+        print(f"one mesh per shape: {len(shapes)} shapes in {elapsed:.3f} s, "
+              f"about {elapsed * args.count / len(shapes):.1f} s for {args.count}")
+        del MeshShape.mesh_cache
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Builds ellipsoids at 32x16 through 512x256 tessellations with the nested loop of the original
+generate_models.py and with the vectorized builder, then writes them as STL, OBJ and DAE, and
+as DAE through trimesh when it is installed, reporting time and file size of each.
+
+    python benchmarks/bench_meshes.py
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from gazebo_world_gen.meshes import ellipsoid_mesh, save_mesh
+
+RESOLUTIONS = [(32, 16), (64, 32), (128, 64), (256, 128), (512, 256)]
+
+
+def loop_ellipsoid(segments, rings):
+    # The face loop generate_models.py used before the builders were vectorized
+    u = np.linspace(0, 2 * np.pi, segments)
+    v = np.linspace(0, np.pi, rings)
+    x = np.outer(np.cos(u), np.sin(v))
+    y = np.outer(np.sin(u), np.sin(v))
+    z = np.outer(np.ones(np.size(u)), np.cos(v))
+    vertices = np.stack((x.flatten(), y.flatten(), z.flatten()), axis=-1)
+    faces = []
+    for i in range(len(u) - 1):
+        for j in range(len(v) - 1):
+            idx = lambda i, j: i * len(v) + j
+            faces.append([idx(i, j), idx(i + 1, j), idx(i + 1, j + 1)])
+            faces.append([idx(i, j), idx(i + 1, j + 1), idx(i, j + 1)])
+    return vertices, np.array(faces)
+
+
+def timed(function, *args, repeat=3, **kwargs):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def trimesh_dae(mesh, filename):
+    import trimesh
+    trimesh.Trimesh(vertices=mesh[0], faces=mesh[1], process=False).export(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-trimesh", action="store_true", help="skip the trimesh DAE export")
+    parser.add_argument("--trimesh-max-faces", type=int, default=70000,
+                        help="skip the trimesh DAE export for larger meshes, it gets very slow without scipy")
+    args = parser.parse_args()
+    use_trimesh = not args.no_trimesh
+    if use_trimesh:
+        try:
+            import trimesh  # noqa: F401
+            # trimesh logs a traceback per export when scipy is missing
+            logging.disable(logging.WARNING)
+        except ImportError:
+            use_trimesh = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for segments, rings in RESOLUTIONS:
+            loop, _ = timed(loop_ellipsoid, segments, rings)
+            vectorized, mesh = timed(ellipsoid_mesh, segments=segments, rings=rings)
+            welded, welded_mesh = timed(ellipsoid_mesh, segments=segments, rings=rings, weld_poles=True)
+            print(f"{segments}x{rings}: {len(mesh[1])} faces, loop {loop * 1e3:.2f} ms, vectorized {vectorized * 1e3:.2f} ms, "
+                  f"welded {welded * 1e3:.2f} ms ({len(welded_mesh[0])} vertices instead of {len(mesh[0])})")
+            writers = [(ext, save_mesh) for ext in (".stl", ".obj", ".dae")]
+            writers.append((".smooth.dae", lambda mesh, filename: save_mesh(mesh, filename, smooth=True)))
+            if use_trimesh and len(welded_mesh[1]) <= args.trimesh_max_faces:
+                writers.append((".trimesh.dae", trimesh_dae))
+            for ext, writer in writers:
+                filename = os.path.join(tmp, f"ellipsoid{ext}")
+                elapsed, _ = timed(writer, welded_mesh, filename, repeat=1)
+                print(f"    {ext[1:]:>11}: {elapsed * 1e3:8.1f} ms, {os.path.getsize(filename) / 1e3:9.1f} kB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Measures the shape construction rate, including naming, for each naming strategy.
+
+    python benchmarks/bench_naming.py --count 200000
+"""
+
+import argparse
+import time
+
+from gazebo_world_gen.naming import CounterNaming, HashNaming, UUIDNaming
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.world import World
+
+
+def construct(count, naming):
+    world = World(naming=naming)
+    for i in range(count):
+        box = Box(width=1, height=1, depth=1, x=i)
+        world.add_object(box)
+        box.name
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"shapes: {args.count}")
+    for label, naming in (("uuid4 (legacy)", UUIDNaming()), ("counter", CounterNaming()), ("hash", HashNaming())):
+        start = time.perf_counter()
+        construct(args.count, naming)
+        seconds = time.perf_counter() - start
+        print(f"  {label:16s} {seconds:8.3f} s {args.count / seconds:12,.0f} shapes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measures how save_gz_world throughput scales with the number of worker processes,
+and checks that every parallel export is identical to the serial one.
+
+    python benchmarks/bench_parallel.py --count 200000 --workers 1 2 4 8
+"""
+
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cylinder
+from gazebo_world_gen.world import World
+
+
+def build_world(count, seed):
+    rng = np.random.default_rng(seed)
+    world = World(naming=CounterNaming())
+    positions = (np.round(rng.uniform(-500, 500, (count, 2)) * 10) / 10).tolist()
+    for i, (x, y) in enumerate(positions):
+        if i % 4:
+            world.add_object(Box(width=4, height=4, depth=12, x=x, y=y, z=6))
+        else:
+            world.add_object(Cylinder(radius=0.2, length=5, x=x, y=y, z=2.5))
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    world = build_world(args.count, args.seed)
+    print(f"shapes: {args.count}, cpus: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = os.path.join(tmp, "serial.sdf")
+        start = time.perf_counter()
+        world.save_gz_world(reference, stream=True)
+        serial_time = time.perf_counter() - start
+        print(f"  {'serial':10s} {serial_time:8.3f} s {args.count / serial_time:12,.0f} shapes/s   1.0x")
+        for workers in args.workers:
+            filename = os.path.join(tmp, f"workers_{workers}.sdf")
+            start = time.perf_counter()
+            world.save_gz_world(filename, workers=workers)
+            seconds = time.perf_counter() - start
+            assert filecmp.cmp(reference, filename, shallow=False), f"output of {workers} workers differs"
+            print(f"  {f'{workers} workers':10s} {seconds:8.3f} s {args.count / seconds:12,.0f} shapes/s {serial_time / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
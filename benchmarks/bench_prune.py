@@ -0,0 +1,52 @@
+"""
+Measures a prune-heavy workload: removing and looking up objects by name in a large world,
+comparing World's indexed object store with the previous list based storage.
+
+    python benchmarks/bench_prune.py --count 500000 --prune 5000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.world import World
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500_000)
+    parser.add_argument("--prune", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    world = World(naming=CounterNaming())
+    world.add_objects(Box(width=1, height=1, depth=1, x=i) for i in range(args.count))
+    shapes = world.get_objects()
+    picks = np.random.default_rng(args.seed).choice(args.count, args.prune, replace=False).tolist()
+    names = [shapes[i].name for i in picks]
+
+    legacy = list(shapes)
+    legacy_lookup = timed(lambda: [next(s for s in legacy if s.name == name) for name in names[:100]]) * len(names) / 100
+    legacy_remove = timed(lambda: [legacy.remove(shapes[i]) for i in picks])
+
+    lookup = timed(lambda: [world.get_object(name) for name in names])
+    remove = timed(lambda: world.remove_objects(shapes[i] for i in picks))
+    assert len(world.get_objects()) == len(legacy)
+
+    print(f"objects: {args.count}, pruned: {args.prune}")
+    print(f"  {'':12s} {'list':>10s} {'ObjectStore':>12s}")
+    print(f"  {'lookup':12s} {legacy_lookup:9.3f}s {lookup:11.3f}s   (list lookup extrapolated from 100 names)")
+    print(f"  {'remove':12s} {legacy_remove:9.3f}s {remove:11.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures SDF export throughput of per-object Shape.get_gz_xml rendering against the
+compiled-template batch renderer used by ShapeBatch.
+
+Two workloads are generated: "snapped" places boxes on a 5 cm grid with a handful of crate
+sizes, yaw in 15 degree steps and a small color palette, like most procedural worlds.
+"random" draws every value as a full precision float, which is the worst case because float
+to text conversion then dominates and there are no repeated values to share. The output must
+match Shape.get_gz_xml exactly, so every value still goes through float.__repr__, the
+"column formatting" line shows that share of the batch time and bounds the possible speedup.
+
+    python benchmarks/bench_render.py --count 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.render import CHUNK_SIZE
+from gazebo_world_gen.shapes import Box
+
+PALETTE = ['1 0 0 1', '0 1 0 1', '0 0 1 1', '0.5 0.5 0.5 1.0']
+
+
+def make_columns(workload, count, rng):
+    if workload == "random":
+        poses = rng.uniform(-100, 100, (count, 6))
+        dimensions = rng.uniform(0.1, 2, (count, 3))
+    else:
+        poses = np.zeros((count, 6))
+        poses[:, :2] = np.round(rng.uniform(-100, 100, (count, 2)) * 20) / 20
+        poses[:, 5] = np.radians(15 * rng.integers(0, 24, count)).round(4)
+        sizes = np.array([[1, 1, 1], [0.5, 0.5, 0.5], [2, 1, 1], [1.2, 0.8, 0.6]])
+        dimensions = sizes[rng.integers(0, len(sizes), count)]
+        poses[:, 2] = dimensions[:, 2] / 2
+    colors = [PALETTE[i] for i in rng.integers(0, len(PALETTE), count).tolist()]
+    return poses, dimensions, colors
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(workload, count, seed):
+    poses, dimensions, colors = make_columns(workload, count, np.random.default_rng(seed))
+    shapes = [Box(*dims, *pose, color=color) for pose, dims, color in zip(poses.tolist(), dimensions.tolist(), colors)]
+    batch = ShapeBatch.from_shapes(shapes)
+
+    rows = list(batch)
+    _, baseline_time = timed(lambda: [shape.get_gz_xml() for shape in shapes])
+    expected, rows_time = timed(lambda: [shape.get_gz_xml() for shape in rows])
+    rendered, batch_time = timed(lambda: list(batch.iter_gz_xml()))
+    assert rendered == expected
+    _, columns_time = timed(lambda: [batch.iter_columns(start, start + CHUNK_SIZE) for start in range(0, count, CHUNK_SIZE)])
+
+    print(f"workload: {workload}, shapes: {count}")
+    for label, seconds in (("Shape.get_gz_xml", baseline_time), ("ShapeBatch rows", rows_time), ("ShapeBatch.iter_gz_xml", batch_time)):
+        print(f"  {label:24s} {seconds:8.3f} s {count / seconds:12,.0f} shapes/s {baseline_time / seconds:6.1f}x")
+    print(f"  {'column formatting':24s} {columns_time:8.3f} s {columns_time / batch_time:12.0%} of the batch time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workload", choices=["snapped", "random", "all"], default="all")
+    args = parser.parse_args()
+
+    for workload in (["snapped", "random"] if args.workload == "all" else [args.workload]):
+        run(workload, args.count, args.seed)
+
+
+if __name__ == "__main__":
+    main()
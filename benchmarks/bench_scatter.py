@@ -0,0 +1,63 @@
+"""
+Scatters N boxes with random yaw over a square region with World.scatter and compares the time
+against rejection sampling with the SpatialIndex (see bench_spatial.py) for a smaller count.
+
+    python benchmarks/bench_scatter.py --count 100000
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from gazebo_world_gen.scatter import poisson_disk_sample
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.world import World
+
+
+def factory(rng):
+    return Box(width=0.6, height=0.4, depth=1, z=0.5, yaw=rng.uniform(0, math.pi))
+
+
+def rejection(count, side, rng):
+    world = World()
+    index = world.enable_spatial_index(cell_size=1.0)
+    placed = 0
+    while placed < count:
+        box = factory(rng)
+        box.x, box.y = rng.uniform(0, side, 2)
+        if not index.would_overlap(box):
+            world.add_object(box)
+            placed += 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--spacing", type=float, default=0.1)
+    parser.add_argument("--rejection-count", type=int, default=10000)
+    args = parser.parse_args()
+
+    # Region sized so that count boxes fit with some room to spare
+    side = math.sqrt(args.count) * 1.6
+
+    start = time.perf_counter()
+    points = poisson_disk_sample((0, 0, side, side), 1.0, np.random.default_rng(0))
+    print(f"maximal poisson_disk_sample: {len(points)} points in {time.perf_counter() - start:.3f} s")
+
+    world = World()
+    start = time.perf_counter()
+    result = world.scatter(factory, (0, 0, side, side), args.count, min_spacing=args.spacing, seed=0)
+    elapsed = time.perf_counter() - start
+    print(f"World.scatter: {result.placed}/{result.requested} boxes in {elapsed:.3f} s, "
+          f"density {result.density:.3f} per m^2, spacing {result.spacing:.3f} m")
+
+    count = args.rejection_count
+    start = time.perf_counter()
+    rejection(count, math.sqrt(count) * 1.2, np.random.default_rng(0))
+    print(f"rejection sampling: {count} boxes in {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
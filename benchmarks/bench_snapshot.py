@@ -0,0 +1,73 @@
+"""
+Saves a world of N Shape objects, and the same shapes as one ShapeBatch, as a snapshot and as a
+pickle, then opens the snapshot, reads one column and loads the whole world back from each.
+
+    python benchmarks/bench_snapshot.py --count 1000000
+"""
+
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.snapshot import open_snapshot
+from gazebo_world_gen.world import World
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def run(label, world, tmp):
+    snapshot = os.path.join(tmp, f"{label}.snap")
+    pickled = os.path.join(tmp, f"{label}.pickle")
+    save, _ = timed(lambda: world.save_snapshot(snapshot))
+    opened, snap = timed(lambda: open_snapshot(snapshot))
+    column, _ = timed(lambda: float((snap.tables[0].poses if snap.tables else snap.batch(0).poses)[:, 2].max()))
+    load, _ = timed(lambda: World.load_snapshot(snapshot))
+    print(f"{label} snapshot: {os.path.getsize(snapshot) / 1e6:.1f} MB, save {save:.2f} s, open {opened * 1e3:.2f} ms, "
+          f"one column {column * 1e3:.1f} ms, full load {load:.2f} s")
+
+    def dump():
+        with open(pickled, "wb") as f:
+            pickle.dump(world, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def read():
+        with open(pickled, "rb") as f:
+            return pickle.load(f)
+
+    save, _ = timed(dump)
+    load, _ = timed(read)
+    print(f"{label} pickle:   {os.path.getsize(pickled) / 1e6:.1f} MB, save {save:.2f} s, load {load:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    poses = rng.uniform(-100, 100, (args.count, 6))
+    dimensions = rng.uniform(0.1, 2, (args.count, 3))
+    world = World(naming=CounterNaming())
+    world.add_objects(Box(*d, *p, color='0.5 0.5 0.5 1') for d, p in zip(dimensions.tolist(), poses.tolist()))
+    for shape in world.objects:
+        shape.name
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run("shapes", world, tmp)
+        batch_world = World(naming=CounterNaming())
+        batch_world.add_object(ShapeBatch(Box, dimensions, poses, colors='0.5 0.5 0.5 1'))
+        run("batch", batch_world, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Places N non-overlapping boxes by rejection sampling, checking candidates either with a linear
+scan over the world objects or with World's SpatialIndex.
+
+    python benchmarks/bench_spatial.py --count 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from gazebo_world_gen.shapes import Box
+from gazebo_world_gen.world import World
+
+
+def overlaps(a, b):
+    return all(lo_a < hi_b and lo_b < hi_a for lo_a, hi_a, lo_b, hi_b in zip(*a, *b))
+
+
+def place(count, side, rng, use_index):
+    world = World()
+    index = world.enable_spatial_index(cell_size=1.0) if use_index else None
+    boxes = []
+    attempts = 0
+    while len(boxes) < count:
+        attempts += 1
+        x, y, yaw = rng.uniform(0, side), rng.uniform(0, side), rng.uniform(0, np.pi)
+        box = Box(width=0.6, height=0.4, depth=1, x=x, y=y, z=0.5, yaw=yaw)
+        if use_index:
+            if index.would_overlap(box):
+                continue
+        else:
+            bounds = box.get_aabb()
+            if any(overlaps(bounds, other) for other in boxes):
+                continue
+        world.add_object(box)
+        boxes.append(box.get_aabb())
+    return attempts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--density", type=float, default=0.1, help="boxes per square meter")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"boxes: {args.count}, density: {args.density}/m^2")
+    for count in sorted({args.count // 8, args.count // 4, args.count // 2, args.count}):
+        side = float(np.sqrt(count / args.density))
+        row = [f"  n={count:<8d}"]
+        for use_index in (False, True):
+            if not use_index and count > 20_000:
+                row.append(f"{'scan':>6s}   skipped")
+                continue
+            start = time.perf_counter()
+            place(count, side, np.random.default_rng(args.seed), use_index)
+            row.append(f"{'index' if use_index else 'scan':>6s} {time.perf_counter() - start:8.3f}s")
+        print(" ".join(row))
+
+
+if __name__ == "__main__":
+    main()
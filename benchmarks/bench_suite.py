@@ -0,0 +1,274 @@
+"""
+Benchmark suite for the hot paths: shape construction and naming, adding to and removing from a
+world, get_gz_xml and save_gz_world of Shape objects and of a ShapeBatch, loading a world back,
+and building the models of gazebo_world_gen.models. Every case runs on synthetic worlds
+of each of the given sizes, from the same seed, and keeps the best of --repeat runs.
+
+Results are written as JSON with --output. With --compare the run is compared with an earlier
+results file, case by case, and the script exits with status 1 if any case got slower than
+--threshold allows, so it can guard the hot paths in CI.
+
+    python benchmarks/bench_suite.py --sizes 1000 10000 100000 --output results.json
+    python benchmarks/bench_suite.py --sizes 1000 10000 100000 --compare results.json
+    python benchmarks/bench_suite.py --sizes 1000000 --only export_objects save_stream --memory
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from gazebo_world_gen.batch import ShapeBatch, parse_color
+from gazebo_world_gen.models import DEFAULT_MODELS, generate_models
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cone, Cylinder, Sphere
+from gazebo_world_gen.world import World
+
+SHAPE_CLASSES = (Box, Sphere, Cylinder, Cone)
+PALETTE = ['1 0 0 1', '0 1 0 1', '0 0 1 1', '0.5 0.5 0.5 1.0']
+# Objects removed by the remove_object case, whatever the size of the world
+REMOVALS = 1000
+
+
+def synthetic_columns(size, seed):
+    """
+    Poses, class indices, dimensions and colors of a synthetic world: shapes on a 5 cm grid with yaw
+    in 15 degree steps, like most procedural worlds.
+    """
+    rng = np.random.default_rng(seed)
+    poses = np.zeros((size, 6))
+    poses[:, :2] = np.round(rng.uniform(-500, 500, (size, 2)) * 20) / 20
+    poses[:, 5] = np.radians(15 * rng.integers(0, 24, size)).round(4)
+    kinds = rng.integers(0, len(SHAPE_CLASSES), size)
+    dimensions = np.round(rng.uniform(0.2, 2, (size, 3)), 2)
+    colors = [PALETTE[i] for i in rng.integers(0, len(PALETTE), size).tolist()]
+    return poses, kinds, dimensions, colors
+
+
+def make_shapes(columns):
+    poses, kinds, dimensions, colors = columns
+    shapes = []
+    for pose, kind, dims, color in zip(poses.tolist(), kinds.tolist(), dimensions.tolist(), colors):
+        shape_cls = SHAPE_CLASSES[kind]
+        shapes.append(shape_cls(*dims[:len(shape_cls.dimension_names)], *pose, color=color))
+    return shapes
+
+
+def make_world(columns):
+    world = World("bench", naming=CounterNaming())
+    world.add_objects(make_shapes(columns))
+    return world
+
+
+def make_batch_world(columns):
+    poses, _, dimensions, colors = columns
+    world = World("bench", naming=CounterNaming())
+    rgba = [parse_color(color) for color in colors]
+    world.add_object(ShapeBatch(Box, dimensions, poses, rgba, name="boxes"))
+    return world
+
+
+# Each case takes the columns of the synthetic world and a temporary directory, prepares what it
+# needs and returns (function to time, number of items it handles, unit of the items).
+
+def case_construct(columns, tmp):
+    return lambda: make_shapes(columns), len(columns[0]), "shapes"
+
+
+def case_naming(columns, tmp):
+    # Default names are uuid4 based and generated on first access
+    def run():
+        for shape in make_shapes(columns):
+            shape.name
+    return run, len(columns[0]), "shapes"
+
+
+def case_add(columns, tmp):
+    shapes = make_shapes(columns)
+
+    def run():
+        for shape in shapes:
+            shape._name = None
+        World(naming=CounterNaming()).add_objects(shapes)
+    return run, len(shapes), "shapes"
+
+
+def case_remove(columns, tmp):
+    world = make_world(columns)
+    removed = list(world.objects)[::max(1, len(columns[0]) // REMOVALS)][:REMOVALS]
+
+    def run():
+        world.remove_objects(removed)
+        world.add_objects(removed)
+    return run, len(removed), "removals"
+
+
+def case_export_objects(columns, tmp):
+    world = make_world(columns)
+    return world.get_gz_xml, len(columns[0]), "models"
+
+
+def case_export_batch(columns, tmp):
+    world = make_batch_world(columns)
+    return world.get_gz_xml, len(columns[0]), "models"
+
+
+def case_save_stream(columns, tmp):
+    world = make_world(columns)
+    return lambda: world.save_gz_world(os.path.join(tmp, "stream.sdf"), stream=True), len(columns[0]), "models"
+
+
+def case_save_gzip(columns, tmp):
+    world = make_world(columns)
+    return lambda: world.save_gz_world(os.path.join(tmp, "world.sdf.gz"), level=1), len(columns[0]), "models"
+
+
+def case_load(columns, tmp):
+    filename = os.path.join(tmp, "load.sdf")
+    make_world(columns).save_gz_world(filename, stream=True)
+    return lambda: World.load_gz_world(filename), len(columns[0]), "models"
+
+
+def case_model_meshes(columns, tmp):
+    # All models of gazebo_world_gen.models built and written, independent of the world size
+    return lambda: generate_models(tmp, force=True), len(DEFAULT_MODELS), "models"
+
+
+def case_models_up_to_date(columns, tmp):
+    generate_models(tmp)
+    return lambda: generate_models(tmp), len(DEFAULT_MODELS), "models"
+
+
+CASES = {
+    "construct": case_construct,
+    "naming": case_naming,
+    "add": case_add,
+    "remove": case_remove,
+    "export_objects": case_export_objects,
+    "export_batch": case_export_batch,
+    "save_stream": case_save_stream,
+    "save_gzip": case_save_gzip,
+    "load": case_load,
+    "model_meshes": case_model_meshes,
+    "models_up_to_date": case_models_up_to_date,
+}
+# Cases whose work does not depend on the size of the world, run once at the smallest size
+SIZE_INDEPENDENT = {"model_meshes", "models_up_to_date"}
+
+
+def best_time(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def traced_peak(function):
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run_suite(names, sizes, repeat, seed, memory):
+    results = []
+    for size in sizes:
+        columns = synthetic_columns(size, seed)
+        for name in names:
+            if name in SIZE_INDEPENDENT and size != min(sizes):
+                continue
+            with tempfile.TemporaryDirectory() as tmp:
+                function, items, unit = CASES[name](columns, tmp)
+                seconds = best_time(function, repeat)
+                result = {"case": name, "size": size, "seconds": seconds, "items": items, "unit": unit,
+                          "rate": items / seconds if seconds else None}
+                if memory:
+                    result["peak_bytes"] = traced_peak(function)
+            results.append(result)
+            line = f"{name:<18} {size:>9}  {seconds:9.4f} s  {result['rate']:14,.0f} {unit}/s"
+            if memory:
+                line += f"  {result['peak_bytes'] / 1e6:9.1f} MB peak"
+            print(line, flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the time, and the peak memory where both runs traced it, of each case relative to
+    baseline and returns the cases where either grew by more than threshold, as a fraction of the
+    baseline value.
+    """
+    previous = {(r["case"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<18} {'size':>9}  {'baseline':>10}  {'now':>10}  change")
+    for result in results:
+        before = previous.get((result["case"], result["size"]))
+        if before is None:
+            continue
+        change = result["seconds"] / before["seconds"] - 1
+        line = f"{result['case']:<18} {result['size']:>9}  {before['seconds']:9.4f}s  {result['seconds']:9.4f}s  {change:+7.1%}"
+        regressed = change > threshold
+        if before.get("peak_bytes") and result.get("peak_bytes"):
+            memory_change = result["peak_bytes"] / before["peak_bytes"] - 1
+            line += f"  memory {memory_change:+7.1%}"
+            regressed = regressed or memory_change > threshold
+        if regressed:
+            regressions.append(result)
+            line += "  REGRESSION"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="run only these cases")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="also trace the peak memory of each case, in an extra slower run")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown counted as a regression, default 0.2 for 20%%")
+    args = parser.parse_args()
+
+    names = args.only or list(CASES)
+    results = run_suite(names, sorted(args.sizes), args.repeat, args.seed, args.memory)
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "sizes": sorted(args.sizes),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) worse than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Writes a memory mapped N x N float32 height array, exports it as one heightmap and as tiles, and
+times 1M height_at queries. Peak Python memory (tracemalloc, which includes NumPy buffers) shows
+that the array is never loaded as a whole.
+
+    python benchmarks/bench_terrain.py --size 8193 --tile-size 1025
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from gazebo_world_gen.terrain import ROW_BLOCK, Heightmap
+
+
+def make_heights(path, size):
+    heights = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(size, size))
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 8 * np.pi, size, dtype=np.float32)
+    for start in range(0, size, ROW_BLOCK):
+        y = x[start:start + ROW_BLOCK, None]
+        # Rolling hills with some surface noise, which is what decides the PNG size
+        noise = rng.normal(0, 0.05, (len(y), size)).astype(np.float32)
+        heights[start:start + ROW_BLOCK] = 20 * np.sin(x)[None, :] * np.cos(y) + y + noise
+    heights.flush()
+    del heights
+
+
+def export(label, terrain):
+    tracemalloc.start()
+    start = time.perf_counter()
+    xml = terrain.get_gz_xml()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = sum(os.path.getsize(terrain.image_path(t)) for t in terrain.tiles())
+    print(f"{label}: {len(terrain.tiles())} models in {elapsed:.2f} s, {size / 1e6:.1f} MB of images, "
+          f"{len(xml) / 1e3:.1f} kB of SDF, peak {peak / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=4097)
+    parser.add_argument("--tile-size", type=int, default=1025)
+    parser.add_argument("--queries", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "heights.npy")
+        make_heights(path, args.size)
+        print(f"{args.size} x {args.size} heights, {os.path.getsize(path) / 1e6:.0f} MB on disk")
+
+        export("single heightmap", Heightmap(path, image_dir=os.path.join(tmp, "single")))
+        terrain = Heightmap(path, image_dir=os.path.join(tmp, "tiles"), tile_size=args.tile_size)
+        export(f"{args.tile_size} tiles", terrain)
+
+        rng = np.random.default_rng(0)
+        half = (args.size - 1) / 2
+        x, y = rng.uniform(-half, half, (2, args.queries))
+        start = time.perf_counter()
+        terrain.height_at(x, y)
+        print(f"height_at: {args.queries} points in {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Threads writing files at the same time. Writes mostly wait on the disk or the network, so more
+# threads than cores pay off on network filesystems.
+DEFAULT_WORKERS = 8
+
+
+def temporary_path(path: str) -> str:
+    """
+    A hidden, unique name next to path that keeps its file name at the end, so writers that pick
+    the format from the extension still do.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{os.urandom(6).hex()}.{name}")
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    Yields a temporary path to write instead of path, and renames it to path once the block
+    completes, so readers see either the old file or the complete new one. The temporary file is
+    removed if the block raises.
+    """
+    tmp = temporary_path(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _read(path: str, mode: str) -> Any:
+    try:
+        with open(path, mode) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class AssetWriter:
+    """
+    Writes files from a pool of threads, so many small files such as model directories and meshes
+    don't wait for each other on slow or network filesystems. Each file is written to a temporary
+    name and renamed when complete, and parent directories are created as needed. With workers=0
+    files are written right away in the calling thread, which raises any error.
+
+    The write methods return futures, wait() blocks until everything submitted so far is written
+    and raises the first error. stats() reports the number of files, bytes and throughput.
+
+    A copy of the writer in another process, forked or unpickled, writes in the calling thread, so
+    the files of a worker process are complete when its work is returned.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, atomic: bool = True):
+        self.workers = workers
+        self.atomic = atomic
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        self.files = 0
+        self.skipped = 0
+        self.bytes = 0
+        # Sum of the time spent in each write, and the time from the first write to the last
+        self.write_seconds = 0.0
+        self._first: Optional[float] = None
+        self._last: Optional[float] = None
+        self._pid = os.getpid()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_pool"], state["_pending"], state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._pool, self._pending, self._lock = None, [], threading.Lock()
+
+    def _in_other_process(self) -> bool:
+        if self._pid == os.getpid():
+            return False
+        # The pool's threads and the lock's state don't carry over to a forked or unpickled copy
+        self._pool, self._pending, self._lock = None, [], threading.Lock()
+        self._pid, self.workers = os.getpid(), 0
+        return True
+
+    def submit(self, path: str, write: Callable[[str], None]) -> Future:
+        """
+        Writes a file by calling write with the path to write to, a temporary one when atomic.
+        """
+        return self._schedule(self._write, path, write)
+
+    def submit_unless(self, path: str, unchanged: Callable[[], bool], write: Callable[[str], None]) -> Future:
+        """
+        Like submit, but skips the write if unchanged() returns True when the file's turn comes.
+        """
+        def task() -> str:
+            if unchanged():
+                with self._lock:
+                    self.skipped += 1
+                return path
+            return self._write(path, write)
+
+        return self._schedule(task)
+
+    def _schedule(self, task: Callable[..., str], *args: Any) -> Future:
+        if self.workers <= 0 or self._in_other_process():
+            future: Future = Future()
+            future.set_result(task(*args))
+            return future
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="asset-writer")
+            future = self._pool.submit(task, *args)
+            self._pending.append(future)
+        return future
+
+    def _write(self, path: str, write: Callable[[str], None]) -> str:
+        start = time.perf_counter()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.atomic:
+            with atomic_path(path) as tmp:
+                write(tmp)
+        else:
+            write(path)
+        size = os.path.getsize(path)
+        end = time.perf_counter()
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            self.write_seconds += end - start
+            self._first = start if self._first is None else min(self._first, start)
+            self._last = end if self._last is None else max(self._last, end)
+        return path
+
+    def write_text(self, path: str, text: str, only_if_changed: bool = False) -> Future:
+        """
+        Writes text to path. With only_if_changed a file that already has this content is left
+        alone, keeping its modification time for tools that cache by it.
+        """
+        return self.write_bytes(path, text.encode(), only_if_changed)
+
+    def write_bytes(self, path: str, data: bytes, only_if_changed: bool = False) -> Future:
+        def write(target: str) -> None:
+            with open(target, "wb") as f:
+                f.write(data)
+
+        if only_if_changed:
+            return self.submit_unless(path, lambda: _read(path, "rb") == data, write)
+        return self.submit(path, write)
+
+    def save_mesh(self, mesh: Any, path: str, **options: Any) -> Future:
+        """
+        Writes a mesh with meshes.save_mesh, in the format of the file extension.
+        """
+        from .meshes import save_mesh
+
+        return self.submit(path, lambda target: save_mesh(mesh, target, **options))
+
+    def wait(self) -> None:
+        """
+        Waits for all files submitted so far, raising the first error after all of them are done.
+        """
+        if self._pid != os.getpid():
+            return
+        error = None
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                break
+            for future in pending:
+                exception = future.exception()
+                if exception is not None and error is None:
+                    error = exception
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self) -> "AssetWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def add_stats(self, stats: Dict[str, Any]) -> None:
+        """
+        Adds the files, bytes and write time in the stats() of another writer, e.g. one of a worker process.
+        """
+        with self._lock:
+            self.files += stats["files"]
+            self.skipped += stats["skipped"]
+            self.bytes += stats["bytes"]
+            self.write_seconds += stats["write_seconds"]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Files and bytes written, files skipped as unchanged, the time from the first write to the
+        last and the throughput in bytes per second over that time.
+        """
+        with self._lock:
+            elapsed = (self._last - self._first) if self._first is not None else 0.0
+            return {"files": self.files, "skipped": self.skipped, "bytes": self.bytes, "seconds": elapsed,
+                    "write_seconds": self.write_seconds, "bytes_per_second": self.bytes / elapsed if elapsed else None}
@@ -0,0 +1,186 @@
+import hashlib
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .geometry import transform_bounds_array
+from .naming import UUIDNaming
+from .render import CHUNK_SIZE, compile_template, format_column, render_columns
+from .shapes import POSE_FIELDS, Shape
+
+DEFAULT_COLOR = (0.5, 0.5, 0.5, 1.0)
+
+
+def parse_color(color: Union[str, Sequence[float]]) -> tuple:
+    """
+    Converts a Gazebo color string such as '1 0 0 1' (or an RGBA sequence) into an RGBA tuple.
+    """
+    if isinstance(color, str):
+        color = color.split()
+    rgba = tuple(float(c) for c in color)
+    if len(rgba) != 4:
+        raise ValueError(f"Expected an RGBA color, got {color!r}")
+    return rgba
+
+
+def format_color(rgba: Sequence[float]) -> str:
+    # Colors are stored as float32, round them so 0.3 is written as 0.3 and not 0.30000001192092896
+    return ' '.join(str(round(float(c), 6)) for c in rgba)
+
+
+class ShapeBatch:
+    """
+    Columnar store for many shapes of one class. Poses, dimensions and colors live in
+    NumPy arrays and model names are only generated when a shape is exported or accessed.
+    A batch can be added to a World next to individual Shape objects.
+    """
+
+    naming = UUIDNaming()
+
+    def __init__(self, shape_cls: type, dimensions: Any, poses: Any = None, colors: Any = None, name: Optional[str] = None):
+        if not (isinstance(shape_cls, type) and issubclass(shape_cls, Shape)) or not shape_cls.dimension_names:
+            raise TypeError(f"{shape_cls!r} is not a concrete Shape class")
+        self.shape_cls = shape_cls
+        ndims = len(shape_cls.dimension_names)
+
+        self.dimensions = np.array(dimensions, dtype=np.float64).reshape(-1, ndims)
+        count = len(self.dimensions)
+
+        if poses is None:
+            self.poses = np.zeros((count, len(POSE_FIELDS)), dtype=np.float64)
+        else:
+            self.poses = np.array(poses, dtype=np.float64).reshape(-1, len(POSE_FIELDS))
+        if len(self.poses) != count:
+            raise ValueError(f"Got {len(self.poses)} poses for {count} shapes")
+
+        if colors is None or isinstance(colors, str):
+            rgba = parse_color(colors) if colors is not None else DEFAULT_COLOR
+            self.colors = np.tile(np.array(rgba, dtype=np.float32), (count, 1))
+        else:
+            self.colors = np.array(colors, dtype=np.float32).reshape(-1, 4)
+            if len(self.colors) == 1:
+                self.colors = np.repeat(self.colors, count, axis=0)
+        if len(self.colors) != count:
+            raise ValueError(f"Got {len(self.colors)} colors for {count} shapes")
+
+        self._name = name
+
+    @classmethod
+    def from_shapes(cls, shapes: Iterable[Shape], name: Optional[str] = None) -> "ShapeBatch":
+        """
+        Packs shapes of a single class into a batch. The original names are not kept.
+        """
+        shapes = list(shapes)
+        if not shapes:
+            raise ValueError("Cannot build a ShapeBatch from no shapes")
+        shape_cls = type(shapes[0])
+        if any(type(s) is not shape_cls for s in shapes):
+            raise TypeError("All shapes in a ShapeBatch must be of the same class")
+        dimensions = [[getattr(s, d) for d in shape_cls.dimension_names] for s in shapes]
+        poses = [[getattr(s, p) for p in POSE_FIELDS] for s in shapes]
+        colors = [parse_color(s.color) for s in shapes]
+        return cls(shape_cls, dimensions, poses, colors, name=name)
+
+    @property
+    def name(self) -> str:
+        """
+        The batch name, shape names are derived from it. Generated by the naming strategy when first needed.
+        """
+        if self._name is None:
+            self._name = self.naming(self)
+        return self._name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._name = value
+
+    @property
+    def name_prefix(self) -> str:
+        return self.shape_cls.__name__.lower() + '_batch'
+
+    def naming_key(self) -> bytes:
+        """
+        Bytes identifying the batch contents, used by HashNaming.
+        """
+        digest = hashlib.blake2b(self.shape_cls.__name__.encode())
+        for column in (self.poses, self.dimensions, self.colors):
+            digest.update(np.ascontiguousarray(column).tobytes())
+        return digest.digest()
+
+    def set_default_name(self, naming: Callable[[Any], str]) -> None:
+        """
+        Names the batch with naming unless it already has a name.
+        """
+        if self._name is None:
+            self._name = naming(self)
+
+    def __len__(self) -> int:
+        return len(self.dimensions)
+
+    def get_name(self, index: int) -> str:
+        return f"{self.name}_{index}"
+
+    @property
+    def names(self) -> Iterator[str]:
+        return (self.get_name(i) for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return self.poses.nbytes + self.dimensions.nbytes + self.colors.nbytes
+
+    def get_aabbs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        World axis aligned bounding boxes of all rows as (N, 3) lower and upper corner arrays.
+        """
+        lower, upper = self.shape_cls.local_bounds(*self.dimensions.T)
+        return transform_bounds_array(self.poses, np.stack(lower, axis=-1), np.stack(upper, axis=-1))
+
+    def shape_at(self, index: int) -> Shape:
+        """
+        Materializes a single row of the batch as a regular Shape object.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ShapeBatch index out of range")
+        shape = self.shape_cls.__new__(self.shape_cls)
+        shape.__dict__.update(zip(POSE_FIELDS, self.poses[index].tolist()))
+        shape.__dict__.update(zip(self.shape_cls.dimension_names, self.dimensions[index].tolist()))
+        shape.color = format_color(self.colors[index])
+        shape.name = self.get_name(index)
+        return shape
+
+    def __iter__(self) -> Iterator[Shape]:
+        return (self.shape_at(i) for i in range(len(self)))
+
+    def iter_columns(self, start: int = 0, stop: Optional[int] = None) -> List[List[str]]:
+        """
+        Formats rows start:stop as string columns ordered as render.template_fields, a column at a time.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        prefix = f"{self.name}_"
+        columns = [[prefix + str(i) for i in range(start, stop)]]
+        columns += [format_column(column) for column in self.poses[start:stop].T]
+        # Few distinct colors are typical, so each one is formatted once
+        colors = np.ascontiguousarray(self.colors[start:stop])
+        keys = colors.view(np.dtype((np.void, colors.itemsize * 4))).reshape(-1).tolist()
+        color_strings = {key: format_color(np.frombuffer(key, dtype=colors.dtype)) for key in dict.fromkeys(keys)}
+        columns.append(list(map(color_strings.__getitem__, keys)))
+        columns += [format_column(column) for column in self.dimensions[start:stop].T]
+        return columns
+
+    def iter_gz_xml(self, chunk_size: int = CHUNK_SIZE, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """
+        Yields the Gazebo XML of the shapes in rows start:stop (all by default), one model at a time.
+        Rows are formatted in bulk chunks and filled into the precompiled template of the shape class.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if compile_template(self.shape_cls) is None:
+            for i in range(start, stop):
+                yield self.shape_at(i).get_gz_xml()
+            return
+        for chunk_start in range(start, stop, chunk_size):
+            yield from render_columns(self.shape_cls, self.iter_columns(chunk_start, min(chunk_start + chunk_size, stop)))
+
+    def get_gz_xml(self) -> str:
+        return "\n".join(self.iter_gz_xml())
@@ -0,0 +1,311 @@
+import copy
+import functools
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import meshes
+from .batch import ShapeBatch
+from .shapes import Cone, Ellipsoid, MeshShape, Shape
+
+# Rough cost of testing one geometry for contact, relative to a sphere. ODE and Bullet have closed
+# form tests for primitive pairs, while triangle meshes are tested triangle by triangle after a
+# bounding volume pass, so a mesh costs about one test per triangle.
+PRIMITIVE_COSTS = {"sphere": 1.0, "box": 2.0, "cylinder": 3.0}
+TRIANGLE_COST = 1.0
+# Distinct (class, dimensions) whose proxies are kept between shapes
+PROXY_CACHE_SIZE = 4096
+
+
+def _sphere_directions(count: int) -> np.ndarray:
+    # Evenly spread unit vectors on a Fibonacci spiral, plus the axes so bounding boxes are measured exactly
+    k = np.arange(count) + 0.5
+    z = 1 - 2 * k / count
+    r = np.sqrt(1 - z * z)
+    phi = np.pi * (3 - np.sqrt(5)) * k
+    return np.vstack([np.stack([r * np.cos(phi), r * np.sin(phi), z], axis=-1), np.eye(3), -np.eye(3)])
+
+
+# Directions in which the surfaces of shapes and proxies are compared
+DIRECTIONS = _sphere_directions(400)
+_HORIZONTAL = np.stack([np.cos(np.linspace(0, 2 * np.pi, 360, endpoint=False)),
+                        np.sin(np.linspace(0, 2 * np.pi, 360, endpoint=False)), np.zeros(360)], axis=-1)
+
+
+def _ellipsoid_support(dimensions: Sequence[float], u: np.ndarray) -> np.ndarray:
+    return np.sqrt(((u * dimensions) ** 2).sum(axis=-1))
+
+
+def _cone_support(dimensions: Sequence[float], u: np.ndarray) -> np.ndarray:
+    # Convex hull of the base disk and the apex
+    radius, height = dimensions
+    return np.maximum(radius * np.hypot(u[:, 0], u[:, 1]), height * u[:, 2])
+
+
+# Support functions of the curved shapes, the meshes only approximate them. Other shapes are
+# measured by the vertices of their finest mesh.
+EXACT_SUPPORT: Dict[type, Callable[[Sequence[float], np.ndarray], np.ndarray]] = {
+    Ellipsoid: _ellipsoid_support,
+    Cone: _cone_support,
+}
+
+
+def _levels(shape_cls: type) -> List[Dict[str, Any]]:
+    return meshes.LOD_LEVELS.get(shape_cls.mesh_name) or []
+
+
+@functools.lru_cache(maxsize=None)
+def _unit_mesh(shape_cls: type, resolution: tuple) -> Tuple[np.ndarray, int]:
+    vertices, faces = shape_cls.build_mesh(*[1.0] * len(shape_cls.dimension_names), **dict(resolution))
+    return vertices, len(faces)
+
+
+def mesh_triangles(shape_cls: type, lod: Optional[int] = None) -> int:
+    return _unit_mesh(shape_cls, tuple(sorted(meshes.lod_resolution(shape_cls.mesh_name, lod).items())))[1]
+
+
+def _mesh_vertices(shape_cls: type, dimensions: Sequence[float], resolution: Dict[str, Any]) -> np.ndarray:
+    scale = shape_cls.unit_scale(*dimensions)
+    if scale is None:
+        return shape_cls.build_mesh(*dimensions, **resolution)[0]
+    return _unit_mesh(shape_cls, tuple(sorted(resolution.items())))[0] * np.asarray(scale, dtype=np.float64)
+
+
+def _support(shape_cls: type, dimensions: Sequence[float], u: np.ndarray) -> np.ndarray:
+    exact = EXACT_SUPPORT.get(shape_cls)
+    if exact is not None:
+        return exact(dimensions, u)
+    levels = _levels(shape_cls)
+    return (_mesh_vertices(shape_cls, dimensions, levels[0] if levels else {}) @ u.T).max(axis=0)
+
+
+@functools.lru_cache(maxsize=None)
+def _unit_mesh_error(shape_cls: type, lod: int) -> float:
+    vertices = _mesh_vertices(shape_cls, [1.0] * len(shape_cls.dimension_names), _levels(shape_cls)[lod])
+    return float(np.abs((vertices @ DIRECTIONS.T).max(axis=0) - _support(shape_cls, [1.0] * len(shape_cls.dimension_names), DIRECTIONS)).max())
+
+
+def _round(value: Any) -> Any:
+    # ints are kept, so proxies read back from a file are written with the same text
+    return value if isinstance(value, int) else round(float(value), 6)
+
+
+class CollisionProxy:
+    """
+    Collision geometry standing in for the mesh of a shape: a "sphere", "box" or "cylinder" of the
+    given size, (radius,), (x, y, z) or (radius, length), centered at offset in the shape's frame,
+    or a "mesh" of level lod of meshes.LOD_LEVELS. error is the largest distance between its
+    surface and the shape's, nan if unknown, and cost the estimated cost of colliding with it, see
+    PRIMITIVE_COSTS.
+    """
+
+    def __init__(self, kind: str, size: Tuple[float, ...], offset: Tuple[float, float, float], error: float, cost: float,
+                 lod: Optional[int] = None):
+        self.kind = kind
+        self.size = tuple(_round(v) for v in size)
+        self.offset = tuple(_round(v) for v in offset)
+        self.error = float(error)
+        self.cost = cost
+        self.lod = lod
+
+    def _key(self) -> tuple:
+        return (self.kind, self.size, self.offset, self.lod)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, CollisionProxy) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return f"CollisionProxy({self.kind!r}, {self.size}, {self.offset}, lod={self.lod})"
+
+    def get_geometry_xml(self, shape: MeshShape) -> str:
+        if self.kind == "mesh":
+            return shape.get_mesh_xml(self.lod)
+        if self.kind == "sphere":
+            element = f"""<sphere>
+          <radius>{self.size[0]}</radius>
+        </sphere>"""
+        elif self.kind == "box":
+            element = f"""<box>
+          <size>{self.size[0]} {self.size[1]} {self.size[2]}</size>
+        </box>"""
+        else:
+            element = f"""<cylinder>
+          <radius>{self.size[0]}</radius>
+          <length>{self.size[1]}</length>
+        </cylinder>"""
+        pose_xml = f"\n      <pose>{self.offset[0]} {self.offset[1]} {self.offset[2]} 0 0 0</pose>" if any(self.offset) else ""
+        return f"""{pose_xml}
+      <geometry>
+        {element}
+      </geometry>
+"""
+
+
+@functools.lru_cache(maxsize=PROXY_CACHE_SIZE)
+def collision_proxies(shape_cls: type, dimensions: Tuple[float, ...]) -> Tuple[CollisionProxy, ...]:
+    """
+    The candidate collision proxies of a mesh shape of shape_cls with the given dimensions: the
+    sphere, box and cylinder around its axis that best fit it, and its mesh at each level of detail.
+
+    Errors are Hausdorff distances, which for convex bodies like these shapes are the largest
+    difference of their support functions, sampled in DIRECTIONS. Mesh errors are bounded by the
+    error of the unit mesh times the largest scale.
+    """
+    lower, upper = (np.asarray(corner, dtype=np.float64) for corner in shape_cls.local_bounds(*dimensions))
+    center, half = (lower + upper) / 2, (upper - lower) / 2
+    reference = _support(shape_cls, dimensions, DIRECTIONS)
+    centered = reference - DIRECTIONS @ center
+    proxies = []
+
+    # Sphere with the radius that halves the largest deviation, which needn't enclose the shape
+    radius = (centered.max() + centered.min()) / 2
+    proxies.append(CollisionProxy("sphere", (radius,), center, (centered.max() - centered.min()) / 2, PRIMITIVE_COSTS["sphere"]))
+
+    box = np.abs(DIRECTIONS) @ half
+    proxies.append(CollisionProxy("box", 2 * half, center, np.abs(box - centered).max(), PRIMITIVE_COSTS["box"]))
+
+    # Cylinder around the shape's z axis, enclosing it
+    radial = (_support(shape_cls, dimensions, _HORIZONTAL) - _HORIZONTAL[:, :2] @ center[:2]).max()
+    cylinder = radial * np.hypot(DIRECTIONS[:, 0], DIRECTIONS[:, 1]) + half[2] * np.abs(DIRECTIONS[:, 2])
+    proxies.append(CollisionProxy("cylinder", (radial, 2 * half[2]), center, np.abs(cylinder - centered).max(),
+                                  PRIMITIVE_COSTS["cylinder"]))
+
+    levels = _levels(shape_cls)
+    scale = shape_cls.unit_scale(*dimensions)
+    for lod in range(len(levels)):
+        if scale is None:
+            vertices = _mesh_vertices(shape_cls, dimensions, levels[lod])
+            error = np.abs((vertices @ DIRECTIONS.T).max(axis=0) - reference).max()
+        else:
+            error = _unit_mesh_error(shape_cls, lod) * max(abs(s) for s in scale)
+        proxies.append(CollisionProxy("mesh", (), (0, 0, 0), error, TRIANGLE_COST * mesh_triangles(shape_cls, lod), lod))
+    return tuple(proxies)
+
+
+def collision_cost(shape: Shape) -> Tuple[str, float]:
+    """
+    Kind and estimated cost of the geometry a shape collides with as it is exported now.
+    """
+    collision = getattr(shape, "collision", None)
+    if isinstance(collision, CollisionProxy):
+        return collision.kind, collision.cost
+    if isinstance(shape, MeshShape) and collision != "primitive":
+        lod = shape.visual_lod if collision is None else collision
+        return "mesh", TRIANGLE_COST * mesh_triangles(type(shape), lod)
+    xml = shape.get_collision_geometry_xml() or shape.get_geometry_xml()
+    kind = next(kind for kind in PRIMITIVE_COSTS if f"<{kind}>" in xml)
+    return kind, PRIMITIVE_COSTS[kind]
+
+
+class CollisionSimplifier:
+    """
+    Export pass that replaces the collision mesh of each mesh shape with its cheapest proxy from
+    collision_proxies whose surface stays within tolerance of the shape's, in meters, or with
+    relative=True as a fraction of the longest side of the shape's bounding box. Shapes without a
+    proxy that is close enough and cheaper than their current collision keep it, other shapes are
+    exported unchanged. Physics engines collide primitives much faster than triangle meshes.
+
+    The shapes are copied, not modified. Rows of batches of mesh shapes are exported as single
+    shapes, since their collisions differ. report() returns the estimated collision cost of the
+    objects of the last pass before and after it.
+    """
+
+    def __init__(self, tolerance: float = 0.05, relative: bool = False):
+        if tolerance < 0:
+            raise ValueError("tolerance must not be negative")
+        self.tolerance = tolerance
+        self.relative = relative
+        self.reset()
+
+    def reset(self) -> None:
+        self.before: Dict[str, List[float]] = {}
+        self.after: Dict[str, List[float]] = {}
+        self.simplified = 0
+        self.max_error = 0.0
+
+    def choose(self, shape: MeshShape, current_cost: float) -> Optional[CollisionProxy]:
+        """
+        The cheapest proxy of shape within tolerance that costs less than current_cost, or None.
+        """
+        dimensions = tuple(getattr(shape, d) for d in shape.dimension_names)
+        limit = self.tolerance
+        if self.relative:
+            lower, upper = shape.local_bounds(*dimensions)
+            limit *= max(u - l for l, u in zip(lower, upper))
+        best = None
+        for proxy in collision_proxies(type(shape), dimensions):
+            if proxy.error <= limit and proxy.cost < current_cost and (
+                    best is None or (proxy.cost, proxy.error) < (best.cost, best.error)):
+                best = proxy
+        return best
+
+    def _count(self, counts: Dict[str, List[float]], kind: str, cost: float, n: int = 1) -> None:
+        entry = counts.get(kind)
+        if entry is None:
+            entry = counts[kind] = [0, 0.0]
+        entry[0] += n
+        entry[1] += cost * n
+
+    def simplify_shape(self, shape: Shape) -> Shape:
+        kind, cost = collision_cost(shape)
+        self._count(self.before, kind, cost)
+        if isinstance(shape, MeshShape) and not isinstance(getattr(shape, "collision", None), CollisionProxy):
+            proxy = self.choose(shape, cost)
+            if proxy is not None:
+                shape = copy.copy(shape)
+                shape.collision = proxy
+                kind, cost = proxy.kind, proxy.cost
+                self.simplified += 1
+                self.max_error = max(self.max_error, proxy.error)
+        self._count(self.after, kind, cost)
+        return shape
+
+    def simplify_objects(self, objects: Iterable[Any]) -> List[Any]:
+        """
+        Returns objects with the collisions of the mesh shapes replaced, counting the costs for report().
+        """
+        self.reset()
+        simplified = []
+        for obj in objects:
+            if isinstance(obj, Shape):
+                simplified.append(self.simplify_shape(obj))
+            elif isinstance(obj, ShapeBatch) and len(obj):
+                if issubclass(obj.shape_cls, MeshShape):
+                    simplified.extend(self.simplify_shape(obj.shape_at(i)) for i in range(len(obj)))
+                else:
+                    # Primitive rows all collide the same way
+                    kind, cost = collision_cost(obj.shape_at(0))
+                    self._count(self.before, kind, cost, len(obj))
+                    self._count(self.after, kind, cost, len(obj))
+                    simplified.append(obj)
+            else:
+                simplified.append(obj)
+        return simplified
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Shapes and estimated collision cost per kind of collision geometry before and after the
+        last pass, in the units of PRIMITIVE_COSTS, with the totals, the number of simplified
+        shapes and the largest error of their proxies.
+        """
+        def summary(counts: Dict[str, List[float]]) -> Dict[str, Any]:
+            return {"cost": sum(cost for _, cost in counts.values()),
+                    "shapes": {kind: int(n) for kind, (n, _) in counts.items()},
+                    "costs": {kind: cost for kind, (_, cost) in counts.items()}}
+
+        before, after = summary(self.before), summary(self.after)
+        return {"before": before, "after": after, "simplified": self.simplified, "max_error": self.max_error,
+                "cost_ratio": after["cost"] / before["cost"] if before["cost"] else None}
+
+
+def collision_report(objects: Iterable[Any], tolerance: float = 0.05, relative: bool = False) -> Dict[str, Any]:
+    """
+    Estimated collision cost of objects as they are and with CollisionSimplifier(tolerance, relative)
+    applied, see CollisionSimplifier.report.
+    """
+    simplifier = CollisionSimplifier(tolerance, relative)
+    simplifier.simplify_objects(objects)
+    return simplifier.report()
@@ -0,0 +1,135 @@
+import gzip
+import os
+import re
+from typing import IO, Iterable, Iterator, Optional
+
+COMPRESSIONS = ("gzip", "zstd")
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Characters compact_xml joins chunks into before compacting them, one regex pass per block
+COMPACT_BLOCK_SIZE = 1 << 18
+
+# XML whitespace between a closing > and the next <, which SDF never uses as content
+_BETWEEN_TAGS = re.compile(r">[ \t\r\n]+<")
+_XML_SPACE = " \t\r\n"
+
+
+def compression_for(filename: str) -> Optional[str]:
+    """
+    The compression a file name asks for by its suffix, None for plain files.
+    """
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if filename.endswith(suffix):
+            return compression
+    return None
+
+
+def world_filename(filename: str, compression: Optional[str]) -> str:
+    """
+    The file name save_gz_world writes to: filename with .sdf and the compression suffix added
+    when they are missing, so "world", "world.sdf" and "world.sdf.gz" all give "world.sdf.gz" with gzip.
+    """
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}, expected one of {COMPRESSIONS}")
+    suffix = COMPRESSION_SUFFIXES[compression] if compression is not None else ""
+    if suffix and filename.endswith(suffix):
+        filename = filename[:-len(suffix)]
+    if not filename.endswith(".sdf"):
+        filename += ".sdf"
+    return filename + suffix
+
+
+def _zstd_module():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compressed worlds require the zstandard package") from None
+    return zstandard
+
+
+class _GzipWriter(gzip.GzipFile):
+    # GzipFile writing to filename that records name in its header and closes the file it opened
+    def __init__(self, filename: str, name: str, level: int):
+        self._raw = open(filename, "wb")
+        # mtime=0 so the same world always compresses to the same bytes
+        super().__init__(name, "wb", compresslevel=level, fileobj=self._raw, mtime=0)
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._raw.close()
+
+
+def open_compressed(filename: str, compression: str, level: Optional[int] = None, name: Optional[str] = None) -> IO[bytes]:
+    """
+    Opens filename for writing binary data through a gzip or zstd stream. name is the file name
+    stored in a gzip header, filename's by default, for writing to a temporary file.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}, expected one of {COMPRESSIONS}")
+    level = DEFAULT_LEVELS[compression] if level is None else level
+    if compression == "gzip":
+        return _GzipWriter(filename, os.path.basename(name or filename), level)
+    return _zstd_module().ZstdCompressor(level=level).stream_writer(open(filename, "wb"), closefd=True)
+
+
+def open_world_file(filename: str) -> IO[bytes]:
+    """
+    Opens a world file for reading as bytes, decompressing gzip and zstd files, which are recognized
+    by their content and not by their name.
+    """
+    with open(filename, "rb") as f:
+        magic = f.read(len(_ZSTD_MAGIC))
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.open(filename, "rb")
+    if magic == _ZSTD_MAGIC:
+        return _zstd_module().ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True)
+    return open(filename, "rb")
+
+
+def compact_xml(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Removes the indentation and line breaks between tags from a stream of XML chunks, also where
+    they span chunks, and ends the document with a single newline. Text inside elements is kept.
+    """
+    pending = ""
+    after_tag = False
+    for block in _blocks(chunks, COMPACT_BLOCK_SIZE):
+        text = pending + block
+        stripped = text.rstrip(_XML_SPACE)
+        # Trailing whitespace waits for the next block, it is only dropped if a tag follows
+        pending = text[len(stripped):]
+        if not stripped:
+            continue
+        if after_tag and stripped.lstrip(_XML_SPACE).startswith("<"):
+            stripped = stripped.lstrip(_XML_SPACE)
+        stripped = _BETWEEN_TAGS.sub("><", stripped)
+        after_tag = stripped.endswith(">")
+        yield stripped
+    yield "\n"
+
+
+def _blocks(chunks: Iterable[str], size: int) -> Iterator[str]:
+    parts, length = [], 0
+    for chunk in chunks:
+        parts.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(parts)
+            parts, length = [], 0
+    if parts:
+        yield "".join(parts)
+
+
+def write_chunks(f: IO[bytes], chunks: Iterable[str], buffer_size: int) -> None:
+    """
+    Writes text chunks to a binary file as UTF-8, joined into writes of about buffer_size characters,
+    as compressors are much faster on large writes.
+    """
+    for block in _blocks(chunks, buffer_size):
+        f.write(block.encode())
@@ -0,0 +1,95 @@
+import math
+from typing import Sequence, Tuple
+
+import numpy as np
+
+Vector = Tuple[float, float, float]
+
+
+def rotation_matrix(roll: float, pitch: float, yaw: float) -> Tuple[Vector, Vector, Vector]:
+    """
+    Rotation matrix of an SDF pose, R = Rz(yaw) Ry(pitch) Rx(roll), as rows.
+    """
+    cr, sr = math.cos(roll), math.sin(roll)
+    cp, sp = math.cos(pitch), math.sin(pitch)
+    cy, sy = math.cos(yaw), math.sin(yaw)
+    return (
+        (cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr),
+        (sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr),
+        (-sp, cp * sr, cp * cr),
+    )
+
+
+def rotation_matrices(roll: np.ndarray, pitch: np.ndarray, yaw: np.ndarray) -> np.ndarray:
+    """
+    Vectorized rotation_matrix, returns an (N, 3, 3) array.
+    """
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    return np.stack([
+        np.stack([cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr], axis=-1),
+        np.stack([sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr], axis=-1),
+        np.stack([-sp, cp * sr, cp * cr], axis=-1),
+    ], axis=-2)
+
+
+def transform_bounds(pose: Sequence[float], lower: Sequence[float], upper: Sequence[float]) -> Tuple[Vector, Vector]:
+    """
+    World axis aligned bounding box of a local box lower..upper placed at pose (x, y, z, roll, pitch, yaw).
+    """
+    rotation = rotation_matrix(pose[3], pose[4], pose[5])
+    center = [(lo + hi) / 2 for lo, hi in zip(lower, upper)]
+    half = [(hi - lo) / 2 for lo, hi in zip(lower, upper)]
+    world_lower, world_upper = [], []
+    for axis, row in enumerate(rotation):
+        c = pose[axis] + row[0] * center[0] + row[1] * center[1] + row[2] * center[2]
+        h = abs(row[0]) * half[0] + abs(row[1]) * half[1] + abs(row[2]) * half[2]
+        world_lower.append(c - h)
+        world_upper.append(c + h)
+    return tuple(world_lower), tuple(world_upper)
+
+
+def transform_bounds_array(poses: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized transform_bounds for (N, 6) poses and (N, 3) local bounds, returns (N, 3) lower and upper corners.
+    """
+    rotation = rotation_matrices(poses[:, 3], poses[:, 4], poses[:, 5])
+    center = np.einsum("nij,nj->ni", rotation, (lower + upper) / 2) + poses[:, :3]
+    half = np.einsum("nij,nj->ni", np.abs(rotation), (upper - lower) / 2)
+    return center - half, center + half
+
+
+def rotation_to_rpy(rotation: np.ndarray) -> np.ndarray:
+    """
+    Roll, pitch and yaw of (N, 3, 3) rotation matrices as an (N, 3) array, the inverse of
+    rotation_matrices. At pitch +-90 degrees only the sum or difference of roll and yaw is defined,
+    roll is then 0.
+    """
+    pitch = np.arcsin(np.clip(-rotation[:, 2, 0], -1.0, 1.0))
+    locked = np.abs(rotation[:, 2, 0]) > 1 - 1e-12
+    roll = np.where(locked, 0.0, np.arctan2(rotation[:, 2, 1], rotation[:, 2, 2]))
+    yaw = np.where(locked, np.arctan2(-rotation[:, 0, 1], rotation[:, 1, 1]), np.arctan2(rotation[:, 1, 0], rotation[:, 0, 0]))
+    # Adding 0.0 turns -0.0 into 0.0
+    return np.stack([roll, pitch, yaw], axis=-1) + 0.0
+
+
+def compose_poses(parent: Sequence[float], poses: np.ndarray) -> np.ndarray:
+    """
+    Poses given in the frame of parent (x, y, z, roll, pitch, yaw), as (N, 6) poses in the frame
+    parent is given in. Unrotated parents and children keep their angles exactly.
+    """
+    poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+    result = np.empty_like(poses)
+    if not any(parent[3:]):
+        result[:, :3] = poses[:, :3] + np.asarray(parent[:3], dtype=np.float64)
+        result[:, 3:] = poses[:, 3:]
+        return result
+    rotation = np.array(rotation_matrix(*parent[3:]))
+    result[:, :3] = poses[:, :3] @ rotation.T + np.asarray(parent[:3], dtype=np.float64)
+    rotated = ~(poses[:, 3:] == 0).all(axis=1)
+    result[:, 3:] = np.asarray(parent[3:], dtype=np.float64)
+    if rotated.any():
+        local = rotation_matrices(poses[rotated, 3], poses[rotated, 4], poses[rotated, 5])
+        result[rotated, 3:] = rotation_to_rpy(rotation @ local)
+    return result
@@ -0,0 +1,227 @@
+import copy
+import hashlib
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .batch import ShapeBatch
+from .geometry import compose_poses, transform_bounds_array
+from .naming import UUIDNaming
+from .shapes import POSE_FIELDS, Shape
+
+IDENTITY = (0, 0, 0, 0, 0, 0)
+
+
+class ShapeGroup:
+    """
+    Shapes that move and rotate together. Children are shapes, ShapeBatches and other groups, and
+    their poses are relative to the pose of the group, so moving or turning a group only changes
+    its own x, y, z, roll, pitch and yaw. World poses are composed with NumPy when the group is
+    exported, one vectorized step per group however many children it has.
+
+    A group is exported as one model per shape at its world pose, or with as_model as a single
+    model at the group's pose with a link per shape. Groups nested in an as_model group become
+    links of it too, nested as_model groups in a flattened group are exported as their own models.
+
+    A SpatialIndex indexes the shapes of a group like the rows of a batch, see get_aabbs. The export
+    passes of a World, instancing, merging and collision simplification, see the shapes of flattened
+    groups through expand_groups, as_model groups are left whole.
+    """
+
+    naming = UUIDNaming()
+
+    def __init__(self, children: Iterable[Any] = (), x: float = 0, y: float = 0, z: float = 0, roll: float = 0,
+                 pitch: float = 0, yaw: float = 0, name: Optional[str] = None, as_model: bool = False):
+        self.children: List[Any] = []
+        self.x = x
+        self.y = y
+        self.z = z
+        self.roll = roll
+        self.pitch = pitch
+        self.yaw = yaw
+        self.as_model = as_model
+        self._name = name
+        for child in children:
+            self.add(child)
+
+    @property
+    def name(self) -> str:
+        """
+        The group name, the model name with as_model. Generated by the naming strategy when first needed.
+        """
+        if self._name is None:
+            self._name = self.naming(self)
+        return self._name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._name = value
+
+    @property
+    def name_prefix(self) -> str:
+        return "group"
+
+    @property
+    def pose(self) -> Tuple[float, ...]:
+        return tuple(getattr(self, field) for field in POSE_FIELDS)
+
+    def naming_key(self) -> bytes:
+        """
+        Bytes identifying the group's pose and children, used by HashNaming.
+        """
+        digest = hashlib.blake2b(repr(("ShapeGroup", self.pose)).encode())
+        for child in self.children:
+            digest.update(child.naming_key())
+        return digest.digest()
+
+    def set_default_name(self, naming: Callable[[Any], str]) -> None:
+        """
+        Names the group and then its children, depth first, unless they already have names.
+        """
+        if self._name is None:
+            self._name = naming(self)
+        for child in self.children:
+            child.set_default_name(naming)
+
+    def add(self, child: Any) -> None:
+        if not isinstance(child, (Shape, ShapeBatch, ShapeGroup)):
+            raise TypeError(f"Cannot add {child!r} to a ShapeGroup")
+        if child is self or (isinstance(child, ShapeGroup) and self in child.iter_groups()):
+            raise ValueError("A ShapeGroup cannot contain itself")
+        self.children.append(child)
+
+    def remove(self, child: Any) -> None:
+        for i, c in enumerate(self.children):
+            if c is child:
+                del self.children[i]
+                return
+        raise ValueError(f"{child!r} is not in the group")
+
+    def iter_groups(self) -> Iterator["ShapeGroup"]:
+        """
+        The group and all groups nested in it.
+        """
+        yield self
+        for child in self.children:
+            if isinstance(child, ShapeGroup):
+                yield from child.iter_groups()
+
+    def __len__(self) -> int:
+        return sum(len(c) if isinstance(c, (ShapeBatch, ShapeGroup)) else 1 for c in self.children)
+
+    def leaf_poses(self, pose: Optional[Sequence[float]] = None, keep_models: bool = False) -> List[Tuple[Any, np.ndarray]]:
+        """
+        The shapes and batches in the group and its nested groups, as (object, poses) with the (N, 6)
+        poses of its shapes in the frame the group's pose is given in, or placing the group at pose
+        instead. With keep_models nested as_model groups are returned as objects of their own.
+        """
+        # (object, number of poses, whether its pose is a row of the block of direct Shape children)
+        leaves: List[Tuple[Any, int, bool]] = []
+        blocks: List[np.ndarray] = []
+        shapes = [c for c in self.children if isinstance(c, Shape)]
+        if shapes:
+            blocks.append(np.array([[getattr(s, f) for f in POSE_FIELDS] for s in shapes], dtype=np.float64))
+        for child in self.children:
+            if isinstance(child, Shape):
+                leaves.append((child, 1, True))
+            elif isinstance(child, ShapeBatch):
+                leaves.append((child, len(child), False))
+                blocks.append(child.poses)
+            elif keep_models and child.as_model:
+                leaves.append((child, 1, False))
+                blocks.append(np.array([child.pose], dtype=np.float64))
+            else:
+                for obj, poses in child.leaf_poses(keep_models=keep_models):
+                    leaves.append((obj, len(poses), False))
+                    blocks.append(poses)
+        if not leaves:
+            return []
+        world = compose_poses(self.pose if pose is None else pose, np.vstack(blocks))
+        # Direct Shape children come first in the stacked poses, the other blocks follow in child order
+        placed, shape_row, block_row = [], 0, len(shapes)
+        for obj, n, direct in leaves:
+            if direct:
+                placed.append((obj, world[shape_row:shape_row + 1]))
+                shape_row += 1
+            else:
+                placed.append((obj, world[block_row:block_row + n]))
+                block_row += n
+        return placed
+
+    def iter_placed(self, pose: Optional[Sequence[float]] = None, keep_models: bool = False) -> Iterator[Any]:
+        """
+        Copies of the group's shapes and batches moved to their poses from leaf_poses. Names are
+        resolved first, so the copies keep the names of the originals.
+        """
+        for obj, poses in self.leaf_poses(pose, keep_models):
+            obj.name
+            placed = copy.copy(obj)
+            if isinstance(obj, ShapeBatch):
+                placed.poses = poses
+            else:
+                placed.__dict__.update(zip(POSE_FIELDS, poses[0].tolist()))
+            yield placed
+
+    def get_aabbs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        World axis aligned bounding boxes of the group's shapes in leaf_poses order, as (N, 3) lower
+        and upper corner arrays. A SpatialIndex indexes them like the rows of a ShapeBatch.
+        """
+        lowers, uppers = [np.empty((0, 3))], [np.empty((0, 3))]
+        for obj, poses in self.leaf_poses():
+            if isinstance(obj, ShapeBatch):
+                shape_cls, dimensions = obj.shape_cls, obj.dimensions
+            else:
+                shape_cls = type(obj)
+                dimensions = np.array([[getattr(obj, d) for d in shape_cls.dimension_names]], dtype=np.float64)
+            lower, upper = shape_cls.local_bounds(*dimensions.T)
+            lower, upper = transform_bounds_array(poses, np.stack(lower, axis=-1), np.stack(upper, axis=-1))
+            lowers.append(lower)
+            uppers.append(upper)
+        return np.vstack(lowers), np.vstack(uppers)
+
+    def get_model_xml(self) -> str:
+        links = []
+        for placed in self.iter_placed(IDENTITY):
+            for shape in placed if isinstance(placed, ShapeBatch) else (placed,):
+                links.append(shape.get_link_xml(shape.name, f"\n    <pose>{shape.x} {shape.y} {shape.z} {shape.roll} {shape.pitch} {shape.yaw}</pose>"))
+        links_xml = "\n".join(links)
+        return f"""
+<model name="{self.name}">
+  <static>true</static>
+  <pose>{self.x} {self.y} {self.z} {self.roll} {self.pitch} {self.yaw}</pose>
+{links_xml}
+</model>
+"""
+
+    def iter_gz_xml(self) -> Iterator[str]:
+        """
+        Yields the XML of the group's models, see the class docstring.
+        """
+        if self.as_model:
+            yield self.get_model_xml()
+            return
+        for placed in self.iter_placed(keep_models=True):
+            if isinstance(placed, ShapeGroup):
+                yield placed.get_model_xml()
+            elif isinstance(placed, ShapeBatch):
+                yield from placed.iter_gz_xml()
+            else:
+                yield placed.get_gz_xml()
+
+    def get_gz_xml(self) -> str:
+        return "\n".join(self.iter_gz_xml())
+
+
+def expand_groups(objects: Iterable[Any]) -> List[Any]:
+    """
+    The objects with every ShapeGroup that isn't exported as_model replaced by the copies from its
+    iter_placed, which export the same models. as_model groups, nested ones included, stay whole.
+    """
+    expanded: List[Any] = []
+    for obj in objects:
+        if isinstance(obj, ShapeGroup) and not obj.as_model:
+            expanded.extend(obj.iter_placed(keep_models=True))
+        else:
+            expanded.append(obj)
+    return expanded
@@ -0,0 +1,172 @@
+import hashlib
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .assets import AssetWriter
+from .batch import ShapeBatch, format_color
+from .models import write_model_config
+from .render import CHUNK_SIZE, format_column
+from .shapes import POSE_FIELDS, Shape
+
+
+def render_include(name: str, uri: str, x: Any, y: Any, z: Any, roll: Any, pitch: Any, yaw: Any) -> str:
+    return f"""
+<include>
+  <uri>model://{uri}</uri>
+  <name>{name}</name>
+  <pose>{x} {y} {z} {roll} {pitch} {yaw}</pose>
+</include>
+"""
+
+
+PrototypeKey = Tuple[type, tuple, str, tuple]
+
+
+def prototype_key(shape: Shape) -> PrototypeKey:
+    """
+    What makes two shapes instances of the same model: class, dimensions, color and any other
+    attribute set on the shape, such as a per shape visual_lod.
+    """
+    fixed = set(POSE_FIELDS + shape.dimension_names + ("color", "_name"))
+    extras = tuple((k, v) for k, v in shape.__dict__.items() if k not in fixed)
+    return (shape.__class__, tuple(getattr(shape, d) for d in shape.dimension_names), shape.color, extras)
+
+
+def prototype_name(key: PrototypeKey) -> str:
+    shape_cls, dimensions, color, extras = key
+    digest = hashlib.blake2b(repr((shape_cls.__name__, dimensions, color) + ((extras,) if extras else ())).encode(), digest_size=6)
+    return f"{shape_cls.__name__.lower()}_{digest.hexdigest()}"
+
+
+class ModelInclude:
+    """
+    One instance of a prototype model, exported as an <include> with its own name and pose.
+    """
+
+    def __init__(self, name: str, uri: str, pose: Sequence[Any]):
+        self.name = name
+        self.uri = uri
+        self.pose = tuple(pose)
+
+    def get_gz_xml(self) -> str:
+        return render_include(self.name, self.uri, *self.pose)
+
+
+class IncludeBatch:
+    """
+    Rows of a ShapeBatch exported as <include>s of their prototype models. Rows without a
+    prototype, whose model occurs too rarely to be worth sharing, are exported inline.
+    """
+
+    def __init__(self, batch: ShapeBatch, uris: List[Optional[str]]):
+        self.batch = batch
+        self.uris = uris
+
+    @property
+    def name(self) -> str:
+        return self.batch.name
+
+    def __len__(self) -> int:
+        return len(self.batch)
+
+    def iter_gz_xml(self, chunk_size: int = CHUNK_SIZE, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        batch = self.batch
+        stop = len(batch) if stop is None else min(stop, len(batch))
+        for chunk_start in range(start, stop, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, stop)
+            poses = [format_column(column) for column in batch.poses[chunk_start:chunk_stop].T]
+            for i, uri, *pose in zip(range(chunk_start, chunk_stop), self.uris[chunk_start:chunk_stop], *poses):
+                if uri is None:
+                    yield batch.shape_at(i).get_gz_xml()
+                else:
+                    yield render_include(batch.get_name(i), uri, *pose)
+
+    def get_gz_xml(self) -> str:
+        return "\n".join(self.iter_gz_xml())
+
+
+class InstanceLibrary:
+    """
+    Shares the geometry of repeated shapes. Every combination of class, dimensions and color that
+    occurs at least min_instances times is written once as a model to models_dir, laid out like the
+    models of generate_models.py, and each shape using it is exported as an <include> of that model.
+    models_dir has to be on Gazebo's model path (GZ_SIM_RESOURCE_PATH or GAZEBO_MODEL_PATH).
+    The models are written through writer, right away without one.
+    """
+
+    def __init__(self, models_dir: str, min_instances: int = 2, writer: Optional[AssetWriter] = None):
+        self.models_dir = models_dir
+        self.min_instances = min_instances
+        self.writer = writer or AssetWriter(workers=0)
+        # Prototype models written so far, name -> model.sdf content
+        self.written: Dict[str, str] = {}
+
+    def write_prototype(self, key: PrototypeKey) -> str:
+        """
+        Writes the model of a prototype unless it is already there and returns its name. Files that
+        already have the right content are left alone.
+        """
+        name = prototype_name(key)
+        if name in self.written:
+            return name
+        shape_cls, dimensions, color, extras = key
+        proto = shape_cls.__new__(shape_cls)
+        for field in POSE_FIELDS:
+            setattr(proto, field, 0)
+        for field, value in zip(shape_cls.dimension_names, dimensions):
+            setattr(proto, field, value)
+        proto.color = color
+        for field, value in extras:
+            setattr(proto, field, value)
+        proto.name = name
+        content = f"""<?xml version="1.0" ?>
+<sdf version="1.6">{proto.get_gz_xml()}</sdf>
+"""
+        directory = os.path.join(self.models_dir, name)
+        write_model_config(name, directory, self.writer, author=False, only_if_changed=True)
+        self.writer.write_text(os.path.join(directory, 'model.sdf'), content, only_if_changed=True)
+        self.written[name] = content
+        return name
+
+    def _batch_keys(self, batch: ShapeBatch) -> Tuple[List[PrototypeKey], np.ndarray]:
+        # Rows with equal dimensions and color share a prototype, found on the raw bytes of both
+        dimensions, colors = np.ascontiguousarray(batch.dimensions), np.ascontiguousarray(batch.colors)
+        rows = np.concatenate([dimensions.view(np.uint8), colors.view(np.uint8)], axis=1)
+        rows = np.ascontiguousarray(rows).view(np.dtype((np.void, rows.shape[1]))).ravel()
+        _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        keys = [(batch.shape_cls, tuple(batch.dimensions[i].tolist()), format_color(batch.colors[i]), ()) for i in first.tolist()]
+        return keys, inverse.ravel()
+
+    def instance_objects(self, objects: Iterable[Any]) -> List[Any]:
+        """
+        Returns objects with repeated shapes replaced by includes of their prototype models, which
+        are written to models_dir. Other objects are returned unchanged.
+        """
+        objects = list(objects)
+        counts: Dict[PrototypeKey, int] = {}
+        batch_keys: Dict[int, Tuple[List[PrototypeKey], np.ndarray]] = {}
+        for obj in objects:
+            if isinstance(obj, Shape):
+                key = prototype_key(obj)
+                counts[key] = counts.get(key, 0) + 1
+            elif isinstance(obj, ShapeBatch) and len(obj):
+                keys, inverse = batch_keys[id(obj)] = self._batch_keys(obj)
+                for key, n in zip(keys, np.bincount(inverse, minlength=len(keys)).tolist()):
+                    counts[key] = counts.get(key, 0) + n
+
+        instanced = []
+        for obj in objects:
+            if isinstance(obj, Shape):
+                key = prototype_key(obj)
+                if counts[key] >= self.min_instances:
+                    pose = [getattr(obj, field) for field in POSE_FIELDS]
+                    obj = ModelInclude(obj.name, self.write_prototype(key), pose)
+            elif id(obj) in batch_keys:
+                keys, inverse = batch_keys[id(obj)]
+                uris = [self.write_prototype(key) if counts[key] >= self.min_instances else None for key in keys]
+                if any(uri is not None for uri in uris):
+                    obj = IncludeBatch(obj, [uris[i] for i in inverse.tolist()])
+            instanced.append(obj)
+        return instanced
@@ -0,0 +1,212 @@
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Rendered models between two memory samples
+MEMORY_SAMPLE_INTERVAL = 4096
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Peak resident memory of the process in bytes, None where the resource module is missing (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Instrumentation:
+    """
+    Timers, counters and memory samples of a world's exports, enabled with World.enable_instrumentation.
+
+    Phases are timed with phase(), rendering is counted per class of the rendered object: number of
+    models, characters of XML (bytes for the ASCII XML the shapes write) and time. Memory is sampled as
+    the peak resident size of the process, and with trace_memory also as the peak of Python allocations
+    traced by tracemalloc during each phase, which is more precise but slows everything down.
+
+    Hooks are called as hook(phase, seconds) whenever a phase ends, to forward the numbers to a
+    metrics system, report() returns all of them as a dict.
+    """
+
+    def __init__(self, trace_memory: bool = False, hooks: Iterable[Callable[[str, float], None]] = ()):
+        self.trace_memory = trace_memory
+        self.hooks: List[Callable[[str, float], None]] = list(hooks)
+        self.reset()
+
+    def reset(self) -> None:
+        self.timers: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        # Per class name of the rendered objects
+        self.models: Dict[str, int] = {}
+        self.characters: Dict[str, int] = {}
+        self.render_times: Dict[str, float] = {}
+        self.bytes_written = 0
+        self.peak_rss: Optional[int] = None
+        self.peak_traced: Dict[str, int] = {}
+        self._peaks: List[int] = []
+        self._started_tracing = False
+
+    def add_hook(self, hook: Callable[[str, float], None]) -> None:
+        self.hooks.append(hook)
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Adds seconds to the timer of phase name and calls the hooks.
+        """
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.sample_memory()
+        for hook in self.hooks:
+            hook(name, seconds)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the block as phase name. Phases can be nested, the time of an inner phase counts for both.
+        """
+        if self.trace_memory:
+            self._start_tracing()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if self.trace_memory:
+                self.peak_traced[name] = max(self.peak_traced.get(name, 0), self._stop_tracing())
+            self.record(name, seconds)
+
+    def _start_tracing(self) -> None:
+        # tracemalloc has a single peak, so the peaks of enclosing phases are kept on a stack around resets
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._peaks, self._started_tracing = [], True
+        elif self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+
+    def _stop_tracing(self) -> int:
+        peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        elif self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return peak
+
+    def sample_memory(self) -> None:
+        rss = peak_rss()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def _add_counts(self, counts: Dict[str, List[float]]) -> float:
+        # counts maps class names to [models, characters, seconds], returns the total seconds
+        for key, (models, characters, seconds) in counts.items():
+            self.models[key] = self.models.get(key, 0) + int(models)
+            self.characters[key] = self.characters.get(key, 0) + int(characters)
+            self.render_times[key] = self.render_times.get(key, 0.0) + seconds
+        return sum(seconds for _, _, seconds in counts.values())
+
+    def iter_models(self, objects: Iterable[Any], render: Callable[[Iterable[Any]], Iterator[str]]) -> Iterator[str]:
+        """
+        Renders objects one at a time with render, counting the models of each class, and records
+        the time spent rendering as the "render" phase. Memory is sampled every MEMORY_SAMPLE_INTERVAL objects.
+        """
+        clock = time.perf_counter
+        counts: Dict[str, List[float]] = {}
+        for i, obj in enumerate(objects):
+            if i % MEMORY_SAMPLE_INTERVAL == 0:
+                self.sample_memory()
+            key = type(obj).__name__
+            entry = counts.get(key)
+            if entry is None:
+                entry = counts[key] = [0, 0, 0.0]
+            start = clock()
+            for chunk in render((obj,)):
+                entry[2] += clock() - start
+                entry[0] += 1
+                entry[1] += len(chunk)
+                yield chunk
+                start = clock()
+            entry[2] += clock() - start
+        self.record("render", self._add_counts(counts))
+
+    def iter_rendered(self, chunks: Iterable[str], key: str) -> Iterator[str]:
+        """
+        Counts already rendered model chunks under key and records the time spent waiting for them
+        as the "render" phase.
+        """
+        clock = time.perf_counter
+        entry = [0, 0, 0.0]
+        start = clock()
+        for chunk in chunks:
+            entry[2] += clock() - start
+            entry[0] += 1
+            entry[1] += len(chunk)
+            yield chunk
+            start = clock()
+        entry[2] += clock() - start
+        self.record("render", self._add_counts({key: entry}))
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "timers": dict(self.timers),
+            "calls": dict(self.calls),
+            "models": dict(self.models),
+            "characters": dict(self.characters),
+            "render_times": dict(self.render_times),
+            "bytes_written": self.bytes_written,
+            "peak_rss": self.peak_rss,
+            "peak_traced": dict(self.peak_traced),
+        }
+
+
+class TimedWriter:
+    """
+    File wrapper that times writes and counts the written characters or bytes. Used as a context
+    manager, the time is recorded as the "write" phase on exit.
+    """
+
+    def __init__(self, f: IO, instrumentation: Instrumentation):
+        self.f = f
+        self.instrumentation = instrumentation
+        self.seconds = 0.0
+
+    def __enter__(self) -> "TimedWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.instrumentation.record("write", self.seconds)
+
+    def write(self, data: Any) -> int:
+        start = time.perf_counter()
+        written = self.f.write(data)
+        self.seconds += time.perf_counter() - start
+        self.instrumentation.bytes_written += len(data)
+        return written
+
+    def writelines(self, lines: Iterable[Any]) -> None:
+        for line in lines:
+            self.write(line)
+
+
+def iter_with_progress(objects: Iterable[Any], total: Optional[int], progress: Callable[[int, Optional[int]], None],
+                       steps: int = 100) -> Iterator[Any]:
+    """
+    Passes objects through and calls progress(done, total) about steps times along the way, with
+    done the number of objects passed so far, the last call when all are done.
+    """
+    every = max(1, total // steps) if total else 1024
+    done = 0
+    for done, obj in enumerate(objects, 1):
+        yield obj
+        if done % every == 0:
+            progress(done, total)
+    if done % every or not done:
+        progress(done, total)
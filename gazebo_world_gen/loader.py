@@ -0,0 +1,276 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .collision import PRIMITIVE_COSTS, CollisionProxy
+from .instancing import ModelInclude
+from .shapes import POSE_FIELDS, Box, Cylinder, MeshShape, Shape, Sphere
+
+_MESH_URI = re.compile(r"model://(\w+)/meshes/(\w+?)(?:_lod(\d+))?\.dae$")
+
+
+class RawElement:
+    """
+    A child of <world> the loader has no class for, such as a heightmap, a merged model or a plugin,
+    kept as XML and written back as it was read, apart from whitespace and attribute quoting.
+    """
+
+    def __init__(self, name: str, xml: str):
+        self.name = name
+        self.xml = xml
+
+    def get_gz_xml(self) -> str:
+        return self.xml
+
+
+def parse_number(text: str) -> Any:
+    """
+    Reads a number back as the int or float that was written, so str() gives the same text.
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_numbers(text: Optional[str]) -> tuple:
+    return tuple(parse_number(v) for v in (text or "").split())
+
+
+def _mesh_classes() -> Dict[str, type]:
+    classes, pending = {}, [MeshShape]
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if cls.mesh_name is not None:
+            classes.setdefault(cls.mesh_name, cls)
+    return classes
+
+
+def _children(elem: ET.Element) -> List[str]:
+    return [child.tag for child in elem]
+
+
+def parse_geometry(elem: Optional[ET.Element]) -> Optional[tuple]:
+    """
+    The geometry of a <collision> or <visual> as (kind, values...), with an optional <pose> in
+    front, or None if it is not a geometry the shapes write.
+    """
+    if elem is None:
+        return None
+    pose = elem.findtext("pose")
+    geometry = elem.find("geometry")
+    if geometry is None or len(geometry) != 1:
+        return None
+    shape = geometry[0]
+    if shape.tag == "box" and _children(shape) == ["size"]:
+        values = ("box", parse_numbers(shape.findtext("size")))
+    elif shape.tag == "sphere" and _children(shape) == ["radius"]:
+        values = ("sphere", parse_number(shape.findtext("radius")))
+    elif shape.tag == "cylinder" and _children(shape) == ["radius", "length"]:
+        values = ("cylinder", parse_number(shape.findtext("radius")), parse_number(shape.findtext("length")))
+    elif shape.tag == "mesh" and _children(shape) == ["uri", "scale"]:
+        values = ("mesh", shape.findtext("uri"), parse_numbers(shape.findtext("scale")))
+    else:
+        return None
+    return values + (pose,)
+
+
+def _mesh_dimensions(shape_cls: type, scale: tuple) -> Optional[List[Any]]:
+    # unit_scale only passes dimensions through, so calling it with their names tells which axis holds which
+    axes = shape_cls.unit_scale(*shape_cls.dimension_names)
+    dimensions = [scale[axes.index(name)] for name in shape_cls.dimension_names]
+    if len(scale) != 3 or tuple(shape_cls.unit_scale(*dimensions)) != scale:
+        return None
+    return dimensions
+
+
+def collision_proxy(collision: tuple) -> Optional[CollisionProxy]:
+    """
+    The CollisionProxy of a parsed primitive collision geometry, or None if it has a rotation. Its
+    error is not stored in the file and is nan.
+    """
+    kind, *values, pose = collision
+    if kind not in PRIMITIVE_COSTS:
+        return None
+    offset: tuple = (0, 0, 0)
+    if pose is not None:
+        numbers = parse_numbers(pose)
+        if len(numbers) != 6 or any(numbers[3:]):
+            return None
+        offset = numbers[:3]
+    size = tuple(values[0]) if kind == "box" else tuple(values)
+    return CollisionProxy(kind, size, offset, float("nan"), PRIMITIVE_COSTS[kind])
+
+
+def shape_from_model(model: ET.Element, mesh_classes: Optional[Dict[str, type]] = None) -> Optional[Shape]:
+    """
+    Rebuilds the Shape a <model> element was exported from, or returns None if the model is not
+    laid out exactly like Shape.get_gz_xml writes it.
+    """
+    if _children(model) != ["static", "pose", "link"] or model.findtext("static") != "true":
+        return None
+    link = model.find("link")
+    if link.get("name") != "link" or _children(link) != ["collision", "visual"]:
+        return None
+    visual = link.find("visual")
+    if _children(visual) != ["geometry", "material"] or _children(visual.find("material")) != ["ambient", "diffuse"]:
+        return None
+    color = visual.findtext("material/ambient")
+    if color != visual.findtext("material/diffuse"):
+        return None
+    pose = parse_numbers(model.findtext("pose"))
+    geometry = parse_geometry(visual)
+    collision = parse_geometry(link.find("collision"))
+    if len(pose) != 6 or geometry is None or collision is None or geometry[-1] is not None:
+        return None
+
+    attributes: Dict[str, Any] = {}
+    kind = geometry[0]
+    if kind == "box" and len(geometry[1]) == 3:
+        shape_cls, dimensions = Box, list(geometry[1])
+    elif kind == "sphere":
+        shape_cls, dimensions = Sphere, [geometry[1]]
+    elif kind == "cylinder":
+        shape_cls, dimensions = Cylinder, [geometry[1], geometry[2]]
+    elif kind == "mesh":
+        match = _MESH_URI.match(geometry[1])
+        mesh_classes = mesh_classes if mesh_classes is not None else _mesh_classes()
+        shape_cls = mesh_classes.get(match.group(1)) if match else None
+        if shape_cls is None or match.group(2) != shape_cls.mesh_name:
+            return None
+        dimensions = _mesh_dimensions(shape_cls, geometry[2])
+        if dimensions is None:
+            return None
+        attributes["visual_lod"] = int(match.group(3)) if match.group(3) is not None else None
+    else:
+        return None
+
+    shape = shape_cls.__new__(shape_cls)
+    shape.__dict__.update(zip(POSE_FIELDS, pose))
+    shape.__dict__.update(zip(shape_cls.dimension_names, dimensions))
+    shape.color = color
+    shape.name = model.get("name")
+    if issubclass(shape_cls, MeshShape):
+        if collision == geometry:
+            attributes["collision"] = None
+        elif collision[0] == "mesh":
+            match = _MESH_URI.match(collision[1])
+            if not match or match.group(3) is None:
+                return None
+            attributes["collision"] = int(match.group(3))
+        else:
+            attributes["collision"] = "primitive"
+        # Only settings that differ from the class are kept on the shape
+        for attribute, value in attributes.items():
+            if getattr(shape_cls, attribute) != value:
+                setattr(shape, attribute, value)
+        if parse_geometry(_fragment("collision", shape.get_collision_geometry_xml() or shape.get_geometry_xml())) != collision:
+            # A collision replaced by collision.CollisionSimplifier
+            proxy = collision_proxy(collision) if attributes["collision"] == "primitive" else None
+            if proxy is None:
+                return None
+            shape.collision = proxy
+            if parse_geometry(_fragment("collision", shape.get_collision_geometry_xml())) != collision:
+                return None
+    elif collision != geometry:
+        return None
+    return shape
+
+
+def _fragment(tag: str, xml: str) -> ET.Element:
+    return ET.fromstring(f"<{tag}>{xml}</{tag}>")
+
+
+def parse_light(elem: ET.Element) -> Dict[str, Any]:
+    return {
+        'name': elem.get('name'),
+        'type': elem.get('type'),
+        'cast_shadows': parse_number(elem.findtext('cast_shadows')),
+        'pose': parse_numbers(elem.findtext('pose')),
+        'diffuse': parse_numbers(elem.findtext('diffuse')),
+        'specular': parse_numbers(elem.findtext('specular')),
+        'attenuation': {field: parse_number(elem.findtext(f'attenuation/{field}'))
+                        for field in ('range', 'constant', 'linear', 'quadratic')},
+        'direction': parse_numbers(elem.findtext('direction')),
+        'spot': {field: parse_number(elem.findtext(f'spot/{field}')) for field in ('inner_angle', 'outer_angle', 'falloff')},
+    }
+
+
+def parse_setting(elem: ET.Element, settings: Dict[str, Any]) -> bool:
+    """
+    Reads a world setting element into settings, returns False for elements that are not settings.
+    """
+    tag = elem.tag
+    if tag in ("gravity", "magnetic_field"):
+        settings[tag] = parse_numbers(elem.text)
+    elif tag == "atmosphere":
+        settings["atmosphere"] = elem.get("type")
+    elif tag == "physics":
+        settings["physics"] = {"type": elem.get("type")}
+        settings["physics"].update((child.tag, parse_number(child.text)) for child in elem)
+    elif tag == "scene":
+        settings["ambient_light"] = parse_numbers(elem.findtext("ambient"))
+        settings["background_color"] = parse_numbers(elem.findtext("background"))
+    elif tag == "audio":
+        settings["audio_device"] = elem.findtext("device")
+    elif tag == "spherical_coordinates":
+        settings["spherical_coordinates"] = {child.tag: child.text if child.tag == "surface_model" else parse_number(child.text)
+                                             for child in elem}
+    elif tag != "wind":
+        return False
+    return True
+
+
+def iter_world_elements(source: Any) -> Iterator[Tuple[str, Any]]:
+    """
+    Streams an SDF world file, a path or a binary file object, and yields ("world", elem) with the
+    still empty <world> element first and then ("element", elem) for each of its children once it is
+    complete. Elements are removed from
+    the tree after they are yielded, so memory use does not grow with the size of the file.
+    """
+    world = None
+    depth = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 2 and elem.tag == "world":
+                world = elem
+                yield "world", elem
+            continue
+        depth -= 1
+        if world is not None and depth == 2:
+            yield "element", elem
+            world.remove(elem)
+
+
+def load_world_into(world: Any, source: Any) -> Any:
+    """
+    Fills world with the settings and objects of an SDF world file. Models written by the shape
+    classes become shapes again, <include>s become ModelIncludes and every other element a RawElement.
+    The first light sets the world's light, further lights are kept as RawElements.
+    """
+    mesh_classes = _mesh_classes()
+    light_seen = False
+    for kind, value in iter_world_elements(source):
+        if kind == "world":
+            world.name = value.get("name")
+            continue
+        elem = value
+        if elem.tag == "model":
+            obj = shape_from_model(elem, mesh_classes)
+        elif elem.tag == "include" and _children(elem) == ["uri", "name", "pose"] and elem.findtext("uri").startswith("model://"):
+            obj = ModelInclude(elem.findtext("name"), elem.findtext("uri")[len("model://"):], parse_numbers(elem.findtext("pose")))
+        elif elem.tag == "light" and not light_seen:
+            world.settings["light"] = parse_light(elem)
+            light_seen = True
+            continue
+        elif parse_setting(elem, world.settings):
+            continue
+        else:
+            obj = None
+        if obj is None:
+            elem.tail = None
+            obj = RawElement(elem.get("name", elem.tag), "\n" + ET.tostring(elem, encoding="unicode") + "\n")
+        world.add_object(obj)
+    return world
@@ -0,0 +1,84 @@
+import math
+import os
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from .assets import AssetWriter
+from .collision import CollisionProxy
+from .meshes import LOD_LEVELS, lod_resolution
+from .shapes import Cone, Ellipsoid, MeshShape
+
+# Unit dimensions of the default mesh of each model in gazebo_models
+_UNIT_SHAPES = {"ellipsoid": Ellipsoid(1, 1, 1), "cone": Cone(1, 1)}
+
+
+def generate_lod_models(models_dir: str = "gazebo_models") -> None:
+    """
+    Writes the unit meshes of every level in meshes.LOD_LEVELS next to the default mesh of each
+    model, as <model>/meshes/<model>_lod<level>.dae.
+    """
+    with AssetWriter() as writer:
+        for name in LOD_LEVELS:
+            write_lod_meshes(name, models_dir, writer=writer)
+
+
+def write_lod_meshes(mesh_name: str, models_dir: str = "gazebo_models", model_name: Optional[str] = None,
+                     writer: Optional[AssetWriter] = None) -> List[str]:
+    """
+    Writes the unit meshes of every level of mesh_name into the meshes directory of model_name,
+    mesh_name by default, and returns their paths. With a writer the meshes are only submitted to
+    it, they are written once writer.wait() returns.
+    """
+    model_name = model_name or mesh_name
+    writer = writer or AssetWriter(workers=0)
+    shape = _UNIT_SHAPES[mesh_name]
+    dimensions = [getattr(shape, d) for d in shape.dimension_names]
+    directory = os.path.join(models_dir, model_name, "meshes")
+    paths = []
+    for lod, resolution in enumerate(LOD_LEVELS[mesh_name]):
+        mesh = shape.build_mesh(*dimensions, **resolution)
+        paths.append(os.path.join(directory, f"{model_name}_lod{lod}.dae"))
+        writer.save_mesh(mesh, paths[-1], smooth=mesh_name == "ellipsoid")
+    return paths
+
+
+def assign_visual_lod(objects: Iterable[Any], viewpoint: Sequence[float], distances: Sequence[float]) -> None:
+    """
+    Sets visual_lod of each mesh shape from its distance to viewpoint. Shapes closer than
+    distances[0] get level 0, closer than distances[1] level 1 and so on, shapes further away
+    than all distances get the coarsest level. Gazebo has no per visual LOD switching, so this
+    picks the levels for a known camera position when the world is generated.
+    """
+    for obj in objects:
+        if isinstance(obj, MeshShape):
+            distance = math.dist(viewpoint, (obj.x, obj.y, obj.z))
+            obj.visual_lod = sum(distance >= d for d in distances)
+
+
+def count_triangles(objects: Iterable[Any]) -> Tuple[int, int]:
+    """
+    Total (visual, collision) triangles of the mesh shapes in objects. Primitive collisions, and
+    CollisionProxy collisions other than meshes, count as zero triangles, other shapes are skipped.
+    """
+    counts = {}
+
+    def triangles(shape: MeshShape, lod: Any) -> int:
+        resolution = lod_resolution(shape.mesh_name, lod)
+        key = (shape.mesh_name, tuple(sorted(resolution.items())))
+        if key not in counts:
+            unit = [1.0] * len(shape.dimension_names)
+            counts[key] = len(shape.build_mesh(*unit, **resolution)[1])
+        return counts[key]
+
+    visual = collision = 0
+    for obj in objects:
+        if not isinstance(obj, MeshShape):
+            continue
+        visual += triangles(obj, obj.visual_lod)
+        if obj.collision is None:
+            collision += triangles(obj, obj.visual_lod)
+        elif isinstance(obj.collision, CollisionProxy):
+            if obj.collision.kind == "mesh":
+                collision += triangles(obj, obj.collision.lod)
+        elif obj.collision != "primitive":
+            collision += triangles(obj, obj.collision)
+    return visual, collision
@@ -0,0 +1,214 @@
+import math
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .assets import AssetWriter
+from .batch import ShapeBatch, format_color, parse_color
+from .geometry import rotation_matrices
+from .meshes import Mesh, lod_resolution
+from .shapes import POSE_FIELDS, Shape
+
+MERGE_MODES = ("links", "mesh")
+
+# A cell's shapes, as (shape, None) for Shape objects and (batch, row indices) for ShapeBatch rows
+Part = Tuple[Any, Optional[np.ndarray]]
+
+
+def bake_mesh(shape_cls: type, dimensions: np.ndarray, poses: np.ndarray, lod: Optional[int] = None,
+              origin: Tuple[float, float, float] = (0, 0, 0)) -> Mesh:
+    """
+    Single mesh of N shapes of one class from (N, D) dimensions and (N, 6) poses, in a frame placed at
+    origin. Classes with a unit_scale build their unit mesh once and scale, rotate and translate it for
+    all shapes in one step, others build a mesh per distinct set of dimensions.
+    """
+    resolution = lod_resolution(getattr(shape_cls, "mesh_name", None), lod)
+    scales = shape_cls.unit_scale(*dimensions.T)
+    if scales is not None:
+        groups = [(shape_cls.build_mesh(*[1.0] * dimensions.shape[1], **resolution), np.arange(len(dimensions)),
+                   np.stack(np.broadcast_arrays(*scales), axis=-1))]
+    else:
+        unique, inverse = np.unique(dimensions, axis=0, return_inverse=True)
+        groups = [(shape_cls.build_mesh(*dims, **resolution), np.flatnonzero(inverse.ravel() == k), np.ones((1, 3)))
+                  for k, dims in enumerate(unique.tolist())]
+    vertex_blocks, face_blocks, offset = [], [], 0
+    for (vertices, faces), rows, scale in groups:
+        pose = poses[rows]
+        rotation = rotation_matrices(pose[:, 3], pose[:, 4], pose[:, 5])
+        placed = np.einsum("nij,nvj->nvi", rotation, vertices[None] * scale[:, None, :])
+        vertex_blocks.append((placed + (pose[:, None, :3] - np.asarray(origin))).reshape(-1, 3))
+        starts = offset + np.arange(len(rows)) * len(vertices)
+        face_blocks.append((faces[None] + starts[:, None, None]).reshape(-1, 3))
+        offset += len(rows) * len(vertices)
+    return np.vstack(vertex_blocks), np.vstack(face_blocks)
+
+
+class MergedModel:
+    """
+    The static shapes of one spatial cell exported as a single model.
+
+    In "links" mode every shape becomes a link of the model, with the shape's name, pose, geometry and
+    material, so the world has one model per cell but looks and collides exactly as before. In "mesh"
+    mode the geometry of all shapes with the same color is baked into one mesh, used by one visual and
+    one collision per color. The meshes are written to mesh_dir on export, through writer if given,
+    and referenced by absolute file:// URIs.
+    """
+
+    def __init__(self, name: str, parts: List[Part], mode: str = "links", origin: Tuple[float, float, float] = (0, 0, 0),
+                 mesh_dir: str = "merged_meshes", extension: str = ".dae", writer: Optional[AssetWriter] = None):
+        if mode not in MERGE_MODES:
+            raise ValueError(f"Unknown merge mode {mode!r}, expected one of {MERGE_MODES}")
+        self.name = name
+        self.parts = parts
+        self.mode = mode
+        self.origin = tuple(origin)
+        self.mesh_dir = mesh_dir
+        self.extension = extension
+        self.writer = writer or AssetWriter(workers=0)
+
+    def __len__(self) -> int:
+        return sum(1 if rows is None else len(rows) for _, rows in self.parts)
+
+    def iter_shapes(self) -> Iterator[Shape]:
+        for obj, rows in self.parts:
+            if rows is None:
+                yield obj
+            else:
+                for i in rows.tolist():
+                    yield obj.shape_at(i)
+
+    def groups(self) -> Dict[str, List[Tuple[type, Optional[int], np.ndarray, np.ndarray]]]:
+        """
+        The shapes by color, as lists of (class, visual_lod, dimensions, poses) with stacked arrays.
+        Colors are compared by value, so '1 0 0 1' and '1.0 0.0 0.0 1.0' share a group.
+        """
+        single: Dict[Tuple[str, type, Optional[int]], List[Shape]] = {}
+        grouped: Dict[tuple, List[Tuple[type, Optional[int], np.ndarray, np.ndarray]]] = {}
+        spelling: Dict[tuple, str] = {}
+        for obj, rows in self.parts:
+            if rows is None:
+                single.setdefault((obj.color, type(obj), getattr(obj, "visual_lod", None)), []).append(obj)
+                continue
+            colors, inverse = np.unique(obj.colors[rows], axis=0, return_inverse=True)
+            lod = getattr(obj.shape_cls, "visual_lod", None)
+            for k, rgba in enumerate(colors):
+                color = format_color(rgba)
+                key = parse_color(color)
+                spelling.setdefault(key, color)
+                selected = rows[inverse.ravel() == k]
+                grouped.setdefault(key, []).append((obj.shape_cls, lod, obj.dimensions[selected], obj.poses[selected]))
+        for (color, shape_cls, lod), shapes in single.items():
+            key = parse_color(color)
+            spelling.setdefault(key, color)
+            dimensions = np.array([[getattr(s, d) for d in shape_cls.dimension_names] for s in shapes], dtype=np.float64)
+            poses = np.array([[getattr(s, p) for p in POSE_FIELDS] for s in shapes], dtype=np.float64)
+            grouped.setdefault(key, []).append((shape_cls, lod, dimensions, poses))
+        return {spelling[key]: members for key, members in grouped.items()}
+
+    def mesh_path(self, index: int) -> str:
+        return os.path.abspath(os.path.join(self.mesh_dir, f"{self.name}_{index}{self.extension}"))
+
+    def write_meshes(self) -> List[Tuple[str, str]]:
+        """
+        Bakes and writes the mesh of each color, returns their (color, path).
+        """
+        written = []
+        for k, (color, members) in enumerate(self.groups().items()):
+            path = self.mesh_path(k)
+            self.writer.save_mesh(_concatenate([bake_mesh(shape_cls, dims, poses, lod, self.origin) for shape_cls, lod, dims, poses in members]), path)
+            written.append((color, path))
+        return written
+
+    def get_links_xml(self) -> str:
+        links = [shape.get_link_xml(shape.name, f"\n    <pose>{shape.x} {shape.y} {shape.z} {shape.roll} {shape.pitch} {shape.yaw}</pose>")
+                 for shape in self.iter_shapes()]
+        return "\n".join(links)
+
+    def get_mesh_link_xml(self) -> str:
+        elements = []
+        for k, (color, path) in enumerate(self.write_meshes()):
+            geometry_xml = f"""
+      <geometry>
+        <mesh>
+          <uri>file://{path}</uri>
+        </mesh>
+      </geometry>"""
+            elements.append(f"""
+    <collision name="collision_{k}">{geometry_xml}
+    </collision>
+    <visual name="visual_{k}">{geometry_xml}
+      <material>
+        <ambient>{color}</ambient>
+        <diffuse>{color}</diffuse>
+      </material>
+    </visual>""")
+        return f"""  <link name="link">{"".join(elements)}
+  </link>"""
+
+    def get_gz_xml(self) -> str:
+        links_xml = self.get_links_xml() if self.mode == "links" else self.get_mesh_link_xml()
+        x, y, z = self.origin
+        return f"""
+<model name="{self.name}">
+  <static>true</static>
+  <pose>{x} {y} {z} 0 0 0</pose>
+{links_xml}
+</model>
+"""
+
+
+def _concatenate(parts: List[Mesh]) -> Mesh:
+    offsets = np.cumsum([0] + [len(vertices) for vertices, _ in parts[:-1]])
+    return np.vstack([vertices for vertices, _ in parts]), np.vstack([faces + o for (_, faces), o in zip(parts, offsets.tolist())])
+
+
+class StaticMerger:
+    """
+    Groups the shapes of a world by the cell_size x cell_size cell of the xy plane their origin is in
+    and exports each cell as one MergedModel, in the given mode. Gazebo's load and update times grow
+    with the number of models, so merging many small static shapes shortens both. Objects other than
+    shapes and ShapeBatches, such as terrain, are exported unchanged. Meshes are written through writer.
+    """
+
+    def __init__(self, cell_size: float = 10.0, mode: str = "links", mesh_dir: str = "merged_meshes",
+                 extension: str = ".dae", prefix: str = "merged", writer: Optional[AssetWriter] = None):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        if mode not in MERGE_MODES:
+            raise ValueError(f"Unknown merge mode {mode!r}, expected one of {MERGE_MODES}")
+        self.cell_size = cell_size
+        self.mode = mode
+        self.mesh_dir = mesh_dir
+        self.extension = extension
+        self.prefix = prefix
+        self.writer = writer
+
+    def merge_objects(self, objects: Iterable[Any]) -> List[Any]:
+        """
+        Returns the objects that can't be merged, followed by one MergedModel per occupied cell in
+        cell order.
+        """
+        size = self.cell_size
+        unmerged = []
+        cells: Dict[Tuple[int, int], List[Part]] = {}
+        for obj in objects:
+            if isinstance(obj, Shape):
+                cells.setdefault((math.floor(obj.x / size), math.floor(obj.y / size)), []).append((obj, None))
+            elif isinstance(obj, ShapeBatch):
+                if not len(obj):
+                    continue
+                keys = np.floor(obj.poses[:, :2] / size).astype(np.int64)
+                unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+                order = np.argsort(inverse.ravel(), kind="stable")
+                bounds = np.cumsum(np.bincount(inverse.ravel(), minlength=len(unique)))[:-1]
+                for (i, j), rows in zip(unique.tolist(), np.split(order, bounds)):
+                    cells.setdefault((i, j), []).append((obj, rows))
+            else:
+                unmerged.append(obj)
+        merged = []
+        for (i, j), parts in sorted(cells.items()):
+            origin = (0, 0, 0) if self.mode == "links" else ((i + 0.5) * size, (j + 0.5) * size, 0)
+            merged.append(MergedModel(f"{self.prefix}_{i}_{j}", parts, self.mode, origin, self.mesh_dir, self.extension,
+                                      self.writer))
+        return unmerged + merged
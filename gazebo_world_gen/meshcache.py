@@ -0,0 +1,100 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence
+
+from .meshes import Mesh, save_mesh
+
+# Bumped when the mesh builders change, so meshes cached by older versions are not reused
+MESH_VERSION = 2
+
+
+class MeshCache:
+    """
+    On-disk cache of generated meshes, one file per distinct set of parameters.
+
+    Files are named after a hash of the mesh kind, its parameters and MESH_VERSION, so equal shapes
+    share a file and a cache directory can be kept between runs. When the files take more than
+    max_bytes, the least recently used ones are deleted, so max_bytes should hold at least the meshes
+    of one world. Lookups of parameters seen before in this process don't touch the disk.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 << 20, extension: str = ".dae"):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._paths: Dict[tuple, str] = {}
+        os.makedirs(self.directory, exist_ok=True)
+        # Files in least recently used order, path -> size
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        entries = [e for e in os.scandir(self.directory) if e.is_file() and e.name.endswith(extension) and not e.name.startswith(".")]
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            self._files[entry.path] = entry.stat().st_size
+        self.total_bytes = sum(self._files.values())
+
+    def key(self, kind: str, params: Sequence[float]) -> str:
+        return hashlib.blake2b(repr((kind, tuple(map(float, params)), MESH_VERSION)).encode(), digest_size=10).hexdigest()
+
+    def get(self, kind: str, params: Sequence[float], build: Callable[..., Mesh]) -> str:
+        """
+        Returns the path of the mesh build(*params), generating and storing it if it is not cached.
+        """
+        memo_key = (kind, tuple(params))
+        path = self._paths.get(memo_key)
+        if path is not None and path in self._files:
+            self.hits += 1
+            self._files.move_to_end(path)
+            return path
+
+        path = os.path.join(self.directory, f"{kind}_{self.key(kind, params)}{self.extension}")
+        if path in self._files:
+            self.hits += 1
+            self._files.move_to_end(path)
+            # Keep the file's position in the LRU order for the next process
+            os.utime(path)
+        else:
+            self.misses += 1
+            fd, tmp = tempfile.mkstemp(prefix=".", suffix=self.extension, dir=self.directory)
+            os.close(fd)
+            try:
+                save_mesh(build(*params), tmp)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._files[path] = os.path.getsize(path)
+            self.total_bytes += self._files[path]
+            self._evict(keep=path)
+        self._paths[memo_key] = path
+        return path
+
+    def uri(self, kind: str, params: Sequence[float], build: Callable[..., Mesh]) -> str:
+        return "file://" + self.get(kind, params, build)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        while self.total_bytes > self.max_bytes and len(self._files) > 1:
+            path, size = next(iter(self._files.items()))
+            if path == keep:
+                break
+            del self._files[path]
+            self.total_bytes -= size
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        for path in self._files:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._files.clear()
+        self._paths.clear()
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._files)
@@ -0,0 +1,313 @@
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+Mesh = Tuple[np.ndarray, np.ndarray]
+
+STL_DTYPE = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")])
+
+# Builder arguments of each level of detail of the meshes that have a resolution, finest first.
+# Level 1 is the tessellation of the default meshes in gazebo_models.
+LOD_LEVELS = {
+    "ellipsoid": [
+        {"segments": 64, "rings": 32, "weld_poles": True},
+        {"segments": 32, "rings": 16, "weld_poles": True},
+        {"segments": 16, "rings": 8, "weld_poles": True},
+        {"segments": 8, "rings": 5, "weld_poles": True},
+    ],
+    "cone": [{"sections": 64}, {"sections": 32}, {"sections": 16}, {"sections": 8}],
+}
+
+
+def lod_resolution(mesh_name: Optional[str], lod: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Builder arguments of level lod of mesh_name, level 1 like the default meshes when lod is None,
+    the coarsest level past the last one, and no arguments for meshes without levels.
+    """
+    levels = LOD_LEVELS.get(mesh_name)
+    if not levels:
+        return {}
+    return levels[1 if lod is None else min(lod, len(levels) - 1)]
+
+
+def _grid_faces(rows: int, cols: int, wrap: bool = False) -> np.ndarray:
+    """
+    Two triangles per quad of a rows x cols vertex grid stored row by row, wound counterclockwise
+    seen from outside when rows run from top to bottom and columns counterclockwise. With wrap the
+    last column connects back to the first.
+    """
+    ncols = cols if wrap else cols - 1
+    i, j = np.meshgrid(np.arange(rows - 1), np.arange(ncols), indexing="ij")
+    a = i * cols + j
+    b = i * cols + (j + 1) % cols
+    c, d = a + cols, b + cols
+    faces = np.stack([np.stack([a, c, b], axis=-1), np.stack([b, c, d], axis=-1)], axis=2)
+    return faces.reshape(-1, 3)
+
+
+def ellipsoid_mesh(radius_x: float = 1.0, radius_y: float = 1.0, radius_z: float = 1.0,
+                   segments: int = 32, rings: int = 16, weld_poles: bool = False) -> Mesh:
+    """
+    Latitude-longitude ellipsoid centered on the origin, as (vertices, faces) arrays, with segments
+    vertices around and rings from pole to pole.
+
+    By default it has the vertex layout of the ellipsoid model of generate_models.py: a full grid
+    with a duplicated seam column and segments copies of each pole. With weld_poles each pole is a
+    single vertex, the seam is closed and the degenerate triangles at the poles are dropped, which
+    gives a watertight mesh with about as many vertices and faces as the default one.
+    """
+    if segments < 3 or rings < 3:
+        raise ValueError("An ellipsoid needs at least 3 segments and 3 rings")
+    if not weld_poles:
+        u = np.linspace(0, 2 * np.pi, segments)
+        v = np.linspace(0, np.pi, rings)
+        x = radius_x * np.outer(np.sin(v), np.cos(u))
+        y = radius_y * np.outer(np.sin(v), np.sin(u))
+        z = radius_z * np.outer(np.cos(v), np.ones(segments))
+        vertices = np.stack((x.ravel(), y.ravel(), z.ravel()), axis=-1)
+        return vertices, _grid_faces(rings, segments)
+
+    u = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    v = np.linspace(0, np.pi, rings)[1:-1]
+    x = radius_x * np.outer(np.sin(v), np.cos(u))
+    y = radius_y * np.outer(np.sin(v), np.sin(u))
+    z = radius_z * np.outer(np.cos(v), np.ones(segments))
+    body = np.stack((x.ravel(), y.ravel(), z.ravel()), axis=-1)
+    top, bottom = len(body), len(body) + 1
+    vertices = np.vstack([body, [[0, 0, radius_z], [0, 0, -radius_z]]])
+    k = np.arange(segments)
+    last = (rings - 3) * segments
+    faces = np.vstack([
+        np.stack([np.full(segments, top), k, (k + 1) % segments], axis=-1),
+        _grid_faces(rings - 2, segments, wrap=True),
+        np.stack([np.full(segments, bottom), last + (k + 1) % segments, last + k], axis=-1),
+    ])
+    return vertices, faces
+
+
+def tetrahedron_mesh(width: float = 1.0, depth: float = 1.0, height: float = 1.0) -> Mesh:
+    """
+    Tetrahedron standing on the z = 0 plane with its apex at height.
+    """
+    vertices = np.array([
+        [0, 0, height],
+        [width / 2, depth / 2, 0],
+        [-width / 2, depth / 2, 0],
+        [0, -depth / 2, 0],
+    ], dtype=np.float64)
+    faces = np.array([[0, 1, 2], [0, 2, 3], [0, 3, 1], [1, 3, 2]])
+    return vertices, faces
+
+
+def square_pyramid_mesh(width: float = 1.0, depth: float = 1.0, height: float = 1.0) -> Mesh:
+    """
+    Pyramid with a width x depth base on the z = 0 plane and its apex at height.
+    """
+    vertices = np.array([
+        [0, 0, height],
+        [width / 2, depth / 2, 0],
+        [-width / 2, depth / 2, 0],
+        [-width / 2, -depth / 2, 0],
+        [width / 2, -depth / 2, 0],
+    ], dtype=np.float64)
+    faces = np.array([[0, 1, 2], [0, 2, 3], [0, 3, 4], [0, 4, 1], [1, 3, 2], [3, 1, 4]])
+    return vertices, faces
+
+
+def cone_mesh(radius: float = 1.0, height: float = 1.0, sections: int = 32) -> Mesh:
+    """
+    Cone with its base centered on the origin and its apex at height, like trimesh.creation.cone.
+    """
+    if sections < 3:
+        raise ValueError("A cone needs at least 3 sections")
+    angles = np.linspace(0, 2 * np.pi, sections, endpoint=False)
+    ring = np.stack([radius * np.cos(angles), radius * np.sin(angles), np.zeros(sections)], axis=-1)
+    vertices = np.vstack([ring, [[0, 0, height], [0, 0, 0]]])
+    k = np.arange(sections)
+    apex, center = sections, sections + 1
+    side = np.stack([k, (k + 1) % sections, np.full(sections, apex)], axis=-1)
+    base = np.stack([(k + 1) % sections, k, np.full(sections, center)], axis=-1)
+    return vertices, np.vstack([side, base])
+
+
+def box_mesh(size_x: float = 1.0, size_y: float = 1.0, size_z: float = 1.0) -> Mesh:
+    """
+    Box centered on the origin with the given extents along x, y and z.
+    """
+    corners = np.array([[x, y, z] for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)])
+    vertices = corners * np.array([size_x, size_y, size_z], dtype=np.float64)
+    faces = np.array([
+        [0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5],
+        [0, 4, 5], [0, 5, 1], [2, 3, 7], [2, 7, 6],
+        [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3],
+    ])
+    return vertices, faces
+
+
+def cylinder_mesh(radius: float = 1.0, length: float = 1.0, sections: int = 32) -> Mesh:
+    """
+    Cylinder centered on the origin along the z axis, like the SDF cylinder geometry.
+    """
+    if sections < 3:
+        raise ValueError("A cylinder needs at least 3 sections")
+    angles = np.linspace(0, 2 * np.pi, sections, endpoint=False)
+    ring = np.stack([radius * np.cos(angles), radius * np.sin(angles), np.zeros(sections)], axis=-1)
+    bottom, top = ring - [0, 0, length / 2], ring + [0, 0, length / 2]
+    vertices = np.vstack([bottom, top, [[0, 0, -length / 2], [0, 0, length / 2]]])
+    k = np.arange(sections)
+    n = (k + 1) % sections
+    low, high = 2 * sections, 2 * sections + 1
+    faces = np.vstack([
+        np.stack([k, n, sections + n], axis=-1),
+        np.stack([k, sections + n, sections + k], axis=-1),
+        np.stack([n, k, np.full(sections, low)], axis=-1),
+        np.stack([sections + k, sections + n, np.full(sections, high)], axis=-1),
+    ])
+    return vertices, faces
+
+
+def face_normals(mesh: Mesh) -> np.ndarray:
+    """
+    Unit normals of all faces, zero for degenerate ones.
+    """
+    vertices, faces = mesh
+    a, b, c = vertices[faces[:, 0]], vertices[faces[:, 1]], vertices[faces[:, 2]]
+    normals = np.cross(b - a, c - a)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+
+
+def vertex_normals(mesh: Mesh) -> np.ndarray:
+    """
+    Unit vertex normals, averaged from the normals of the adjacent faces weighted by their area.
+    """
+    vertices, faces = mesh
+    a, b, c = vertices[faces[:, 0]], vertices[faces[:, 1]], vertices[faces[:, 2]]
+    weighted = np.cross(b - a, c - a)
+    normals = np.zeros_like(vertices, dtype=np.float64)
+    for corner in range(3):
+        np.add.at(normals, faces[:, corner], weighted)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+
+
+def write_stl(mesh: Mesh, filename: str) -> None:
+    """
+    Writes a binary STL file.
+    """
+    vertices, faces = mesh
+    records = np.zeros(len(faces), dtype=STL_DTYPE)
+    records["normal"] = face_normals(mesh)
+    records["vertices"] = vertices[faces]
+    with open(filename, "wb") as f:
+        f.write(b"gazebo_world_gen".ljust(80, b" "))
+        f.write(np.uint32(len(faces)).tobytes())
+        records.tofile(f)
+
+
+def _join_numbers(values: np.ndarray) -> str:
+    # Nine significant digits round trip through the single precision floats mesh loaders use
+    return " ".join(map("%.9g".__mod__, values.ravel().tolist()))
+
+
+def write_obj(mesh: Mesh, filename: str) -> None:
+    """
+    Writes a Wavefront OBJ file.
+    """
+    vertices, faces = mesh
+    lines = ["v %.9g %.9g %.9g" % v for v in map(tuple, vertices.tolist())]
+    lines += ["f %d %d %d" % f for f in map(tuple, (faces + 1).tolist())]
+    with open(filename, "w") as f:
+        f.write("\n".join(lines))
+        f.write("\n")
+
+
+def write_dae(mesh: Mesh, filename: str, name: str = "mesh", smooth: bool = False) -> None:
+    """
+    Writes a COLLADA 1.4.1 file with a single triangle mesh, without going through trimesh and
+    pycollada. Faces are flat shaded unless smooth is set, which uses vertex normals instead and
+    gives a smaller file.
+    """
+    vertices, faces = mesh
+    if smooth:
+        normals = vertex_normals(mesh)
+        indices = np.stack([faces, faces], axis=-1)
+    else:
+        normals = face_normals(mesh)
+        # Each triangle corner references a vertex and the normal of its face
+        indices = np.stack([faces, np.repeat(np.arange(len(faces))[:, None], 3, axis=1)], axis=-1)
+    content = f"""<?xml version="1.0" encoding="utf-8"?>
+<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">
+  <asset>
+    <unit name="meter" meter="1"/>
+    <up_axis>Z_UP</up_axis>
+  </asset>
+  <library_geometries>
+    <geometry id="{name}-mesh" name="{name}">
+      <mesh>
+        <source id="{name}-positions">
+          <float_array id="{name}-positions-array" count="{vertices.size}">{_join_numbers(vertices)}</float_array>
+          <technique_common>
+            <accessor source="#{name}-positions-array" count="{len(vertices)}" stride="3">
+              <param name="X" type="float"/>
+              <param name="Y" type="float"/>
+              <param name="Z" type="float"/>
+            </accessor>
+          </technique_common>
+        </source>
+        <source id="{name}-normals">
+          <float_array id="{name}-normals-array" count="{normals.size}">{_join_numbers(normals)}</float_array>
+          <technique_common>
+            <accessor source="#{name}-normals-array" count="{len(normals)}" stride="3">
+              <param name="X" type="float"/>
+              <param name="Y" type="float"/>
+              <param name="Z" type="float"/>
+            </accessor>
+          </technique_common>
+        </source>
+        <vertices id="{name}-vertices">
+          <input semantic="POSITION" source="#{name}-positions"/>
+        </vertices>
+        <triangles count="{len(faces)}">
+          <input semantic="VERTEX" source="#{name}-vertices" offset="0"/>
+          <input semantic="NORMAL" source="#{name}-normals" offset="1"/>
+          <p>{" ".join(map(str, indices.ravel().tolist()))}</p>
+        </triangles>
+      </mesh>
+    </geometry>
+  </library_geometries>
+  <library_visual_scenes>
+    <visual_scene id="scene">
+      <node id="{name}" name="{name}">
+        <instance_geometry url="#{name}-mesh"/>
+      </node>
+    </visual_scene>
+  </library_visual_scenes>
+  <scene>
+    <instance_visual_scene url="#scene"/>
+  </scene>
+</COLLADA>
+"""
+    with open(filename, "w") as f:
+        f.write(content)
+
+
+MESH_WRITERS = {".stl": write_stl, ".obj": write_obj, ".dae": write_dae}
+
+
+def save_mesh(mesh: Mesh, filename: str, **options) -> None:
+    """
+    Writes a mesh in the format given by the file extension. STL, OBJ and DAE are written directly
+    and take the options of their writer, other formats go through trimesh.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in MESH_WRITERS:
+        MESH_WRITERS[extension](mesh, filename, **options)
+        return
+    try:
+        import trimesh
+    except ImportError:
+        raise ImportError(f"Saving {extension} meshes requires trimesh") from None
+    vertices, faces = mesh
+    trimesh.Trimesh(vertices=vertices, faces=faces, process=False).export(filename, file_type=extension[1:])
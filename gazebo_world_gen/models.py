@@ -0,0 +1,300 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .assets import DEFAULT_WORKERS, AssetWriter
+
+# Stamp file written in each model directory after a successful build
+STAMP_FILE = ".build.json"
+# Modules whose code decides what the built files contain, changes to them rebuild every model
+_BUILD_MODULES = ("models.py", "meshes.py", "lod.py", "shapes.py")
+# Mesh builder in meshes.py of each kind of model
+MESH_BUILDERS = {
+    "ellipsoid": "ellipsoid_mesh",
+    "tetrahedron": "tetrahedron_mesh",
+    "square_pyramid": "square_pyramid_mesh",
+    "cone": "cone_mesh",
+}
+
+_code_digest: Optional[str] = None
+
+
+class ModelSpec:
+    """
+    One model to build: a mesh of kind built from dimensions and the builder's resolution options,
+    written as model name with the given scale and color. With lod the meshes of every level in
+    meshes.LOD_LEVELS are written next to it.
+    """
+
+    def __init__(self, name: str, kind: str, dimensions: Sequence[float], options: Optional[Dict[str, Any]] = None,
+                 scale: Sequence[float] = (1, 1, 1), color: str = '0.5 0.5 0.5 1.0', smooth: bool = False, lod: bool = False):
+        if kind not in MESH_BUILDERS:
+            raise ValueError(f"Unknown model kind {kind!r}, expected one of {tuple(MESH_BUILDERS)}")
+        self.name = name
+        self.kind = kind
+        self.dimensions = tuple(dimensions)
+        self.options = dict(options or {})
+        self.scale = tuple(scale)
+        self.color = color
+        self.smooth = smooth
+        self.lod = lod
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"name": self.name, "kind": self.kind, "dimensions": self.dimensions, "options": self.options,
+                "scale": self.scale, "color": self.color, "smooth": self.smooth, "lod": self.lod}
+
+    def digest(self) -> str:
+        """
+        Hash of the parameters and of the code of the modules that build the model.
+        """
+        parameters = json.dumps(self.parameters(), sort_keys=True).encode()
+        return hashlib.blake2b(parameters + code_digest().encode(), digest_size=16).hexdigest()
+
+
+DEFAULT_MODELS = (
+    ModelSpec("ellipsoid", "ellipsoid", (1.0, 1.0, 1.0), {"segments": 32, "rings": 16, "weld_poles": True},
+              color='1 1 1 1', smooth=True, lod=True),
+    ModelSpec("tetrahedron", "tetrahedron", (1.0, 1.0, 1.0), color='1 1 1 1'),
+    ModelSpec("square_pyramid", "square_pyramid", (1.0, 1.0, 1.0), color='1 1 1 1'),
+    ModelSpec("cone", "cone", (1.0, 1.0), {"sections": 32}, color='1 1 1 1', lod=True),
+)
+
+
+def code_digest() -> str:
+    global _code_digest
+    if _code_digest is None:
+        digest = hashlib.blake2b(digest_size=16)
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        for module in _BUILD_MODULES:
+            with open(os.path.join(package_dir, module), "rb") as f:
+                digest.update(f.read())
+        _code_digest = digest.hexdigest()
+    return _code_digest
+
+
+def create_model_directory(model_name: str, output_dir: str = "gazebo_models") -> str:
+    directory = os.path.join(output_dir, model_name, "meshes")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def model_config(model_name: str, author: bool = True) -> str:
+    """
+    The model.config of a model, with the placeholder author of the built models unless author is False.
+    """
+    author_xml = """  <author>
+    <name>Your Name</name>
+    <email>your.email@example.com</email>
+  </author>
+""" if author else ""
+    return f"""<?xml version="1.0" ?>
+<model>
+  <name>{model_name}</name>
+  <version>1.0</version>
+  <sdf version="1.6">model.sdf</sdf>
+{author_xml}  <description>
+    {model_name} model
+  </description>
+</model>
+"""
+
+
+def write_model_config(model_name: str, parent_directory: str, writer: Optional[AssetWriter] = None,
+                       author: bool = True, only_if_changed: bool = False) -> Future:
+    return (writer or AssetWriter(workers=0)).write_text(os.path.join(parent_directory, 'model.config'),
+                                                          model_config(model_name, author), only_if_changed)
+
+
+def model_sdf(model_name: str, dae_file: str, scale: Sequence[float] = (1, 1, 1), color: str = '0.5 0.5 0.5 1.0') -> str:
+    return f"""<?xml version="1.0" ?>
+<sdf version="1.6">
+  <model name="{model_name}">
+    <static>true</static>
+    <link name="link">
+      <visual name="visual">
+        <geometry>
+          <mesh>
+            <uri>model://{model_name}/meshes/{dae_file}</uri>
+            <scale>{' '.join(map(str, scale))}</scale>
+          </mesh>
+        </geometry>
+        <material>
+          <ambient>{color}</ambient>
+          <diffuse>{color}</diffuse>
+        </material>
+      </visual>
+      <collision name="collision">
+        <geometry>
+          <mesh>
+            <uri>model://{model_name}/meshes/{dae_file}</uri>
+            <scale>{' '.join(map(str, scale))}</scale>
+          </mesh>
+        </geometry>
+      </collision>
+    </link>
+  </model>
+</sdf>
+"""
+
+
+def write_model_sdf(model_name: str, parent_directory: str, dae_file: str, scale: Sequence[float] = (1, 1, 1),
+                    color: str = '0.5 0.5 0.5 1.0', writer: Optional[AssetWriter] = None) -> Future:
+    return (writer or AssetWriter(workers=0)).write_text(os.path.join(parent_directory, 'model.sdf'),
+                                                          model_sdf(model_name, dae_file, scale, color))
+
+
+def save_collada(mesh: Any, directory: str, name: str, smooth: bool = False, writer: Optional[AssetWriter] = None) -> str:
+    dae_file = f'{name}.dae'
+    (writer or AssetWriter(workers=0)).save_mesh(mesh, os.path.join(directory, dae_file), smooth=smooth)
+    return dae_file
+
+
+def submit_model(spec: ModelSpec, output_dir: str, writer: AssetWriter) -> List[str]:
+    """
+    Builds the meshes of spec and submits the files of the model to writer, all but its stamp file.
+    Returns their paths relative to the model directory.
+    """
+    from . import meshes
+
+    parent_directory = os.path.join(output_dir, spec.name)
+    mesh = getattr(meshes, MESH_BUILDERS[spec.kind])(*spec.dimensions, **spec.options)
+    dae_file = save_collada(mesh, os.path.join(parent_directory, "meshes"), spec.name, spec.smooth, writer)
+    write_model_config(spec.name, parent_directory, writer)
+    write_model_sdf(spec.name, parent_directory, dae_file, spec.scale, spec.color, writer)
+    outputs = ["model.config", "model.sdf", f"meshes/{dae_file}"]
+    if spec.lod:
+        from .lod import write_lod_meshes
+
+        outputs += [os.path.relpath(path, parent_directory).replace(os.sep, "/")
+                    for path in write_lod_meshes(spec.kind, output_dir, spec.name, writer)]
+    return outputs
+
+
+def write_stamp(spec: ModelSpec, output_dir: str, outputs: List[str], writer: Optional[AssetWriter] = None) -> Future:
+    return (writer or AssetWriter(workers=0)).write_text(os.path.join(output_dir, spec.name, STAMP_FILE),
+                                                          json.dumps({"digest": spec.digest(), "outputs": outputs}))
+
+
+def build_model(spec: ModelSpec, output_dir: str = "gazebo_models", writer: Optional[AssetWriter] = None) -> List[str]:
+    """
+    Builds the model of spec in output_dir through writer, or a writer of its own, then writes its
+    stamp file. Returns the paths of the written files, relative to the model directory.
+    """
+    own_writer = writer is None
+    writer = writer or AssetWriter()
+    try:
+        outputs = submit_model(spec, output_dir, writer)
+        # The stamp is written last, so an interrupted build is redone
+        writer.wait()
+        write_stamp(spec, output_dir, outputs, writer)
+    finally:
+        if own_writer:
+            writer.close()
+    return outputs
+
+
+def is_up_to_date(spec: ModelSpec, output_dir: str = "gazebo_models") -> bool:
+    """
+    Whether the model of spec was built with the same parameters and code and all its files still exist.
+    """
+    parent_directory = os.path.join(output_dir, spec.name)
+    try:
+        with open(os.path.join(parent_directory, STAMP_FILE)) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return stamp.get("digest") == spec.digest() and all(
+        os.path.exists(os.path.join(parent_directory, output)) for output in stamp.get("outputs", ()))
+
+
+def _build_in_process(spec: ModelSpec, output_dir: str) -> Dict[str, Any]:
+    with AssetWriter() as writer:
+        build_model(spec, output_dir, writer)
+    return writer.stats()
+
+
+def generate_models(output_dir: str = "gazebo_models", specs: Sequence[ModelSpec] = DEFAULT_MODELS, workers: int = 1,
+                    force: bool = False, writer: Optional[AssetWriter] = None) -> List[str]:
+    """
+    Builds the models in specs that are missing or out of date, all of them with force, and returns
+    their names. Meshes are built in a process pool with workers > 1, else in this process while
+    writer, or a writer of its own, writes the files of the models built before. The stamp files
+    are written once all other files are.
+    """
+    pending = [spec for spec in specs if force or not is_up_to_date(spec, output_dir)]
+    if workers > 1 and len(pending) > 1:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context) as pool:
+            for stats in pool.map(_build_in_process, pending, [output_dir] * len(pending)):
+                if writer is not None:
+                    writer.add_stats(stats)
+        return [spec.name for spec in pending]
+    own_writer = writer is None
+    writer = writer or AssetWriter()
+    try:
+        outputs = [submit_model(spec, output_dir, writer) for spec in pending]
+        writer.wait()
+        for spec, spec_outputs in zip(pending, outputs):
+            write_stamp(spec, output_dir, spec_outputs, writer)
+        writer.wait()
+    finally:
+        if own_writer:
+            writer.close()
+    return [spec.name for spec in pending]
+
+
+def _create(kind: str, dimensions: Sequence[float], options: Dict[str, Any], name: str, scale: Sequence[float], color: str,
+            output_dir: str, smooth: bool = False) -> None:
+    build_model(ModelSpec(name, kind, dimensions, options, scale, color, smooth), output_dir)
+
+
+def create_ellipsoid(rx, ry, rz, name="ellipsoid", scale=(1, 1, 1), color='0.5 0.5 0.5 1.0', output_dir="gazebo_models"):
+    _create("ellipsoid", (rx, ry, rz), {"segments": 32, "rings": 16, "weld_poles": True}, name, scale, color, output_dir, smooth=True)
+
+
+def create_tetrahedron(width, depth, height, name="tetrahedron", scale=(1, 1, 1), color='0.5 0.5 0.5 1.0', output_dir="gazebo_models"):
+    _create("tetrahedron", (width, depth, height), {}, name, scale, color, output_dir)
+
+
+def create_square_pyramid(width, depth, height, name="square_pyramid", scale=(1, 1, 1), color='0.5 0.5 0.5 1.0', output_dir="gazebo_models"):
+    _create("square_pyramid", (width, depth, height), {}, name, scale, color, output_dir)
+
+
+def create_cone(radius, height, name="cone", scale=(1, 1, 1), color='0.5 0.5 0.5 1.0', output_dir="gazebo_models"):
+    _create("cone", (radius, height), {"sections": 32}, name, scale, color, output_dir)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point, e.g. python -m gazebo_world_gen.models --workers 4. Importing this
+    module does not import NumPy, the mesh code is only loaded when a model is actually built.
+    """
+    parser = argparse.ArgumentParser(description="Builds the Gazebo models of the mesh shapes that are missing or out of date.")
+    parser.add_argument("--output-dir", default="gazebo_models")
+    parser.add_argument("--workers", type=int, default=1, help="models built in parallel")
+    parser.add_argument("--force", action="store_true", help="rebuild models that are up to date")
+    parser.add_argument("--only", nargs="+", choices=[spec.name for spec in DEFAULT_MODELS], help="build only these models")
+    parser.add_argument("--write-threads", type=int, default=DEFAULT_WORKERS, help="threads writing the model files")
+    args = parser.parse_args(argv)
+    specs = [spec for spec in DEFAULT_MODELS if not args.only or spec.name in args.only]
+    start = time.perf_counter()
+    with AssetWriter(args.write_threads) as writer:
+        built = generate_models(args.output_dir, specs, args.workers, args.force, writer)
+    seconds = time.perf_counter() - start
+    skipped = len(specs) - len(built)
+    print(f"Built {len(built)} model(s) in {args.output_dir}" + (f": {', '.join(built)}" if built else "")
+          + (f", {skipped} up to date" if skipped else ""))
+    if built:
+        stats = writer.stats()
+        print(f"Wrote {stats['files']} files, {stats['bytes'] / 1e6:.2f} MB in {seconds:.2f} s "
+              f"({stats['bytes'] / 1e6 / seconds:.2f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import hashlib
+import itertools
+import uuid
+from typing import Any, Dict
+
+
+class UUIDNaming:
+    """
+    Legacy naming, every object gets a random uuid4. Names differ between runs.
+    """
+
+    def __call__(self, obj: Any) -> str:
+        return obj.name_prefix + '_' + str(uuid.uuid4())
+
+
+class CounterNaming:
+    """
+    Numbers objects in the order they are named, e.g. box_0, sphere_1, box_2.
+    Use one instance per world to get the same names every time the world is generated.
+    """
+
+    def __init__(self, start: int = 0):
+        self.start = start
+        self._counter = itertools.count(start)
+
+    def __call__(self, obj: Any) -> str:
+        return f"{obj.name_prefix}_{next(self._counter)}"
+
+
+class HashNaming:
+    """
+    Names objects by a seeded hash of their class, pose, dimensions and color, so a name only
+    depends on what the object is and not on when it was created. Identical objects get a
+    running suffix to keep names unique.
+    """
+
+    def __init__(self, seed: int = 0, digest_size: int = 8):
+        self.seed = seed
+        self.digest_size = digest_size
+        self._seen: Dict[str, int] = {}
+
+    def __call__(self, obj: Any) -> str:
+        digest = hashlib.blake2b(obj.naming_key(), digest_size=self.digest_size, salt=self.seed.to_bytes(16, "little", signed=True))
+        name = f"{obj.name_prefix}_{digest.hexdigest()}"
+        count = self._seen.get(name, 0)
+        self._seen[name] = count + 1
+        return name if count == 0 else f"{name}_{count}"
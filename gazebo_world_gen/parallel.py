@@ -0,0 +1,108 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from .batch import ShapeBatch
+from .render import CHUNK_SIZE
+
+# Work unit: (object index, object stop, row start, row stop). Row bounds are None unless
+# the unit is a row range of a single ShapeBatch.
+WorkUnit = Tuple[int, int, Optional[int], Optional[int]]
+
+# Objects of the world being exported, set in each worker process by _init_worker
+_objects: Sequence[Any] = ()
+
+
+def _init_worker(objects: Sequence[Any]) -> None:
+    global _objects
+    _objects = objects
+
+
+def render_unit(objects: Sequence[Any], unit: WorkUnit) -> str:
+    """
+    Renders the models of one work unit, separated by newlines like World.iter_gz_xml separates models.
+    """
+    index, stop, row_start, row_stop = unit
+    if row_start is not None:
+        return "\n".join(objects[index].iter_gz_xml(start=row_start, stop=row_stop))
+    models: List[str] = []
+    for obj in objects[index:stop]:
+        if hasattr(obj, "iter_gz_xml"):
+            models.extend(obj.iter_gz_xml())
+        else:
+            models.append(obj.get_gz_xml())
+    return "\n".join(models)
+
+
+def _render_unit_in_worker(unit: WorkUnit) -> str:
+    return render_unit(_objects, unit)
+
+
+def iter_work_units(objects: Sequence[Any], chunk_size: int = CHUNK_SIZE) -> Iterator[WorkUnit]:
+    """
+    Splits objects into units of about chunk_size models, splitting large ShapeBatches by rows.
+    """
+    run_start = None
+    for index, obj in enumerate(objects):
+        if isinstance(obj, ShapeBatch):
+            if run_start is not None:
+                yield (run_start, index, None, None)
+                run_start = None
+            for row_start in range(0, len(obj), chunk_size):
+                yield (index, index + 1, row_start, row_start + chunk_size)
+            continue
+        if run_start is None:
+            run_start = index
+        if index + 1 - run_start >= chunk_size:
+            yield (run_start, index + 1, None, None)
+            run_start = None
+    if run_start is not None:
+        yield (run_start, len(objects), None, None)
+
+
+def iter_models_xml_parallel(objects: Sequence[Any], workers: int, chunk_size: int = CHUNK_SIZE,
+                             progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[str]:
+    """
+    Renders objects in a pool of worker processes and yields the rendered units in the original
+    order, each holding several newline separated models. At most a few units per worker are in
+    flight, so memory stays bounded while the caller writes results out. progress is called as
+    progress(done, total) with the number of objects rendered whenever a unit completes them.
+    """
+    objects = list(objects)
+    # Names are generated lazily, resolve them here so every process sees the same names
+    for obj in objects:
+        obj.name
+
+    methods = multiprocessing.get_all_start_methods()
+    # With fork the workers inherit the objects, otherwise they are pickled once per worker
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(objects,)) as pool:
+        pending: deque = deque()
+        done = 0
+
+        def completed(unit: WorkUnit) -> None:
+            nonlocal done
+            index, stop, _, row_stop = unit
+            # A row range of a batch completes the batch only with its last rows
+            finished = stop if row_stop is None or row_stop >= len(objects[index]) else index
+            if progress is not None and finished > done:
+                done = finished
+                progress(done, len(objects))
+
+        for unit in iter_work_units(objects, chunk_size):
+            pending.append((unit, pool.submit(_render_unit_in_worker, unit)))
+            if len(pending) >= 2 * workers:
+                unit_done, future = pending.popleft()
+                xml = future.result()
+                completed(unit_done)
+                if xml:
+                    yield xml
+        while pending:
+            unit_done, future = pending.popleft()
+            xml = future.result()
+            completed(unit_done)
+            if xml:
+                yield xml
+        if progress is not None and not objects:
+            progress(0, 0)
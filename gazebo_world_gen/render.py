@@ -0,0 +1,96 @@
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .shapes import POSE_FIELDS
+
+# Rows rendered per call when a batch is exported, keeps memory flat for huge worlds
+CHUNK_SIZE = 4096
+# Leading values of a column looked at to decide whether deduplicating its formatting pays off
+DEDUP_SAMPLE_SIZE = 256
+
+_PLACEHOLDER = re.compile("\x00(\\d+)\x00")
+_templates: Dict[tuple, Optional[Callable[..., str]]] = {}
+
+
+def template_fields(shape_cls: type) -> tuple:
+    """
+    Returns the attribute names filled into the template of shape_cls, in argument order.
+    """
+    return ("name",) + POSE_FIELDS + ("color",) + tuple(shape_cls.dimension_names)
+
+
+def _render_prototype(shape_cls: type, values: Sequence) -> str:
+    proto = shape_cls.__new__(shape_cls)
+    for field, value in zip(template_fields(shape_cls), values):
+        setattr(proto, field, value)
+    return proto.get_gz_xml()
+
+
+def _compile_fstring(raw: str, nargs: int) -> Callable[..., str]:
+    source = []
+    for i, part in enumerate(_PLACEHOLDER.split(raw)):
+        if i % 2:
+            source.append("{a" + part + "}")
+        else:
+            part = part.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n").replace("\r", "\\r")
+            source.append(part.replace("{", "{{").replace("}", "}}"))
+    args = ", ".join(f"a{i}" for i in range(nargs))
+    return eval(f"lambda {args}: f'{''.join(source)}'")
+
+
+def compile_template(shape_cls: type) -> Optional[Callable[..., str]]:
+    """
+    Compiles a function that renders a whole <model> of shape_cls from arguments ordered as
+    template_fields. It is built by rendering a prototype shape whose fields are placeholders, so the
+    geometry block appears twice in the template but each value is only formatted once per shape.
+    Returns None if the class can't be expressed as a template, for example when its XML is computed
+    from the field values, in which case shapes have to be rendered one by one.
+    """
+    options = shape_cls.render_options()
+    if options is None:
+        return None
+    key = (shape_cls, options)
+    if key in _templates:
+        return _templates[key]
+    template = None
+    try:
+        nargs = len(template_fields(shape_cls))
+        candidate = _compile_fstring(_render_prototype(shape_cls, [f"\x00{i}\x00" for i in range(nargs)]), nargs)
+        # Check the template against a normally rendered shape before trusting it
+        sample = [f"{shape_cls.__name__.lower()}_sample"] + [1.25 + i for i in range(len(POSE_FIELDS))]
+        sample += ["0.25 0.5 0.75 1.0"] + [0.5 + i for i in range(len(shape_cls.dimension_names))]
+        if candidate(*sample) == _render_prototype(shape_cls, sample):
+            template = candidate
+    except Exception:
+        template = None
+    _templates[key] = template
+    return template
+
+
+def format_column(values: np.ndarray) -> List[str]:
+    """
+    Formats a float64 column the way an f-string would format each value. Columns with repeated
+    values, such as grid snapped positions or shared sizes, format every distinct value only once.
+    Values are keyed bit for bit so 0.0 and -0.0 keep their own spelling.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    floats = values.tolist()
+    sample = values[:DEDUP_SAMPLE_SIZE].view(np.int64)
+    if len(np.unique(sample)) > 0.5 * len(sample):
+        return list(map(float.__repr__, floats))
+    bits = values.view(np.int64).tolist()
+    distinct = dict(zip(bits, floats))
+    formatted = dict(zip(distinct, map(float.__repr__, distinct.values())))
+    return list(map(formatted.__getitem__, bits))
+
+
+def render_columns(shape_cls: type, columns: Sequence[Sequence[str]]) -> List[str]:
+    """
+    Renders the <model> XML of many shapes of one class from string columns, ordered as template_fields.
+    """
+    template = compile_template(shape_cls)
+    if template is None:
+        raise ValueError(f"{shape_cls.__name__} has no batch template")
+    return list(map(template, *columns))
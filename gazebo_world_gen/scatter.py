@@ -0,0 +1,165 @@
+import copy
+import math
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .shapes import Shape
+
+Region = Tuple[float, float, float, float]
+
+# Cells of the background grid are split into PHASES x PHASES groups. Cells of one group are far
+# enough apart that candidates drawn in them can't conflict, so a whole group is tested at once.
+PHASES = 5
+
+
+def poisson_disk_sample(region: Region, radius: float, rng: np.random.Generator,
+                        max_points: Optional[int] = None, rounds: int = 30,
+                        accept: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None) -> np.ndarray:
+    """
+    Samples points in region (xmin, ymin, xmax, ymax) that are at least radius apart, as an (N, 2) array.
+
+    Uses a background grid of radius / sqrt(2) cells, which hold at most one point each. Every round
+    draws one candidate in each empty cell of a phase group, tests all of them against the 5 x 5
+    neighbouring cells with array operations and accepts the ones that fit. Sampling stops once
+    max_points are found, or after rounds rounds without it, which is close to a maximal blue-noise
+    set. The points are returned in random order, so any prefix covers the whole region.
+    accept optionally takes the x and y arrays of the candidates that fit and returns a boolean
+    array, rejected candidates leave their cells empty for later rounds.
+    """
+    xmin, ymin, xmax, ymax = region
+    if xmax < xmin or ymax < ymin:
+        raise ValueError(f"Invalid region {region}")
+    if radius <= 0:
+        raise ValueError("radius must be positive")
+    cell = radius / math.sqrt(2)
+    cols = max(1, math.ceil((xmax - xmin) / cell))
+    rows = max(1, math.ceil((ymax - ymin) / cell))
+    # Flattened grid padded by two cells on each side, so neighbourhood lookups never leave the array
+    width = cols + 4
+    grid_x = np.full((rows + 4) * width, np.nan)
+    grid_y = grid_x.copy()
+    radius_sq = radius * radius
+    neighbourhood = np.array([di * width + dj for di in range(-2, 3) for dj in range(-2, 3) if di or dj])
+
+    phase_cells = []
+    for pi in range(PHASES):
+        for pj in range(PHASES):
+            ii, jj = np.meshgrid(np.arange(pi, rows, PHASES), np.arange(pj, cols, PHASES), indexing="ij")
+            phase_cells.append(((ii + 2) * width + jj + 2).ravel())
+
+    found = 0
+    for _ in range(rounds):
+        accepted = 0
+        for order in rng.permutation(len(phase_cells)).tolist():
+            cells = phase_cells[order]
+            cells = phase_cells[order] = cells[np.isnan(grid_x[cells])]
+            if not len(cells):
+                continue
+            ii, jj = np.divmod(cells, width)
+            x = xmin + (jj - 2 + rng.random(len(cells))) * cell
+            y = ymin + (ii - 2 + rng.random(len(cells))) * cell
+            neighbours = cells[:, None] + neighbourhood
+            d_sq = (grid_x[neighbours] - x[:, None]) ** 2 + (grid_y[neighbours] - y[:, None]) ** 2
+            # Empty neighbours are NaN and compare False
+            fits = (x <= xmax) & (y <= ymax) & ~(d_sq < radius_sq).any(axis=1)
+            if accept is not None and fits.any():
+                fitting = np.flatnonzero(fits)
+                fits[fitting] = accept(x[fitting], y[fitting])
+            grid_x[cells[fits]] = x[fits]
+            grid_y[cells[fits]] = y[fits]
+            accepted += int(fits.sum())
+        found += accepted
+        if not accepted or (max_points is not None and found >= max_points):
+            break
+
+    occupied = ~np.isnan(grid_x)
+    points = np.stack([grid_x[occupied], grid_y[occupied]], axis=1)
+    points = points[rng.permutation(len(points))]
+    if max_points is not None:
+        points = points[:max_points]
+    return points
+
+
+def footprint_radius(shape: Shape) -> float:
+    """
+    Radius of the smallest circle around the shape's origin that covers its footprint on the ground
+    plane at any yaw, from its rotated bounding box.
+    """
+    lower, upper = shape.get_aabb()
+    rx = max(abs(lower[0] - shape.x), abs(upper[0] - shape.x))
+    ry = max(abs(lower[1] - shape.y), abs(upper[1] - shape.y))
+    return math.hypot(rx, ry)
+
+
+class ScatterResult:
+    def __init__(self, shapes: List[Shape], requested: int, region: Region, spacing: float):
+        self.shapes = shapes
+        self.requested = requested
+        self.region = region
+        self.spacing = spacing
+
+    @property
+    def placed(self) -> int:
+        return len(self.shapes)
+
+    @property
+    def area(self) -> float:
+        xmin, ymin, xmax, ymax = self.region
+        return (xmax - xmin) * (ymax - ymin)
+
+    @property
+    def density(self) -> float:
+        """
+        Placed objects per square unit of the region.
+        """
+        return self.placed / self.area if self.area else 0.0
+
+    def __repr__(self) -> str:
+        return f"ScatterResult(placed={self.placed}, requested={self.requested}, density={self.density:.4g})"
+
+
+def scatter_shapes(shape_factory: Union[Shape, Callable[[np.random.Generator], Shape]], region: Region, count: int,
+                   min_spacing: float = 0.0, seed: Optional[int] = None, avoid: Any = None) -> ScatterResult:
+    """
+    Places up to count shapes in region (xmin, ymin, xmax, ymax) so that their footprints are at
+    least min_spacing apart and stay inside the region.
+
+    shape_factory is either a prototype Shape, which is copied, or a callable taking a NumPy random
+    generator and returning a new shape, e.g. to randomize sizes and yaw. Only x and y of the produced
+    shapes are changed. Positions come from poisson_disk_sample with a spacing of twice the largest
+    footprint radius plus min_spacing, so fewer than count shapes are placed when they don't fit,
+    check the result's placed and density. avoid is an optional SpatialIndex, positions where the
+    footprint circle of the largest shape would overlap an indexed object are rejected while sampling,
+    so other positions are drawn in their place.
+    """
+    rng = np.random.default_rng(seed)
+    if count <= 0:
+        return ScatterResult([], count, region, min_spacing)
+    if isinstance(shape_factory, Shape):
+        reach = footprint_radius(shape_factory)
+        shapes = [copy.copy(shape_factory) for _ in range(count)]
+        for shape in shapes:
+            # Copies get their own lazily generated name
+            shape._name = None
+    else:
+        shapes = [shape_factory(rng) for _ in range(count)]
+        reach = max(footprint_radius(shape) for shape in shapes)
+    spacing = 2 * reach + min_spacing
+    xmin, ymin, xmax, ymax = region
+    inner = (xmin + reach, ymin + reach, xmax - reach, ymax - reach)
+    if inner[2] < inner[0] or inner[3] < inner[1]:
+        return ScatterResult([], count, region, spacing)
+    accept = None
+    if avoid is not None:
+        bottom = min(shape.get_aabb()[0][2] for shape in shapes)
+        top = max(shape.get_aabb()[1][2] for shape in shapes)
+
+        def accept(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+            return np.array([not avoid.query_aabb((x - reach, y - reach, bottom), (x + reach, y + reach, top))
+                             for x, y in zip(xs.tolist(), ys.tolist())], dtype=bool)
+    points = poisson_disk_sample(inner, spacing, rng, max_points=count, accept=accept)
+
+    for shape, (x, y) in zip(shapes, points.tolist()):
+        shape.x, shape.y = x, y
+    return ScatterResult(shapes[:len(points)], count, region, spacing)
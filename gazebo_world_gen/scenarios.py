@@ -0,0 +1,224 @@
+import copy
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .batch import ShapeBatch, format_color, parse_color
+from .shapes import POSE_FIELDS, Shape
+from .world import World
+
+
+class Uniform:
+    def __init__(self, low: Any, high: Any):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: np.random.Generator, size: Optional[int] = None) -> Any:
+        return rng.uniform(self.low, self.high, size if size is None else (size,) + np.shape(self.low))
+
+
+class Normal:
+    def __init__(self, mean: Any, std: Any):
+        self.mean = mean
+        self.std = std
+
+    def sample(self, rng: np.random.Generator, size: Optional[int] = None) -> Any:
+        return rng.normal(self.mean, self.std, size if size is None else (size,) + np.shape(self.mean))
+
+
+class Choice:
+    """
+    Picks one of the given options, which can be scalars, tuples or color strings.
+    """
+
+    def __init__(self, options: Sequence[Any], p: Optional[Sequence[float]] = None):
+        self.options = list(options)
+        self.p = p
+
+    def sample(self, rng: np.random.Generator, size: Optional[int] = None) -> Any:
+        picks = rng.choice(len(self.options), size=size, p=self.p)
+        if size is None:
+            return self.options[picks]
+        return [self.options[i] for i in picks.tolist()]
+
+
+def _to_python(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return tuple(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class RenderedModel:
+    """
+    A model whose XML was rendered ahead of time, used to share unchanged objects between variants.
+    """
+
+    def __init__(self, name: str, xml: str):
+        self.name = name
+        self.xml = xml
+
+    def get_gz_xml(self) -> str:
+        return self.xml
+
+
+class ScenarioSpec:
+    """
+    Describes how to randomize a base World into variants.
+
+    pose and pose_offset map pose fields ('x', 'yaw', ...) to distributions, pose replaces the value
+    and pose_offset is added to it. dimensions maps dimension names ('width', 'radius', ...) to
+    distributions and only applies to shapes that have that dimension. color is a distribution over
+    color strings or RGBA values. settings maps World.settings keys to distributions, nested values
+    are addressed with dots, e.g. 'physics.max_step_size'. select chooses which objects are randomized,
+    the others are rendered once and shared by all variants.
+    """
+
+    def __init__(self, pose: Optional[Dict[str, Any]] = None, pose_offset: Optional[Dict[str, Any]] = None,
+                 dimensions: Optional[Dict[str, Any]] = None, color: Any = None,
+                 settings: Optional[Dict[str, Any]] = None, select: Optional[Callable[[Any], bool]] = None):
+        self.pose = pose or {}
+        self.pose_offset = pose_offset or {}
+        self.dimensions = dimensions or {}
+        self.color = color
+        self.settings = settings or {}
+        self.select = select
+        for field in list(self.pose) + list(self.pose_offset):
+            if field not in POSE_FIELDS:
+                raise ValueError(f"Unknown pose field {field!r}")
+
+    def is_randomized(self, obj: Any) -> bool:
+        if not isinstance(obj, (Shape, ShapeBatch)):
+            return False
+        return self.select is None or self.select(obj)
+
+    def randomize_shape(self, shape: Shape, rng: np.random.Generator) -> Shape:
+        shape = copy.copy(shape)
+        for field, dist in self.pose.items():
+            setattr(shape, field, float(dist.sample(rng)))
+        for field, dist in self.pose_offset.items():
+            setattr(shape, field, getattr(shape, field) + float(dist.sample(rng)))
+        for field, dist in self.dimensions.items():
+            if field in shape.dimension_names:
+                setattr(shape, field, float(dist.sample(rng)))
+        if self.color is not None:
+            color = self.color.sample(rng)
+            shape.color = color if isinstance(color, str) else format_color(color)
+        return shape
+
+    def randomize_batch(self, batch: ShapeBatch, rng: np.random.Generator) -> ShapeBatch:
+        count = len(batch)
+        poses = batch.poses.copy()
+        for field, dist in self.pose.items():
+            poses[:, POSE_FIELDS.index(field)] = dist.sample(rng, count)
+        for field, dist in self.pose_offset.items():
+            poses[:, POSE_FIELDS.index(field)] += dist.sample(rng, count)
+        dimensions = batch.dimensions
+        names = batch.shape_cls.dimension_names
+        if any(field in names for field in self.dimensions):
+            dimensions = dimensions.copy()
+            for field, dist in self.dimensions.items():
+                if field in names:
+                    dimensions[:, names.index(field)] = dist.sample(rng, count)
+        colors = batch.colors
+        if self.color is not None:
+            colors = [parse_color(c) for c in self.color.sample(rng, count)]
+        return ShapeBatch(batch.shape_cls, dimensions, poses, colors, name=batch.name)
+
+    def randomize_settings(self, settings: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+        settings = copy.deepcopy(settings)
+        for key, dist in self.settings.items():
+            *parents, leaf = key.split(".")
+            target = settings
+            for parent in parents:
+                target = target[parent]
+            target[leaf] = _to_python(dist.sample(rng))
+        return settings
+
+    def apply(self, world: World, seed: int) -> World:
+        """
+        Returns a randomized copy of world with the same configuration, see World.empty_copy. The
+        original is left untouched.
+        """
+        rng = np.random.default_rng(seed)
+        variant = world.empty_copy()
+        variant.settings = self.randomize_settings(world.settings, rng)
+        for obj in world.objects:
+            # Resolve lazy names first so the variant keeps the names of the base world
+            obj.name
+            if isinstance(obj, ShapeBatch) and self.is_randomized(obj):
+                variant.add_object(self.randomize_batch(obj, rng))
+            elif self.is_randomized(obj):
+                variant.add_object(self.randomize_shape(obj, rng))
+            else:
+                variant.add_object(obj)
+        return variant
+
+
+# Base world and spec of the running scenario batch, set in each worker process by _init_worker
+_base: Optional[World] = None
+_spec: Optional[ScenarioSpec] = None
+
+
+def _init_worker(base: World, spec: ScenarioSpec) -> None:
+    global _base, _spec
+    _base, _spec = base, spec
+
+
+def _generate_variant(seed: int, filename: str) -> str:
+    _spec.apply(_base, seed).save_gz_world(filename, stream=True)
+    return filename
+
+
+def _share_static_objects(world: World, spec: ScenarioSpec) -> World:
+    shared = world.empty_copy()
+    shared.settings = world.settings
+    # Instancing, merging and collision simplification work on the shapes, which then can't be rendered up front
+    passes = world.instancing is not None or world.merging is not None or world.collision_simplifier is not None
+    for obj in world.objects:
+        # Names are generated lazily, resolve them once so every variant uses the same names
+        obj.name
+        if passes or spec.is_randomized(obj):
+            shared.add_object(obj)
+        elif isinstance(obj, ShapeBatch):
+            if len(obj):
+                shared.add_object(RenderedModel(obj.name, "\n".join(obj.iter_gz_xml())))
+        else:
+            shared.add_object(RenderedModel(obj.name, obj.get_gz_xml()))
+    return shared
+
+
+def generate_scenarios(base: World, spec: ScenarioSpec, count: int, output_dir: str, seed: int = 0,
+                       workers: int = 1, prefix: str = "scenario") -> List[Dict[str, Any]]:
+    """
+    Generates count randomized variants of base and saves each one to output_dir, using a pool of
+    worker processes when workers > 1. Objects that spec does not randomize are rendered once up front,
+    unless base exports with instancing, merging or collision simplification.
+    Each variant gets its own seed derived from seed, so a single variant can be regenerated with
+    spec.apply(base, entry["seed"]). A manifest.json listing index, seed and filename of every
+    variant is written next to the worlds and also returned.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    seeds = [int(s.generate_state(1, np.uint64)[0]) for s in np.random.SeedSequence(seed).spawn(count)]
+    width = len(str(max(count - 1, 0)))
+    filenames = [os.path.join(output_dir, f"{prefix}_{i:0{width}d}.sdf") for i in range(count)]
+    shared = _share_static_objects(base, spec)
+
+    if workers > 1:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(shared, spec)) as pool:
+            list(pool.map(_generate_variant, seeds, filenames, chunksize=max(1, count // (4 * workers))))
+    else:
+        for variant_seed, filename in zip(seeds, filenames):
+            spec.apply(shared, variant_seed).save_gz_world(filename, stream=True)
+
+    manifest = [{"index": i, "seed": s, "filename": os.path.basename(f)} for i, (s, f) in enumerate(zip(seeds, filenames))]
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump({"base_seed": seed, "count": count, "scenarios": manifest}, f, indent=2)
+    return manifest
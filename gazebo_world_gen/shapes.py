@@ -1,6 +1,16 @@
-import uuid
+import functools
+
+from . import meshes
+from .geometry import transform_bounds
+from .naming import UUIDNaming
+
+POSE_FIELDS = ("x", "y", "z", "roll", "pitch", "yaw")
 
 class Shape:
+    dimension_names = ()
+    # Strategy used to name shapes that are not added to a World with its own naming
+    naming = UUIDNaming()
+
     def __init__(self, x=0, y=0, z=0, roll=0, pitch=0, yaw=0, color='0.5 0.5 0.5 1.0'):
         self.x = x
         self.y = y
@@ -9,7 +19,85 @@ class Shape:
         self.pitch = pitch
         self.yaw = yaw
         self.color = color
-        self.name = self.__class__.__name__.lower() + '_' + str(uuid.uuid4())
+        self._name = None
+
+    @property
+    def name(self):
+        """
+        The model name, generated by the naming strategy the first time it is needed.
+        """
+        if self._name is None:
+            self._name = self.naming(self)
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+
+    @property
+    def name_prefix(self):
+        return self.__class__.__name__.lower()
+
+    def naming_key(self):
+        """
+        Bytes identifying the shape's parameters, used by HashNaming.
+        """
+        values = [getattr(self, field) for field in POSE_FIELDS + tuple(self.dimension_names)]
+        return repr((self.__class__.__name__, values, self.color)).encode()
+
+    def state_key(self):
+        """
+        Snapshot of the shape's class and attributes. A World with cache_xml reuses the shape's
+        cached XML while this is unchanged, so any attribute assignment marks the shape dirty.
+        Values are paired with their types since 1 == 1.0 but they are written differently.
+        """
+        return (self.__class__,) + tuple((type(value), value) for value in self.__dict__.values())
+
+    @staticmethod
+    def local_bounds(*dimensions):
+        """
+        Lower and upper corner of the shape's bounding box in its own frame, from its dimensions.
+        Written with plain arithmetic so it also works on NumPy dimension columns.
+        """
+        raise NotImplementedError("This method should be overridden by subclasses")
+
+    def get_aabb(self):
+        """
+        Axis aligned bounding box in world coordinates as (lower, upper) corners, taking the rotation into account.
+        """
+        lower, upper = self.local_bounds(*[getattr(self, d) for d in self.dimension_names])
+        return transform_bounds([getattr(self, p) for p in POSE_FIELDS], lower, upper)
+
+    @staticmethod
+    def build_mesh(*dimensions, **resolution):
+        """
+        Builds the mesh of a shape with the given dimensions as (vertices, faces) arrays in the
+        shape's frame. resolution takes the arguments of a level in meshes.LOD_LEVELS.
+        """
+        raise NotImplementedError("This method should be overridden by subclasses")
+
+    @staticmethod
+    def unit_scale(*dimensions):
+        """
+        Per axis scale that turns the unit mesh, build_mesh(1, ..., 1), into the mesh of a shape with
+        the given dimensions, or None if the mesh doesn't scale that way. Works on dimension columns too.
+        """
+        return None
+
+    @classmethod
+    def render_options(cls):
+        """
+        Class level settings that change the XML of every shape of the class. Batch templates are
+        compiled per value, None means shapes of the class can't be rendered from a template.
+        """
+        return ()
+
+    def set_default_name(self, naming):
+        """
+        Names the shape with naming unless it already has a name.
+        """
+        if self._name is None:
+            self._name = naming(self)
 
     def get_geometry_xml(self):
         """
@@ -17,6 +105,12 @@ class Shape:
         """
         raise NotImplementedError("This method should be overridden by subclasses")
 
+    def get_collision_geometry_xml(self):
+        """
+        Geometry XML of the collision element, None to collide with the visual geometry.
+        """
+        return None
+
     def get_material_xml(self):
         return f"""
       <material>
@@ -25,33 +119,54 @@ class Shape:
       </material>
 """
 
-    def get_gz_xml(self):
+    def get_link_xml(self, name="link", pose_xml=""):
+        """
+        The <link> holding the shape's collision and visual, with pose_xml inserted after its opening tag.
+        """
         geometry_xml = self.get_geometry_xml()
+        collision_xml = self.get_collision_geometry_xml() or geometry_xml
         material_xml = self.get_material_xml()
-        return f"""
-<model name="{self.name}">
-  <static>true</static>
-  <pose>{self.x} {self.y} {self.z} {self.roll} {self.pitch} {self.yaw}</pose>
-  <link name="link">
+        return f"""  <link name="{name}">{pose_xml}
     <collision name="collision">
-      {geometry_xml}
+      {collision_xml}
     </collision>
     <visual name="visual">
       {geometry_xml}
       {material_xml}
     </visual>
-  </link>
+  </link>"""
+
+    def get_gz_xml(self):
+        return f"""
+<model name="{self.name}">
+  <static>true</static>
+  <pose>{self.x} {self.y} {self.z} {self.roll} {self.pitch} {self.yaw}</pose>
+{self.get_link_xml()}
 </model>
 """
 
 
 class Box(Shape):
+    dimension_names = ("width", "height", "depth")
+
     def __init__(self, width, height, depth, x=0, y=0, z=0, roll=0, pitch=0, yaw=0, color='0.5 0.5 0.5 1.0'):
         super().__init__(x, y, z, roll, pitch, yaw, color)
         self.width = width
         self.height = height
         self.depth = depth
 
+    @staticmethod
+    def local_bounds(width, height, depth):
+        return (-width / 2, -height / 2, -depth / 2), (width / 2, height / 2, depth / 2)
+
+    @staticmethod
+    def build_mesh(width, height, depth, **resolution):
+        return meshes.box_mesh(width, height, depth)
+
+    @staticmethod
+    def unit_scale(width, height, depth):
+        return (width, height, depth)
+
     def get_geometry_xml(self):
         return f"""
       <geometry>
@@ -63,10 +178,24 @@ class Box(Shape):
 
 
 class Sphere(Shape):
+    dimension_names = ("radius",)
+
     def __init__(self, radius, x=0, y=0, z=0, roll=0, pitch=0, yaw=0, color='0.5 0.5 0.5 1.0'):
         super().__init__(x, y, z, roll, pitch, yaw, color)
         self.radius = radius
 
+    @staticmethod
+    def local_bounds(radius):
+        return (-radius, -radius, -radius), (radius, radius, radius)
+
+    @staticmethod
+    def build_mesh(radius, **resolution):
+        return meshes.ellipsoid_mesh(radius, radius, radius, **(resolution or meshes.LOD_LEVELS["ellipsoid"][1]))
+
+    @staticmethod
+    def unit_scale(radius):
+        return (radius, radius, radius)
+
     def get_geometry_xml(self):
         return f"""
       <geometry>
@@ -78,11 +207,25 @@ class Sphere(Shape):
 
 
 class Cylinder(Shape):
+    dimension_names = ("radius", "length")
+
     def __init__(self, radius, length, x=0, y=0, z=0, roll=0, pitch=0, yaw=0, color='0.5 0.5 0.5 1.0'):
         super().__init__(x, y, z, roll, pitch, yaw, color)
         self.radius = radius
         self.length = length
 
+    @staticmethod
+    def local_bounds(radius, length):
+        return (-radius, -radius, -length / 2), (radius, radius, length / 2)
+
+    @staticmethod
+    def build_mesh(radius, length, **resolution):
+        return meshes.cylinder_mesh(radius, length, **resolution)
+
+    @staticmethod
+    def unit_scale(radius, length):
+        return (radius, radius, length)
+
     def get_geometry_xml(self):
         return f"""
       <geometry>
@@ -94,72 +237,217 @@ class Cylinder(Shape):
 """
 
 
-class Ellipsoid(Shape):
+class MeshShape(Shape):
+    """
+    Shape drawn with a mesh. By default it uses the unit mesh of its model in gazebo_models,
+    scaled to the shape's dimensions. With a MeshCache in mesh_cache, set on a class or on a single
+    shape, a mesh is generated for each distinct set of dimensions and referenced unscaled instead.
+
+    visual_lod picks a level of meshes.LOD_LEVELS for the visual mesh, 0 being the finest, and
+    collision sets the collision geometry: None uses the visual mesh, a level index a mesh of that
+    level and "primitive" a box, sphere or cylinder around the shape. Both can be set per class or
+    per shape, and are ignored by meshes that have no levels. A collision.CollisionProxy set on a
+    shape, usually by collision.CollisionSimplifier, gives the collision geometry of that shape.
+    """
+    mesh_name = None
+    mesh_cache = None
+    visual_lod = None
+    collision = None
+
+    @classmethod
+    def render_options(cls):
+        # Cached mesh URIs and primitive collisions depend on the dimensions
+        if cls.mesh_cache is not None or cls.collision == "primitive":
+            return None
+        return (cls.visual_lod, cls.collision)
+
+    def state_key(self):
+        # The settings are usually set on the class, where assigning them doesn't touch the shape
+        return super().state_key() + (self.mesh_cache, self.visual_lod, self.collision)
+
+    def mesh_scale(self):
+        """
+        Scale of the unit mesh that gives the shape its dimensions.
+        """
+        return self.unit_scale(*[getattr(self, d) for d in self.dimension_names])
+
+    def get_collision_primitive_xml(self):
+        """
+        Geometry XML of a primitive enclosing the shape, used with collision = "primitive".
+        """
+        raise NotImplementedError("This method should be overridden by subclasses")
+
+    def get_mesh_xml(self, lod=None):
+        levels = meshes.LOD_LEVELS.get(self.mesh_name)
+        if lod is not None and levels:
+            lod = min(lod, len(levels) - 1)
+            name = f"{self.mesh_name}_lod{lod}"
+        else:
+            lod, name = None, self.mesh_name
+        if self.mesh_cache is None:
+            uri = f"model://{self.mesh_name}/meshes/{name}.dae"
+            sx, sy, sz = self.mesh_scale()
+        else:
+            dimensions = [getattr(self, d) for d in self.dimension_names]
+            build = self.build_mesh if lod is None else functools.partial(self.build_mesh, **levels[lod])
+            uri = self.mesh_cache.uri(name, dimensions, build)
+            sx = sy = sz = 1
+        return f"""
+      <geometry>
+        <mesh>
+          <uri>{uri}</uri>
+          <scale>{sx} {sy} {sz}</scale>
+        </mesh>
+      </geometry>
+"""
+
+    def get_geometry_xml(self):
+        return self.get_mesh_xml(self.visual_lod)
+
+    def get_collision_geometry_xml(self):
+        if self.collision is None:
+            return None
+        if self.collision == "primitive":
+            return self.get_collision_primitive_xml()
+        if hasattr(self.collision, "get_geometry_xml"):
+            return self.collision.get_geometry_xml(self)
+        return self.get_mesh_xml(self.collision)
+
+
+class Ellipsoid(MeshShape):
+    dimension_names = ("radius_x", "radius_y", "radius_z")
+    mesh_name = "ellipsoid"
+
     def __init__(self, radius_x, radius_y, radius_z, x=0, y=0, z=0, roll=0, pitch=0, yaw=0, color='0.5 0.5 0.5 1.0'):
         super().__init__(x, y, z, roll, pitch, yaw, color)
         self.radius_x = radius_x
         self.radius_y = radius_y
         self.radius_z = radius_z
 
-    def get_geometry_xml(self):
+    @staticmethod
+    def local_bounds(radius_x, radius_y, radius_z):
+        return (-radius_x, -radius_y, -radius_z), (radius_x, radius_y, radius_z)
+
+    @staticmethod
+    def unit_scale(radius_x, radius_y, radius_z):
+        return (radius_x, radius_y, radius_z)
+
+    @staticmethod
+    def build_mesh(radius_x, radius_y, radius_z, **resolution):
+        return meshes.ellipsoid_mesh(radius_x, radius_y, radius_z, **resolution)
+
+    def get_collision_primitive_xml(self):
+        if self.radius_x == self.radius_y == self.radius_z:
+            return f"""
+      <geometry>
+        <sphere>
+          <radius>{self.radius_x}</radius>
+        </sphere>
+      </geometry>
+"""
         return f"""
       <geometry>
-        <mesh>
-          <uri>model://ellipsoid/meshes/ellipsoid.dae</uri>
-          <scale>1 1 1</scale>
-        </mesh>
+        <box>
+          <size>{2 * self.radius_x} {2 * self.radius_y} {2 * self.radius_z}</size>
+        </box>
       </geometry>
 """
 
 
-class Tetrahedron(Shape):
+class Tetrahedron(MeshShape):
+    dimension_names = ("width", "depth", "height")
+    mesh_name = "tetrahedron"
+
     def __init__(self, width, depth, height, x=0, y=0, z=0, roll=0, pitch=0, yaw=0, color='0.5 0.5 0.5 1.0'):
         super().__init__(x, y, z, roll, pitch, yaw, color)
         self.width = width
         self.depth = depth
         self.height = height
 
-    def get_geometry_xml(self):
+    @staticmethod
+    def local_bounds(width, depth, height):
+        return (-width / 2, -depth / 2, 0 * height), (width / 2, depth / 2, height)
+
+    @staticmethod
+    def unit_scale(width, depth, height):
+        return (width, depth, height)
+
+    @staticmethod
+    def build_mesh(width, depth, height, **resolution):
+        return meshes.tetrahedron_mesh(width, depth, height)
+
+    def get_collision_primitive_xml(self):
         return f"""
+      <pose>0 0 {self.height / 2} 0 0 0</pose>
       <geometry>
-        <mesh>
-          <uri>model://tetrahedron/meshes/tetrahedron.dae</uri>
-          <scale>1 1 1</scale>
-        </mesh>
+        <box>
+          <size>{self.width} {self.depth} {self.height}</size>
+        </box>
       </geometry>
 """
 
 
-class SquarePyramid(Shape):
+class SquarePyramid(MeshShape):
+    dimension_names = ("width", "depth", "height")
+    mesh_name = "square_pyramid"
+
     def __init__(self, width, depth, height, x=0, y=0, z=0, roll=0, pitch=0, yaw=0, color='0.5 0.5 0.5 1.0'):
         super().__init__(x, y, z, roll, pitch, yaw, color)
         self.width = width
         self.depth = depth
         self.height = height
 
-    def get_geometry_xml(self):
+    @staticmethod
+    def local_bounds(width, depth, height):
+        return (-width / 2, -depth / 2, 0 * height), (width / 2, depth / 2, height)
+
+    @staticmethod
+    def unit_scale(width, depth, height):
+        return (width, depth, height)
+
+    @staticmethod
+    def build_mesh(width, depth, height, **resolution):
+        return meshes.square_pyramid_mesh(width, depth, height)
+
+    def get_collision_primitive_xml(self):
         return f"""
+      <pose>0 0 {self.height / 2} 0 0 0</pose>
       <geometry>
-        <mesh>
-          <uri>model://square_pyramid/meshes/square_pyramid.dae</uri>
-          <scale>1 1 1</scale>
-        </mesh>
+        <box>
+          <size>{self.width} {self.depth} {self.height}</size>
+        </box>
       </geometry>
 """
 
 
-class Cone(Shape):
+class Cone(MeshShape):
+    dimension_names = ("radius", "height")
+    mesh_name = "cone"
+
     def __init__(self, radius, height, x=0, y=0, z=0, roll=0, pitch=0, yaw=0, color='0.5 0.5 0.5 1.0'):
         super().__init__(x, y, z, roll, pitch, yaw, color)
         self.radius = radius
         self.height = height
 
-    def get_geometry_xml(self):
+    @staticmethod
+    def local_bounds(radius, height):
+        return (-radius, -radius, 0 * height), (radius, radius, height)
+
+    @staticmethod
+    def unit_scale(radius, height):
+        return (radius, radius, height)
+
+    @staticmethod
+    def build_mesh(radius, height, **resolution):
+        return meshes.cone_mesh(radius, height, **resolution)
+
+    def get_collision_primitive_xml(self):
         return f"""
+      <pose>0 0 {self.height / 2} 0 0 0</pose>
       <geometry>
-        <mesh>
-          <uri>model://cone/meshes/cone.dae</uri>
-          <scale>1 1 1</scale>
-        </mesh>
+        <cylinder>
+          <radius>{self.radius}</radius>
+          <length>{self.height}</length>
+        </cylinder>
       </geometry>
 """
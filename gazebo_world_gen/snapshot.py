@@ -0,0 +1,309 @@
+import importlib
+import json
+import numbers
+import operator
+import pickle
+import struct
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .assets import atomic_path
+from .batch import ShapeBatch
+from .shapes import POSE_FIELDS, Shape
+
+SNAPSHOT_MAGIC = b"GZWSNAP\x00"
+# Bumped when the layout changes, snapshots of other versions are rejected
+SNAPSHOT_VERSION = 1
+# Arrays start at multiples of this many bytes, so memory mapped columns are aligned
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sIQ")
+
+
+def class_path(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def load_class(path: str) -> type:
+    module, _, qualname = path.partition(":")
+    cls = importlib.import_module(module)
+    for part in qualname.split("."):
+        cls = getattr(cls, part)
+    if not (isinstance(cls, type) and issubclass(cls, Shape)):
+        raise ValueError(f"{path} is not a Shape class")
+    return cls
+
+
+def _tuples(value: Any) -> Any:
+    # JSON turns the tuples of the world settings into lists
+    if isinstance(value, list):
+        return tuple(_tuples(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _tuples(v) for k, v in value.items()}
+    return value
+
+
+def _encode_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class ShapeTable:
+    """
+    Shapes of one class in a snapshot, as memory mapped columns: poses (N, 6), dimensions (N, D),
+    color_index (N,) into colors, is_int (N, 6 + D) marking the pose and dimension values that were
+    ints, and the names, decoded only when they are used.
+    """
+
+    def __init__(self, shape_cls: type, columns: Dict[str, np.ndarray], colors: List[str], extras: Dict[int, dict]):
+        self.shape_cls = shape_cls
+        self.poses = columns["poses"]
+        self.dimensions = columns["dimensions"]
+        self.color_index = columns["color_index"]
+        self.is_int = columns["is_int"]
+        self._name_bytes = columns["names"]
+        self._name_offsets = columns["name_offsets"]
+        self.colors = colors
+        self.extras = extras
+
+    def __len__(self) -> int:
+        return len(self.poses)
+
+    def get_name(self, row: int) -> Optional[str]:
+        start, stop = int(self._name_offsets[row]), int(self._name_offsets[row + 1])
+        return self._name_bytes[start:stop].tobytes().decode() or None
+
+    def names(self) -> List[Optional[str]]:
+        blob = self._name_bytes.tobytes().decode()
+        offsets = self._name_offsets.tolist()
+        # Names are ASCII in practice, fall back to decoding one by one otherwise
+        if len(blob) != len(self._name_bytes):
+            return [self.get_name(i) for i in range(len(self))]
+        return [blob[a:b] or None for a, b in zip(offsets, offsets[1:])]
+
+    def iter_shapes(self) -> Iterator[Shape]:
+        """
+        Materializes the rows as Shape objects, ints restored so they export exactly as before.
+        """
+        shape_cls = self.shape_cls
+        # Same attribute order as the constructors, so __dict__ based keys match the original shapes
+        keys = POSE_FIELDS + ("color", "_name") + tuple(shape_cls.dimension_names)
+        stacked = np.hstack([self.poses, self.dimensions])
+        columns = stacked.T.tolist()
+        for c, flags in enumerate(self.is_int.T):
+            if flags.any():
+                ints = stacked[:, c].astype(np.int64).tolist()
+                columns[c] = [i if flag else v for v, i, flag in zip(columns[c], ints, flags.tolist())]
+        colors = [self.colors[i] for i in self.color_index.tolist()]
+        npose = len(POSE_FIELDS)
+        rows = zip(*columns[:npose], colors, self.names(), *columns[npose:])
+        new, extras = shape_cls.__new__, self.extras
+        for row, values in enumerate(rows):
+            shape = new(shape_cls)
+            shape.__dict__.update(zip(keys, values))
+            if extras and row in extras:
+                shape.__dict__.update(extras[row])
+            yield shape
+
+
+class Snapshot:
+    """
+    An opened snapshot file. The file is memory mapped and columns are only read when they are used,
+    so opening is fast whatever the size. Shape objects of each class are in tables, ShapeBatches in
+    batches with read-only columns, and any other objects are unpickled when iterated.
+    """
+
+    def __init__(self, filename: str):
+        with open(filename, "rb") as f:
+            magic, version, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{filename} is not a world snapshot")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"{filename} is a version {version} snapshot, expected version {SNAPSHOT_VERSION}")
+            header = json.loads(f.read(header_size))
+        self.filename = filename
+        self.name: str = header["name"]
+        self.settings: Dict[str, Any] = _tuples(header["settings"])
+        self._raw = np.memmap(filename, dtype=np.uint8, mode="r")
+        self._arrays: Dict[str, Any] = header["arrays"]
+        self._data_start = header["data_start"]
+        self.tables = [ShapeTable(load_class(t["class"]), {c: self.array(f"table{i}/{c}") for c in t["columns"]},
+                                  t["colors"], {int(k): v for k, v in t["extras"].items()})
+                       for i, t in enumerate(header["tables"])]
+        self._batches = header["batches"]
+        self._pickled = header["pickled"]
+
+    def array(self, key: str) -> np.ndarray:
+        """
+        Read-only view of a stored array, nothing is read from disk until its values are used.
+        """
+        spec = self._arrays[key]
+        dtype = np.dtype(spec["dtype"])
+        start = self._data_start + spec["offset"]
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        return self._raw[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    @property
+    def order(self) -> np.ndarray:
+        """
+        Where each object of the world comes from, in world order: table index, then batch index
+        offset by the number of tables, then pickled object index offset by both.
+        """
+        return self.array("order")
+
+    def batch(self, index: int) -> ShapeBatch:
+        spec = self._batches[index]
+        batch = ShapeBatch.__new__(ShapeBatch)
+        batch.shape_cls = load_class(spec["class"])
+        batch.poses = self.array(f"batch{index}/poses")
+        batch.dimensions = self.array(f"batch{index}/dimensions")
+        batch.colors = self.array(f"batch{index}/colors")
+        batch._name = spec["name"]
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def iter_objects(self, writable: bool = True) -> Iterator[Any]:
+        """
+        The world's objects in their original order. Batches get copies of their columns unless
+        writable is False.
+        """
+        tables = [table.iter_shapes() for table in self.tables]
+        ntables, nbatches = len(tables), len(self._batches)
+        blob, offsets = self.array("pickled"), self.array("pickled_offsets").tolist()
+        for code in self.order.tolist():
+            if code < ntables:
+                yield next(tables[code])
+            elif code < ntables + nbatches:
+                batch = self.batch(code - ntables)
+                if writable:
+                    batch.poses, batch.dimensions, batch.colors = map(np.array, (batch.poses, batch.dimensions, batch.colors))
+                yield batch
+            else:
+                index = code - ntables - nbatches
+                yield pickle.loads(blob[offsets[index]:offsets[index + 1]].tobytes())
+
+
+def _shape_extras(shape: Shape, fixed: frozenset) -> Optional[dict]:
+    # Attributes beyond the columns, or None when the shape can't be stored as a table row
+    attributes = shape.__dict__
+    if attributes.keys() == fixed:
+        return {}
+    if not fixed <= attributes.keys():
+        return None
+    extras = {k: v for k, v in attributes.items() if k not in fixed}
+    try:
+        if json.loads(json.dumps(extras)) == extras:
+            return extras
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def _is_column_value(value: Any) -> bool:
+    # Floats and ints, NumPy ones included, export the same after a round trip through float64 columns
+    return type(value) is float or type(value) is int or (
+        isinstance(value, (float, numbers.Integral)) and not isinstance(value, bool))
+
+
+def write_snapshot(filename: str, name: str, settings: Dict[str, Any], objects: Iterable[Any]) -> None:
+    """
+    Writes a world as a snapshot: a small JSON header followed by aligned raw arrays. Shape objects are
+    stored as columns per class and ShapeBatches as their arrays. Other objects, and shapes with
+    attributes that don't fit JSON or pose and dimension values other than ints and floats, are pickled.
+    """
+    tables: Dict[type, List[Shape]] = {}
+    table_codes: Dict[type, int] = {}
+    batches: List[ShapeBatch] = []
+    pickled: List[bytes] = []
+    table_extras: Dict[type, Dict[int, dict]] = {}
+    order: List[Tuple[str, int]] = []
+    fixed_fields: Dict[type, Tuple[frozenset, Callable[[dict], tuple]]] = {}
+    for obj in objects:
+        if isinstance(obj, Shape):
+            cls = type(obj)
+            if cls not in fixed_fields:
+                numeric = POSE_FIELDS + tuple(cls.dimension_names)
+                fixed_fields[cls] = (frozenset(numeric + ("color", "_name")), operator.itemgetter(*numeric))
+            fixed, getter = fixed_fields[cls]
+            extras = _shape_extras(obj, fixed)
+            if extras is not None and all(map(_is_column_value, getter(obj.__dict__))):
+                rows = tables.setdefault(cls, [])
+                table_codes.setdefault(cls, len(table_codes))
+                if extras:
+                    table_extras.setdefault(cls, {})[len(rows)] = extras
+                order.append(("table", table_codes[cls]))
+                rows.append(obj)
+                continue
+        elif isinstance(obj, ShapeBatch):
+            order.append(("batch", len(batches)))
+            batches.append(obj)
+            continue
+        order.append(("pickled", len(pickled)))
+        pickled.append(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    arrays: Dict[str, np.ndarray] = {}
+    header_tables = []
+    for cls, rows in sorted(tables.items(), key=lambda item: table_codes[item[0]]):
+        i = table_codes[cls]
+        fields = POSE_FIELDS + tuple(cls.dimension_names)
+        getter = operator.itemgetter(*fields)
+        values = [getter(s.__dict__) for s in rows]
+        columns = np.array(values, dtype=np.float64).reshape(len(rows), len(fields))
+        # Only integral values can have been ints, so only those are type checked
+        is_int = np.zeros(columns.shape, dtype=bool)
+        candidates = np.nonzero(columns == np.floor(columns))
+        is_int[candidates] = [isinstance(values[r][c], numbers.Integral) for r, c in zip(*(i.tolist() for i in candidates))]
+        colors: Dict[str, int] = {}
+        color_index = np.array([colors.setdefault(s.color, len(colors)) for s in rows], dtype=np.uint32)
+        names, name_offsets = _encode_strings([s._name or "" for s in rows])
+        table = {
+            "poses": columns[:, :len(POSE_FIELDS)],
+            "dimensions": columns[:, len(POSE_FIELDS):],
+            "color_index": color_index,
+            "is_int": is_int,
+            "names": names,
+            "name_offsets": name_offsets,
+        }
+        arrays.update((f"table{i}/{k}", v) for k, v in table.items())
+        header_tables.append({"class": class_path(cls), "columns": list(table), "colors": list(colors),
+                              "extras": {str(k): v for k, v in table_extras.get(cls, {}).items()}})
+    for i, batch in enumerate(batches):
+        arrays[f"batch{i}/poses"] = batch.poses
+        arrays[f"batch{i}/dimensions"] = batch.dimensions
+        arrays[f"batch{i}/colors"] = batch.colors
+    arrays["pickled"], arrays["pickled_offsets"] = np.frombuffer(b"".join(pickled), dtype=np.uint8), np.cumsum([0] + [len(p) for p in pickled], dtype=np.uint64)
+    base = {"table": 0, "batch": len(header_tables), "pickled": len(header_tables) + len(batches)}
+    arrays["order"] = np.array([base[kind] + index for kind, index in order], dtype=np.uint32)
+
+    specs, offset = {}, 0
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[key] = array
+        specs[key] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = {"name": name, "settings": settings, "arrays": specs, "tables": header_tables,
+              "batches": [{"class": class_path(b.shape_cls), "name": b._name} for b in batches],
+              "pickled": len(pickled), "data_start": 0}
+    # The data starts at the first aligned offset after the header, which depends on its own length
+    encoded = json.dumps(header).encode()
+    data_start = -(-(_PREAMBLE.size + len(encoded) + 32) // ALIGNMENT) * ALIGNMENT
+    header["data_start"] = data_start
+    encoded = json.dumps(header).encode()
+    # Written under a temporary name and renamed, so snapshots mapped by readers are never changed in place
+    with atomic_path(filename) as tmp, open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(encoded)))
+        f.write(encoded)
+        f.write(b"\0" * (data_start - f.tell()))
+        for key, array in arrays.items():
+            f.seek(data_start + specs[key]["offset"])
+            array.tofile(f)
+        f.truncate(data_start + offset)
+
+
+def open_snapshot(filename: str) -> Snapshot:
+    return Snapshot(filename)
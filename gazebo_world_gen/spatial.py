@@ -0,0 +1,211 @@
+import heapq
+import math
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+Bounds = Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+Cell = Tuple[int, int, int]
+
+
+def _overlaps(a: Bounds, b: Bounds) -> bool:
+    (alo, ahi), (blo, bhi) = a, b
+    return (alo[0] < bhi[0] and blo[0] < ahi[0] and
+            alo[1] < bhi[1] and blo[1] < ahi[1] and
+            alo[2] < bhi[2] and blo[2] < ahi[2])
+
+
+def _distance(point: Sequence[float], bounds: Bounds) -> float:
+    lower, upper = bounds
+    total = 0.0
+    for p, lo, hi in zip(point, lower, upper):
+        d = lo - p if p < lo else p - hi if p > hi else 0.0
+        total += d * d
+    return math.sqrt(total)
+
+
+class SpatialIndex:
+    """
+    Uniform hash grid over the axis aligned bounding boxes of world objects.
+
+    Each object is registered in every cell its box touches, so cell_size should be around the size
+    of a typical object. Objects that would cover more than max_cells cells, such as ground planes,
+    are kept in a separate list that every query checks. Rows of a ShapeBatch, and the shapes of a
+    ShapeGroup, are indexed one by one and returned as (batch, row) or (group, row) tuples. The index does not notice objects that move, call update
+    after changing an indexed shape's pose or dimensions.
+    """
+
+    def __init__(self, cell_size: float = 1.0, max_cells: int = 64):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self._cells: Dict[Cell, Set[Hashable]] = {}
+        self._bounds: Dict[Hashable, Bounds] = {}
+        self._objects: Dict[Hashable, Any] = {}
+        self._cell_range: Dict[Hashable, Tuple[Cell, Cell]] = {}
+        self._large: Set[Hashable] = set()
+        self._occupied: Optional[Tuple[List[int], List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def _cell_of(self, point: Sequence[float]) -> Cell:
+        size = self.cell_size
+        return (math.floor(point[0] / size), math.floor(point[1] / size), math.floor(point[2] / size))
+
+    def _iter_cells(self, first: Cell, last: Cell) -> Iterator[Cell]:
+        for i in range(first[0], last[0] + 1):
+            for j in range(first[1], last[1] + 1):
+                for k in range(first[2], last[2] + 1):
+                    yield (i, j, k)
+
+    def insert_bounds(self, key: Hashable, obj: Any, bounds: Bounds) -> None:
+        """
+        Indexes obj under key with the given (lower, upper) bounds, replacing an earlier entry for key.
+        """
+        if key in self._bounds:
+            self.remove_key(key)
+        lower, upper = (tuple(map(float, bounds[0])), tuple(map(float, bounds[1])))
+        self._bounds[key] = (lower, upper)
+        self._objects[key] = obj
+        first, last = self._cell_of(lower), self._cell_of(upper)
+        count = (last[0] - first[0] + 1) * (last[1] - first[1] + 1) * (last[2] - first[2] + 1)
+        if count > self.max_cells:
+            self._large.add(key)
+            return
+        self._cell_range[key] = (first, last)
+        for cell in self._iter_cells(first, last):
+            self._cells.setdefault(cell, set()).add(key)
+        if self._occupied is None:
+            self._occupied = (list(first), list(last))
+        else:
+            low, high = self._occupied
+            for axis in range(3):
+                low[axis] = min(low[axis], first[axis])
+                high[axis] = max(high[axis], last[axis])
+
+    def remove_key(self, key: Hashable) -> None:
+        del self._bounds[key]
+        del self._objects[key]
+        if key in self._large:
+            self._large.discard(key)
+            return
+        first, last = self._cell_range.pop(key)
+        for cell in self._iter_cells(first, last):
+            members = self._cells[cell]
+            members.discard(key)
+            if not members:
+                del self._cells[cell]
+
+    @staticmethod
+    def supports(obj: Any) -> bool:
+        return hasattr(obj, "get_aabb") or hasattr(obj, "get_aabbs")
+
+    def insert(self, obj: Any) -> None:
+        """
+        Indexes a shape, or every row of a ShapeBatch or shape of a ShapeGroup.
+        """
+        if hasattr(obj, "get_aabbs"):
+            lower, upper = obj.get_aabbs()
+            for row, bounds in enumerate(zip(lower.tolist(), upper.tolist())):
+                self.insert_bounds((id(obj), row), (obj, row), bounds)
+        else:
+            self.insert_bounds(id(obj), obj, obj.get_aabb())
+
+    def remove(self, obj: Any) -> None:
+        if hasattr(obj, "get_aabbs"):
+            for row in range(len(obj)):
+                self.remove_key((id(obj), row))
+        else:
+            self.remove_key(id(obj))
+
+    def update(self, obj: Any) -> None:
+        """
+        Re-indexes an object after its pose or dimensions changed.
+        """
+        self.remove(obj)
+        self.insert(obj)
+
+    def _candidates(self, bounds: Bounds) -> Set[Hashable]:
+        first, last = self._cell_of(bounds[0]), self._cell_of(bounds[1])
+        found = set(self._large)
+        if self._occupied is None:
+            return found
+        # Clamp the query to occupied cells, so huge query boxes don't walk empty space
+        low, high = self._occupied
+        first = tuple(max(f, l) for f, l in zip(first, low))
+        last = tuple(min(t, h) for t, h in zip(last, high))
+        if any(f > t for f, t in zip(first, last)):
+            return found
+        cells = self._cells
+        volume = (last[0] - first[0] + 1) * (last[1] - first[1] + 1) * (last[2] - first[2] + 1)
+        if volume > len(cells):
+            for cell, members in cells.items():
+                if all(f <= c <= t for f, c, t in zip(first, cell, last)):
+                    found.update(members)
+        else:
+            for cell in self._iter_cells(first, last):
+                members = cells.get(cell)
+                if members:
+                    found.update(members)
+        return found
+
+    def query_aabb(self, lower: Sequence[float], upper: Sequence[float]) -> List[Any]:
+        """
+        Returns the objects whose bounding boxes intersect the box lower..upper.
+        """
+        query = (tuple(lower), tuple(upper))
+        return [self._objects[key] for key in self._candidates(query) if _overlaps(self._bounds[key], query)]
+
+    def query_radius(self, center: Sequence[float], radius: float) -> List[Any]:
+        """
+        Returns the objects whose bounding boxes come within radius of center.
+        """
+        query = (tuple(c - radius for c in center), tuple(c + radius for c in center))
+        return [self._objects[key] for key in self._candidates(query) if _distance(center, self._bounds[key]) <= radius]
+
+    def nearest(self, point: Sequence[float], k: int = 1) -> List[Any]:
+        """
+        Returns up to k objects ordered by the distance from point to their bounding boxes.
+        """
+        best: List[Tuple[float, int, Hashable]] = []
+        seen: Set[Hashable] = set()
+        order = 0
+
+        def consider(keys: Iterable[Hashable]) -> None:
+            nonlocal order
+            for key in keys:
+                if key in seen:
+                    continue
+                seen.add(key)
+                order += 1
+                entry = (-_distance(point, self._bounds[key]), order, key)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry[0] > best[0][0]:
+                    heapq.heapreplace(best, entry)
+
+        consider(self._large)
+        if self._occupied is not None:
+            center = self._cell_of(point)
+            low, high = self._occupied
+            max_ring = max(max(abs(c - l), abs(h - c)) for c, l, h in zip(center, low, high))
+            for ring in range(max_ring + 1):
+                first = tuple(max(c - ring, l) for c, l in zip(center, low))
+                last = tuple(min(c + ring, h) for c, h in zip(center, high))
+                for cell in self._iter_cells(first, last):
+                    if max(abs(a - b) for a, b in zip(cell, center)) == ring and cell in self._cells:
+                        consider(self._cells[cell])
+                # Anything not seen yet lies outside this ring, at least ring * cell_size away
+                if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                    break
+        return [self._objects[key] for _, _, key in sorted(best, key=lambda e: (-e[0], e[1]))]
+
+    def would_overlap(self, shape: Any, margin: float = 0.0) -> bool:
+        """
+        Checks whether the bounding box of shape, grown by margin, intersects any indexed object.
+        The shape itself is ignored if it is already indexed.
+        """
+        lower, upper = shape.get_aabb()
+        query = (tuple(c - margin for c in lower), tuple(c + margin for c in upper))
+        own = id(shape)
+        return any(key != own and _overlaps(self._bounds[key], query) for key in self._candidates(query))
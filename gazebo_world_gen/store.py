@@ -0,0 +1,73 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+
+class ObjectStore:
+    """
+    Insertion ordered collection of world objects with O(1) add, remove and lookup by name.
+    Objects are keyed by identity. The name index is built on the first lookup so names can stay
+    lazy until then, call reindex after renaming objects that were already looked up.
+    append and indexing keep code written for the former list of objects working, indexing walks the
+    objects and takes O(n).
+    """
+
+    def __init__(self, objects: Iterable[Any] = ()):
+        self._items: Dict[int, Any] = {}
+        self._by_name: Optional[Dict[str, Any]] = None
+        for obj in objects:
+            self.add(obj)
+
+    def add(self, obj: Any) -> None:
+        key = id(obj)
+        if key in self._items:
+            raise ValueError(f"{obj!r} is already in the world")
+        self._items[key] = obj
+        if self._by_name is not None:
+            self._by_name[obj.name] = obj
+
+    def append(self, obj: Any) -> None:
+        self.add(obj)
+
+    def remove(self, obj: Any) -> None:
+        try:
+            del self._items[id(obj)]
+        except KeyError:
+            raise ValueError(f"{obj!r} is not in the world") from None
+        if self._by_name is not None and self._by_name.get(obj.name) is obj:
+            del self._by_name[obj.name]
+
+    def reindex(self) -> Dict[str, Any]:
+        """
+        Rebuilds the name index, needed after renaming objects that are already in the store.
+        """
+        self._by_name = {obj.name: obj for obj in self._items.values()}
+        return self._by_name
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        Returns the object called name, or None if there is none.
+        """
+        index = self._by_name if self._by_name is not None else self.reindex()
+        obj = index.get(name)
+        if obj is not None and obj.name != name:
+            # The object was renamed after it was indexed
+            obj = self.reindex().get(name)
+        return obj
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._by_name = None
+
+    def __contains__(self, obj: Any) -> bool:
+        return id(obj) in self._items
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, int) and 0 <= index < len(self._items):
+            return next(islice(self._items.values(), index, None))
+        return list(self._items.values())[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
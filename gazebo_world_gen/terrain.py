@@ -0,0 +1,259 @@
+import os
+import struct
+import zlib
+from concurrent.futures import Future
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .assets import AssetWriter
+from .batch import ShapeBatch
+
+# Rows of the height array converted and compressed at a time when writing images
+ROW_BLOCK = 256
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png16(filename: str, width: int, height: int, blocks: Iterable[np.ndarray]) -> None:
+    """
+    Writes a 16 bit grayscale PNG from row blocks of uint16 values, compressing one block at a
+    time so the whole image never has to be in memory.
+    """
+    compressor = zlib.compressobj(6)
+    rows_written = 0
+    with open(filename, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 16, 0, 0, 0, 0)))
+        for block in blocks:
+            rows = np.empty((len(block), 1 + 2 * width), dtype=np.uint8)
+            # Filter type 0 (none) in front of every row, then big endian samples
+            rows[:, 0] = 0
+            rows[:, 1:] = np.ascontiguousarray(block, dtype=">u2").view(np.uint8).reshape(len(block), -1)
+            data = compressor.compress(rows.tobytes())
+            if data:
+                f.write(_png_chunk(b"IDAT", data))
+            rows_written += len(block)
+        f.write(_png_chunk(b"IDAT", compressor.flush()))
+        f.write(_png_chunk(b"IEND", b""))
+    if rows_written != height:
+        raise ValueError(f"Got {rows_written} rows for an image of height {height}")
+
+
+def heightmap_size(samples: int) -> int:
+    """
+    Smallest image side of the form 2^n + 1 that Gazebo accepts and that holds samples samples.
+    """
+    side = 2
+    while side + 1 < samples:
+        side *= 2
+    return side + 1
+
+
+class Tile:
+    """
+    Square part of a Heightmap, starting at sample (row, col) and spanning side samples, which may
+    reach past the edge of the height array.
+    """
+
+    def __init__(self, name: str, row: int, col: int, side: int):
+        self.name = name
+        self.row = row
+        self.col = col
+        self.side = side
+
+
+class Heightmap:
+    """
+    Terrain from a 2D array of heights in meters, or the path of a .npy file, which is memory mapped.
+
+    Row 0 of the array is the +y edge of the terrain and column 0 the -x edge, like the pixels of
+    Gazebo heightmap images. size is the (x, y) extent in meters, by default one meter per sample,
+    and position is where the center of the terrain is placed. Heights are written as 16 bit PNG
+    images to image_dir on export, a block of rows at a time. Gazebo needs square images with 2^n + 1
+    pixels a side, so the heights are split into tiles of tile_size samples, each exported as its own
+    model, or into a single tile without tile_size. Tiles at the edges are padded by repeating the
+    last row and column, which extends the terrain slightly when its sample counts don't fit.
+    The images are written through writer, an AssetWriter, which a World sets to its asset_writer
+    when the terrain is added. Without one they are written before the models are yielded.
+    """
+
+    def __init__(self, heights: Union[np.ndarray, str], size: Optional[Tuple[float, float]] = None,
+                 position: Sequence[float] = (0, 0, 0), name: str = "terrain", image_dir: str = "terrain",
+                 tile_size: Optional[int] = None, writer: Optional[AssetWriter] = None):
+        if isinstance(heights, (str, os.PathLike)):
+            heights = np.load(heights, mmap_mode="r")
+        if heights.ndim != 2 or min(heights.shape) < 2:
+            raise ValueError(f"Expected a 2D height array, got shape {heights.shape}")
+        self.heights = heights
+        rows, cols = heights.shape
+        self.size = tuple(size) if size is not None else (float(cols - 1), float(rows - 1))
+        self.position = tuple(position)
+        self.name = name
+        self.image_dir = image_dir
+        if tile_size is not None and heightmap_size(tile_size) != tile_size:
+            raise ValueError(f"tile_size must be 2^n + 1, got {tile_size}")
+        self.tile_size = tile_size
+        self.writer = writer
+        self._range: Optional[Tuple[float, float]] = None
+        # Futures of the image writes of the last export
+        self._written: List[Future] = []
+
+    def set_default_writer(self, writer: AssetWriter) -> None:
+        """
+        Writes the images with writer unless the terrain already has one.
+        """
+        if self.writer is None:
+            self.writer = writer
+
+    @property
+    def resolution(self) -> Tuple[float, float]:
+        """
+        Meters between samples along x and y.
+        """
+        rows, cols = self.heights.shape
+        return self.size[0] / (cols - 1), self.size[1] / (rows - 1)
+
+    def height_range(self) -> Tuple[float, float]:
+        """
+        Lowest and highest height, computed a block of rows at a time and kept.
+        """
+        if self._range is None:
+            low, high = np.inf, -np.inf
+            for start in range(0, len(self.heights), ROW_BLOCK):
+                block = self.heights[start:start + ROW_BLOCK]
+                low, high = min(low, float(block.min())), max(high, float(block.max()))
+            self._range = (low, high)
+        return self._range
+
+    def tiles(self) -> List[Tile]:
+        rows, cols = self.heights.shape
+        side = self.tile_size or heightmap_size(max(rows, cols))
+        step = side - 1
+        # Neighbouring tiles share their border samples so the surface has no gaps
+        return [Tile(f"{self.name}_{i}_{j}" if self.tile_size else self.name, row, col, side)
+                for i, row in enumerate(range(0, max(rows - 1, 1), step))
+                for j, col in enumerate(range(0, max(cols - 1, 1), step))]
+
+    def _tile_blocks(self, tile: Tile) -> Iterator[np.ndarray]:
+        rows, cols = self.heights.shape
+        low, high = self.height_range()
+        scale = 65535 / (high - low) if high > low else 0.0
+        col_index = np.minimum(np.arange(tile.col, tile.col + tile.side), cols - 1)
+        for start in range(tile.row, tile.row + tile.side, ROW_BLOCK):
+            row_index = np.minimum(np.arange(start, min(start + ROW_BLOCK, tile.row + tile.side)), rows - 1)
+            block = self.heights[np.ix_(row_index, col_index)]
+            yield np.rint((block - low) * scale).astype(np.uint16)
+
+    def image_path(self, tile: Tile) -> str:
+        return os.path.abspath(os.path.join(self.image_dir, f"{tile.name}.png"))
+
+    def write_images(self) -> List[str]:
+        """
+        Writes the height image of every tile and returns their paths. With a threaded writer the
+        images are only submitted to it, they are written once writer.wait() returns.
+        """
+        writer = self.writer or AssetWriter(workers=0)
+        paths, futures = [], []
+        for tile in self.tiles():
+            path = self.image_path(tile)
+            futures.append(writer.submit(path, lambda target, tile=tile: write_png16(target, tile.side, tile.side, self._tile_blocks(tile))))
+            paths.append(path)
+        self._written = futures
+        return paths
+
+    def clear_images(self) -> None:
+        """
+        Makes the next export write the images again, needed after changing the heights in place.
+        """
+        self._written = []
+        self._range = None
+
+    def tile_pose(self, tile: Tile) -> Tuple[float, float, float]:
+        res_x, res_y = self.resolution
+        center = (tile.side - 1) / 2
+        x = self.position[0] - self.size[0] / 2 + (tile.col + center) * res_x
+        y = self.position[1] + self.size[1] / 2 - (tile.row + center) * res_y
+        return x, y, self.position[2]
+
+    def get_tile_xml(self, tile: Tile) -> str:
+        low, high = self.height_range()
+        res_x, res_y = self.resolution
+        x, y, z = self.tile_pose(tile)
+        heightmap = f"""
+          <heightmap>
+            <uri>file://{self.image_path(tile)}</uri>
+            <size>{(tile.side - 1) * res_x} {(tile.side - 1) * res_y} {high - low}</size>
+            <pos>0 0 {low}</pos>
+          </heightmap>
+"""
+        return f"""
+<model name="{tile.name}">
+  <static>true</static>
+  <pose>{x} {y} {z} 0 0 0</pose>
+  <link name="link">
+    <collision name="collision">
+      <geometry>{heightmap}      </geometry>
+    </collision>
+    <visual name="visual">
+      <geometry>{heightmap}      </geometry>
+    </visual>
+  </link>
+</model>
+"""
+
+    def iter_gz_xml(self) -> Iterator[str]:
+        """
+        Yields one model per tile, writing the images first unless they were already written.
+        """
+        # Images are written again after a failed write
+        if not self._written or any(f.done() and f.exception() is not None for f in self._written):
+            self.write_images()
+        for tile in self.tiles():
+            yield self.get_tile_xml(tile)
+
+    def get_gz_xml(self) -> str:
+        return "\n".join(self.iter_gz_xml())
+
+    def height_at(self, x: Any, y: Any) -> np.ndarray:
+        """
+        Terrain height at world coordinates x, y, interpolated bilinearly between samples. Takes
+        scalars or arrays and only reads the samples around the queried points, NaN outside the terrain.
+        """
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+        rows, cols = self.heights.shape
+        res_x, res_y = self.resolution
+        col = (x - (self.position[0] - self.size[0] / 2)) / res_x
+        row = ((self.position[1] + self.size[1] / 2) - y) / res_y
+        inside = (col >= 0) & (col <= cols - 1) & (row >= 0) & (row <= rows - 1)
+        col, row = np.where(inside, col, 0), np.where(inside, row, 0)
+        c0 = np.minimum(np.floor(col).astype(np.intp), cols - 2)
+        r0 = np.minimum(np.floor(row).astype(np.intp), rows - 2)
+        fc, fr = col - c0, row - r0
+        h = self.heights
+        top = h[r0, c0] * (1 - fc) + h[r0, c0 + 1] * fc
+        bottom = h[r0 + 1, c0] * (1 - fc) + h[r0 + 1, c0 + 1] * fc
+        height = top * (1 - fr) + bottom * fr + self.position[2]
+        return np.where(inside, height, np.nan)
+
+    def drop(self, objects: Iterable[Any]) -> None:
+        """
+        Moves shapes and ShapeBatch rows vertically so the bottom of their bounding box rests on the
+        terrain under their origin. Objects outside the terrain keep their height.
+        """
+        shapes = []
+        for obj in objects:
+            if isinstance(obj, ShapeBatch):
+                lower, _ = obj.get_aabbs()
+                ground = self.height_at(obj.poses[:, 0], obj.poses[:, 1])
+                obj.poses[:, 2] = np.where(np.isnan(ground), obj.poses[:, 2], obj.poses[:, 2] + ground - lower[:, 2])
+            elif hasattr(obj, "get_aabb"):
+                shapes.append(obj)
+        if not shapes:
+            return
+        ground = self.height_at([s.x for s in shapes], [s.y for s in shapes]).tolist()
+        for shape, z in zip(shapes, ground):
+            if z == z:
+                shape.z = shape.z + z - shape.get_aabb()[0][2]
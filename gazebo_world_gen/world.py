@@ -1,5 +1,22 @@
+from contextlib import nullcontext
 from enum import Enum
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Iterator, Optional, Callable, Iterable
+
+from .assets import AssetWriter, atomic_path
+from .collision import CollisionSimplifier
+from .compression import compact_xml, compression_for, open_compressed, open_world_file, world_filename, write_chunks
+from .group import expand_groups
+from .instancing import InstanceLibrary
+from .instrumentation import Instrumentation, TimedWriter, iter_with_progress
+from .loader import load_world_into
+from .merge import StaticMerger
+from .parallel import iter_models_xml_parallel
+from .scatter import ScatterResult, scatter_shapes
+from .snapshot import open_snapshot, write_snapshot
+from .spatial import SpatialIndex
+from .store import ObjectStore
+
+STREAM_BUFFER_SIZE = 1 << 20
 
 class PhysicsEngine(Enum):
     ODE = "ode"
@@ -21,9 +38,27 @@ class AudioDevice(Enum):
     CUSTOM = "custom"
 
 class World:
-    def __init__(self, name: str = "default"):
+    def __init__(self, name: str = "default", naming: Optional[Callable[[Any], str]] = None, cache_xml: bool = False):
         self.name = name
-        self.objects = []
+        # Naming strategy for added objects that have no name yet, e.g. CounterNaming() for reproducible output
+        self.naming = naming
+        self.objects = ObjectStore()
+        # With cache_xml the XML of each shape in the world is kept and reused by later exports until the
+        # shape changes, keyed by id(obj) and holding (obj.state_key(), xml)
+        self._xml_cache: Optional[Dict[int, Tuple[tuple, str]]] = {} if cache_xml else None
+        self._settings_xml: Optional[Tuple[str, str, str]] = None
+        # Optional SpatialIndex kept up to date by add_object/remove_object, see enable_spatial_index
+        self.spatial_index: Optional[SpatialIndex] = None
+        # Optional InstanceLibrary that exports repeated shapes as includes, see enable_instancing
+        self.instancing: Optional[InstanceLibrary] = None
+        # Optional StaticMerger that exports the shapes of each spatial cell as one model, see enable_merging
+        self.merging: Optional[StaticMerger] = None
+        # Optional CollisionSimplifier giving mesh shapes primitive collisions, see enable_collision_simplification
+        self.collision_simplifier: Optional[CollisionSimplifier] = None
+        # Optional Instrumentation collecting timers and counters, see enable_instrumentation
+        self.instrumentation: Optional[Instrumentation] = None
+        # Writes the model files and meshes of instancing and merging, and terrain images, in the background during exports
+        self.asset_writer = AssetWriter()
         self.settings: Dict[str, Any] = {
             "gravity": (0, 0, -9.8),
             "ambient_light": (0.4, 0.4, 0.4, 1),
@@ -114,13 +149,127 @@ class World:
         }
 
     def add_object(self, obj: Any) -> None:
-        self.objects.append(obj)
+        if self.naming is not None and hasattr(obj, "set_default_name"):
+            obj.set_default_name(self.naming)
+        if hasattr(obj, "set_default_writer"):
+            obj.set_default_writer(self.asset_writer)
+        self.objects.add(obj)
+        if self.spatial_index is not None and SpatialIndex.supports(obj):
+            self.spatial_index.insert(obj)
+
+    def add_objects(self, objects: Iterable[Any]) -> None:
+        with self._phase("add"):
+            for obj in objects:
+                self.add_object(obj)
 
     def remove_object(self, obj: Any) -> None:
         self.objects.remove(obj)
+        if self._xml_cache is not None:
+            self._xml_cache.pop(id(obj), None)
+        if self.spatial_index is not None and SpatialIndex.supports(obj):
+            self.spatial_index.remove(obj)
+
+    def remove_objects(self, objects: Iterable[Any]) -> None:
+        for obj in objects:
+            self.remove_object(obj)
+
+    def empty_copy(self) -> "World":
+        """
+        Returns a world without objects that has this world's name, naming, XML caching, spatial index,
+        instancing, merging and collision simplification configuration. Settings are not copied.
+        """
+        world = World(self.name, naming=self.naming, cache_xml=self._xml_cache is not None)
+        if self.spatial_index is not None:
+            world.enable_spatial_index(self.spatial_index.cell_size, self.spatial_index.max_cells)
+        if self.instancing is not None:
+            world.enable_instancing(self.instancing.models_dir, self.instancing.min_instances)
+        if self.merging is not None:
+            merging = self.merging
+            world.enable_merging(merging.cell_size, merging.mode, merging.mesh_dir, merging.extension).prefix = merging.prefix
+        if self.collision_simplifier is not None:
+            world.enable_collision_simplification(self.collision_simplifier.tolerance, self.collision_simplifier.relative)
+        return world
+
+    def enable_spatial_index(self, cell_size: float = 1.0, max_cells: int = 64) -> SpatialIndex:
+        """
+        Builds a SpatialIndex over the objects in the world and keeps it updated as objects are added and removed.
+        """
+        self.spatial_index = SpatialIndex(cell_size, max_cells)
+        for obj in self.objects:
+            if SpatialIndex.supports(obj):
+                self.spatial_index.insert(obj)
+        return self.spatial_index
+
+    def enable_instancing(self, models_dir: str, min_instances: int = 2) -> InstanceLibrary:
+        """
+        Exports shapes whose class, dimensions and color occur at least min_instances times as
+        <include>s of a shared model, written to models_dir on export. models_dir must be on
+        Gazebo's model path when the world is loaded.
+        """
+        self.instancing = InstanceLibrary(models_dir, min_instances, self.asset_writer)
+        return self.instancing
+
+    def enable_merging(self, cell_size: float = 10.0, mode: str = "links", mesh_dir: str = "merged_meshes",
+                       extension: str = ".dae") -> StaticMerger:
+        """
+        Exports the shapes in each cell_size x cell_size cell as a single model, see merge.StaticMerger.
+        mode "links" keeps every shape as a link of the cell's model, mode "mesh" bakes them into one
+        mesh per color, written to mesh_dir on export. Shapes merged this way are not instanced.
+        """
+        self.merging = StaticMerger(cell_size, mode, mesh_dir, extension, writer=self.asset_writer)
+        return self.merging
+
+    def enable_collision_simplification(self, tolerance: float = 0.05, relative: bool = False) -> CollisionSimplifier:
+        """
+        Exports mesh shapes with the cheapest collision geometry within tolerance of their shape,
+        see collision.CollisionSimplifier. Its report() estimates the collision cost of the last
+        export before and after.
+        """
+        self.collision_simplifier = CollisionSimplifier(tolerance, relative)
+        return self.collision_simplifier
+
+    def enable_instrumentation(self, trace_memory: bool = False, hooks: Iterable[Callable[[str, float], None]] = ()) -> Instrumentation:
+        """
+        Collects timers, per-class render counts and memory samples of add_objects and of exports, see
+        instrumentation.Instrumentation. The phases are "add" (naming and storing objects), "merge",
+        "instance", "render", "write" and "save", the whole of save_gz_world. Without instrumentation
+        none of this is measured.
+        """
+        self.instrumentation = Instrumentation(trace_memory, hooks)
+        return self.instrumentation
+
+    def _phase(self, name: str) -> Any:
+        return self.instrumentation.phase(name) if self.instrumentation is not None else nullcontext()
+
+    def scatter(self, shape_factory: Any, region: Tuple[float, float, float, float], count: int,
+                min_spacing: float = 0.0, seed: Optional[int] = None, terrain: Any = None) -> ScatterResult:
+        """
+        Places up to count non-overlapping shapes in region (xmin, ymin, xmax, ymax) and adds them to the world,
+        see scatter.scatter_shapes. With a spatial index enabled, positions that overlap existing objects are skipped.
+        With a terrain Heightmap the shapes are dropped onto its surface.
+        """
+        result = scatter_shapes(shape_factory, region, count, min_spacing, seed, avoid=self.spatial_index)
+        if terrain is not None:
+            terrain.drop(result.shapes)
+        self.add_objects(result.shapes)
+        return result
+
+    def get_object(self, name: str) -> Optional[Any]:
+        """
+        Returns the object with the given name, or None.
+        """
+        return self.objects.get(name)
+
+    def clear_xml_cache(self) -> None:
+        """
+        Drops all cached XML, needed after changing a shape attribute in place, e.g. appending to a list.
+        """
+        if self._xml_cache is not None:
+            self._xml_cache.clear()
+        self._settings_xml = None
 
     def get_objects(self) -> list:
-        return self.objects
+        return list(self.objects)
 
     def get_light_xml(self) -> str:
         light = self.settings["light"]
@@ -175,36 +324,166 @@ class World:
     </spherical_coordinates>
 """
 
-    def get_gz_xml(self) -> str:
+    def iter_models_xml(self, objects: Optional[Iterable[Any]] = None) -> Iterator[str]:
         """
-        Exports the world to Gazebo XML format including all objects.
+        Yields the XML of every model in the world, or of objects if given. Containers such as
+        ShapeBatch yield one model per shape.
         """
-        xml_objects = "\n".join([obj.get_gz_xml() for obj in self.objects])
-        light_xml = self.get_light_xml()
-        environment_xml = self.get_environment_xml()
-
-        return f"""<?xml version="1.0" ?>
+        cache = self._xml_cache
+        for obj in self.objects if objects is None else objects:
+            if hasattr(obj, "iter_gz_xml"):
+                yield from obj.iter_gz_xml()
+            # Objects made by the export passes are new on every export, only the world's own are cached
+            elif cache is None or not hasattr(obj, "state_key") or obj not in self.objects:
+                yield obj.get_gz_xml()
+            else:
+                entry = cache.get(id(obj))
+                if entry is None or entry[0] != obj.state_key():
+                    xml = obj.get_gz_xml()
+                    entry = cache[id(obj)] = (obj.state_key(), xml)
+                yield entry[1]
+
+    def get_settings_xml(self) -> Tuple[str, str]:
+        """
+        Returns the light and environment XML, reusing the cached XML while the settings are unchanged.
+        """
+        if self._xml_cache is None:
+            return self.get_light_xml(), self.get_environment_xml()
+        key = repr(self.settings)
+        if self._settings_xml is None or self._settings_xml[0] != key:
+            self._settings_xml = (key, self.get_light_xml(), self.get_environment_xml())
+        return self._settings_xml[1], self._settings_xml[2]
+
+    def iter_gz_xml(self, workers: int = 1, progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[str]:
+        """
+        Yields the world in Gazebo XML format chunk by chunk, one model at a time.
+        Joining the chunks gives exactly the output of get_gz_xml.
+        With workers > 1 the models are rendered in a process pool and yielded a few thousand at a time.
+        With instancing enabled, the prototype models are written out by asset_writer, and with merging
+        the merged meshes. They are all written before the last chunk is yielded.
+        With merging enabled, shapes are exported as one model per cell after the other objects.
+        With collision simplification enabled, mesh shapes get primitive collisions first.
+        progress is called as progress(done, total) with the number of objects rendered so far, see
+        instrumentation.iter_with_progress.
+        """
+        light_xml, environment_xml = self.get_settings_xml()
+        yield f"""<?xml version="1.0" ?>
 <sdf version="1.7">
   <world name="{self.name}">
-    {light_xml}
-    {xml_objects}
-    {environment_xml}
+    """
+        yield light_xml
+        yield "\n    "
+        objects = self.objects
+        if self.collision_simplifier is not None or self.merging is not None or self.instancing is not None:
+            # The passes work on shapes and batches, so they get the shapes of groups too
+            objects = expand_groups(objects)
+        if self.collision_simplifier is not None:
+            with self._phase("collision"):
+                objects = self.collision_simplifier.simplify_objects(objects)
+        if self.merging is not None:
+            with self._phase("merge"):
+                objects = self.merging.merge_objects(objects)
+        if self.instancing is not None:
+            with self._phase("instance"):
+                objects = self.instancing.instance_objects(objects)
+        if progress is not None and workers <= 1:
+            objects = iter_with_progress(objects, len(objects), progress)
+        instrumentation = self.instrumentation
+        if workers > 1:
+            models = iter_models_xml_parallel(objects, workers, progress=progress)
+            if instrumentation is not None:
+                # The pool renders out of sight, its output is counted as the blocks of models it returns
+                models = instrumentation.iter_rendered(models, "parallel")
+        elif instrumentation is not None:
+            models = instrumentation.iter_models(objects, self.iter_models_xml)
+        else:
+            models = self.iter_models_xml(objects)
+        for i, model_xml in enumerate(models):
+            if i:
+                yield "\n"
+            yield model_xml
+        yield "\n    "
+        yield environment_xml
+        self.asset_writer.wait()
+        yield """
   </world>
 </sdf>
 """
 
-    def save_gz_world(self, filename: str) -> None:
+    def get_gz_xml(self) -> str:
+        """
+        Exports the world to Gazebo XML format including all objects.
+        """
+        return "".join(self.iter_gz_xml())
+
+    def save_gz_world(self, filename: str, stream: bool = False, workers: int = 1, compression: Optional[str] = None,
+                      compact: bool = False, level: Optional[int] = None,
+                      progress: Optional[Callable[[int, Optional[int]], None]] = None) -> None:
         """
         Saves the world to a Gazebo world file.
+        With stream=True the XML is written chunk by chunk instead of being built in memory first.
+        With workers > 1 the objects are rendered by that many processes and streamed to the file in order.
+        With compression "gzip" or "zstd", or a filename ending in .gz or .zst, the XML is streamed through
+        the compressor at the given level. zstd requires the zstandard package.
+        With compact=True the indentation and line breaks between tags are left out.
+        The file is written under a temporary name and renamed once it and the models and meshes it
+        refers to are complete, so a simulator watching the directory never loads a partial world.
+        progress is called as progress(done, total) about a hundred times during the export, with the
+        number of objects rendered so far.
+        """
+        compression = compression or compression_for(filename)
+        filename = world_filename(filename, compression)
+        with self._phase("save"), atomic_path(filename) as tmp:
+            chunks = self.iter_gz_xml(workers=workers, progress=progress)
+            if compact:
+                chunks = compact_xml(chunks)
+            if compression is not None:
+                with open_compressed(tmp, compression, level, name=filename) as f, self._timed_writes(f) as writer:
+                    write_chunks(writer, chunks, STREAM_BUFFER_SIZE)
+            elif stream or workers > 1:
+                with open(tmp, "w", buffering=STREAM_BUFFER_SIZE) as f, self._timed_writes(f) as writer:
+                    writer.writelines(chunks)
+            else:
+                gz_xml_str = "".join(chunks)
+                with open(tmp, "w") as f, self._timed_writes(f) as writer:
+                    writer.write(gz_xml_str)
+
+    def _timed_writes(self, f: Any) -> Any:
+        return TimedWriter(f, self.instrumentation) if self.instrumentation is not None else nullcontext(f)
+
+    @classmethod
+    def load_gz_world(cls, filename: str, naming: Optional[Callable[[Any], str]] = None, cache_xml: bool = False) -> "World":
+        """
+        Loads a Gazebo world file, streaming it so memory only grows with the objects and not with the file.
+        Saving a world loaded from a file written by save_gz_world writes the same file again.
+        gzip and zstd compressed files are decompressed while they are read.
+        """
+        world = cls(naming=naming, cache_xml=cache_xml)
+        with open_world_file(filename) as f:
+            return load_world_into(world, f)
+
+    def save_snapshot(self, filename: str) -> None:
+        """
+        Saves the world's settings and objects as a binary snapshot, see snapshot.write_snapshot.
+        Much faster to write and read back than pickling the objects or parsing the world file.
+        """
+        write_snapshot(filename, self.name, self.settings, self.objects)
+
+    @classmethod
+    def load_snapshot(cls, filename: str, naming: Optional[Callable[[Any], str]] = None, cache_xml: bool = False) -> "World":
+        """
+        Loads a world saved with save_snapshot. To read single columns without building the objects,
+        open the file with snapshot.open_snapshot instead.
         """
-        filename = filename + ".sdf" if not filename.endswith(".sdf") else filename
-        gz_xml_str = self.get_gz_xml()
-        with open(filename, "w") as f:
-            f.write(gz_xml_str)
+        snapshot = open_snapshot(filename)
+        world = cls(snapshot.name, naming=naming, cache_xml=cache_xml)
+        world.settings.update(snapshot.settings)
+        world.add_objects(snapshot.iter_objects())
+        return world
 
 # Example usage
 if __name__ == "__main__":
-    from shapes import *
+    from gazebo_world_gen.shapes import *
 
     world = World()
 
@@ -13,4 +13,7 @@ setup(
         'numpy',
     ],
     test_suite='tests',
+    entry_points={
+        'console_scripts': ['gazebo-generate-models=gazebo_world_gen.models:main'],
+    },
 )
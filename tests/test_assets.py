@@ -0,0 +1,128 @@
+# tests/test_assets.py
+
+import os
+import pickle
+import tempfile
+import unittest
+from gazebo_world_gen.assets import AssetWriter, atomic_path
+from gazebo_world_gen.models import DEFAULT_MODELS, generate_models
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.world import World
+from gazebo_world_gen.shapes import Box
+
+class Broken:
+    name = "broken"
+
+    def get_gz_xml(self):
+        raise RuntimeError("cannot render")
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_atomic_path(self):
+        path = os.path.join(self.dir, "world.sdf")
+        with atomic_path(path) as tmp:
+            self.assertTrue(tmp.endswith(".world.sdf"))
+            with open(tmp, "w") as f:
+                f.write("new")
+            self.assertFalse(os.path.exists(path))
+        with self.assertRaises(RuntimeError):
+            with atomic_path(path) as tmp:
+                with open(tmp, "w") as f:
+                    f.write("partial")
+                raise RuntimeError()
+        with open(path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(os.listdir(self.dir), ["world.sdf"])
+
+    def test_writes_concurrently(self):
+        with AssetWriter(workers=4) as writer:
+            futures = [writer.write_text(os.path.join(self.dir, f"model_{i}", "model.sdf"), f"<sdf>{i}</sdf>") for i in range(50)]
+        self.assertTrue(all(future.done() for future in futures))
+        with open(os.path.join(self.dir, "model_7", "model.sdf")) as f:
+            self.assertEqual(f.read(), "<sdf>7</sdf>")
+        stats = writer.stats()
+        self.assertEqual(stats["files"], 50)
+        self.assertEqual(stats["bytes"], sum(len(f"<sdf>{i}</sdf>") for i in range(50)))
+
+    def test_wait_raises_first_error(self):
+        with open(os.path.join(self.dir, "file"), "w") as f:
+            f.write("not a directory")
+        writer = AssetWriter(workers=2)
+        writer.write_text(os.path.join(self.dir, "ok.txt"), "ok")
+        writer.write_text(os.path.join(self.dir, "file", "model.sdf"), "x")
+        with self.assertRaises(OSError):
+            writer.close()
+        self.assertEqual(sorted(os.listdir(self.dir)), ["file", "ok.txt"])
+        with self.assertRaises(OSError):
+            AssetWriter(workers=0).write_text(os.path.join(self.dir, "file", "model.sdf"), "x")
+
+    def test_only_if_changed(self):
+        path = os.path.join(self.dir, "model.config")
+        with AssetWriter(workers=2) as writer:
+            writer.write_text(path, "same")
+        os.utime(path, (0, 0))
+        with AssetWriter(workers=2) as writer:
+            writer.write_text(path, "same", only_if_changed=True)
+        self.assertEqual(os.path.getmtime(path), 0)
+        self.assertEqual(writer.stats()["skipped"], 1)
+        with AssetWriter(workers=2) as writer:
+            writer.write_text(path, "changed", only_if_changed=True)
+        self.assertNotEqual(os.path.getmtime(path), 0)
+
+    def test_pickled_writer(self):
+        writer = AssetWriter(workers=2)
+        writer.write_text(os.path.join(self.dir, "a.txt"), "a")
+        copy = pickle.loads(pickle.dumps(writer))
+        writer.close()
+        copy.write_text(os.path.join(self.dir, "b.txt"), "b").result()
+        copy.close()
+        self.assertEqual(sorted(os.listdir(self.dir)), ["a.txt", "b.txt"])
+
+    def test_failed_save_keeps_previous_world(self):
+        filename = os.path.join(self.dir, "world.sdf")
+        world = World(naming=CounterNaming())
+        world.add_object(Box(1, 1, 1))
+        world.save_gz_world(filename)
+        with open(filename) as f:
+            expected = f.read()
+        world.add_object(Broken())
+        for stream in (False, True):
+            with self.assertRaises(RuntimeError):
+                world.save_gz_world(filename, stream=stream)
+        with open(filename) as f:
+            self.assertEqual(f.read(), expected)
+        self.assertEqual(os.listdir(self.dir), ["world.sdf"])
+
+    def test_gzip_header_has_final_name(self):
+        filename = os.path.join(self.dir, "world.sdf.gz")
+        World().save_gz_world(filename)
+        with open(filename, "rb") as f:
+            header = f.read(64)
+        self.assertEqual(header[10:].split(b"\0")[0], b"world.sdf")
+
+    def test_instanced_models_written_with_world(self):
+        world = World(naming=CounterNaming())
+        world.add_objects([Box(1, 1, 1, x=i) for i in range(4)])
+        models_dir = os.path.join(self.dir, "models")
+        world.enable_instancing(models_dir)
+        world.save_gz_world(os.path.join(self.dir, "world.sdf"))
+        (name,) = os.listdir(models_dir)
+        self.assertEqual(sorted(os.listdir(os.path.join(models_dir, name))), ["model.config", "model.sdf"])
+
+    def test_generate_models_stats(self):
+        with AssetWriter(workers=4) as writer:
+            built = generate_models(self.dir, writer=writer)
+        self.assertEqual(built, [spec.name for spec in DEFAULT_MODELS])
+        stats = writer.stats()
+        written = sum(len(files) for _, _, files in os.walk(self.dir))
+        self.assertEqual(stats["files"], written)
+        self.assertGreater(stats["bytes_per_second"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
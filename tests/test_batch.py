@@ -0,0 +1,58 @@
+# tests/test_batch.py
+
+import unittest
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch, parse_color
+from gazebo_world_gen.shapes import Box, Sphere, Cylinder
+from gazebo_world_gen.world import World
+
+class TestShapeBatch(unittest.TestCase):
+    def test_columns(self):
+        batch = ShapeBatch(Box, [[1, 2, 3], [4, 5, 6]], colors='1 0 0 1')
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.poses.shape, (2, 6))
+        self.assertEqual(batch.colors.shape, (2, 4))
+        np.testing.assert_array_equal(batch.colors[1], [1, 0, 0, 1])
+
+    def test_shape_at_matches_individual_shape(self):
+        box = Box(width=1.5, height=2.0, depth=0.25, x=1.0, y=2.0, z=3.0, roll=0.0, pitch=0.0, yaw=0.5, color='1.0 0.5 0.25 1.0')
+        batch = ShapeBatch.from_shapes([box])
+        row = batch.shape_at(0)
+        self.assertIsInstance(row, Box)
+        self.assertEqual(row.width, 1.5)
+        self.assertEqual(row.color, box.color)
+        self.assertEqual(row.get_gz_xml(), box.get_gz_xml().replace(box.name, row.name))
+
+    def test_lazy_names_are_unique(self):
+        batch = ShapeBatch(Sphere, [[1]] * 3)
+        self.assertEqual(len(set(batch.names)), 3)
+
+    def test_world_export_with_mixed_objects(self):
+        world = World()
+        world.add_object(Cylinder(radius=1, length=2))
+        world.add_object(ShapeBatch(Sphere, [[0.5], [1.0]]))
+        world.add_object(ShapeBatch(Box, np.empty((0, 3))))
+        xml = world.get_gz_xml()
+        self.assertEqual(xml.count("<model "), 3)
+        self.assertEqual(xml.count("<sphere>"), 4)
+        self.assertEqual("".join(world.iter_gz_xml()), xml)
+
+    def test_bulk_render_matches_per_shape_render(self):
+        rng = np.random.default_rng(0)
+        batch = ShapeBatch(Box, rng.uniform(0.1, 2, (50, 3)), rng.uniform(-5, 5, (50, 6)), rng.uniform(0, 1, (50, 4)))
+        self.assertEqual(batch.get_gz_xml(), "\n".join(shape.get_gz_xml() for shape in batch))
+        self.assertEqual(list(batch.iter_gz_xml(chunk_size=7)), list(batch.iter_gz_xml()))
+
+    def test_rejects_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            ShapeBatch(Box, [[1, 1, 1]], poses=np.zeros((2, 6)))
+        with self.assertRaises(TypeError):
+            ShapeBatch.from_shapes([Box(1, 1, 1), Sphere(1)])
+
+    def test_parse_color(self):
+        self.assertEqual(parse_color('1 0 0 1'), (1.0, 0.0, 0.0, 1.0))
+        with self.assertRaises(ValueError):
+            parse_color('1 0 0')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_cache.py
+
+import unittest
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Ellipsoid
+from gazebo_world_gen.world import PhysicsEngine, World
+
+class CountingBox(Box):
+    renders = 0
+
+    def get_gz_xml(self):
+        CountingBox.renders += 1
+        return super().get_gz_xml()
+
+def make_world(cache_xml):
+    world = World(naming=CounterNaming(), cache_xml=cache_xml)
+    for i in range(20):
+        world.add_object(CountingBox(width=1, height=1, depth=1, x=i))
+    return world
+
+class TestXmlCache(unittest.TestCase):
+    def setUp(self):
+        CountingBox.renders = 0
+
+    def test_only_changed_objects_are_rerendered(self):
+        world = make_world(cache_xml=True)
+        first = world.get_gz_xml()
+        self.assertEqual(CountingBox.renders, 20)
+        self.assertEqual(world.get_gz_xml(), first)
+        self.assertEqual(CountingBox.renders, 20)
+
+        objects = world.get_objects()
+        objects[3].x = 100
+        objects[7].color = '1 0 0 1'
+        objects[9].width = 5
+        xml = world.get_gz_xml()
+        self.assertEqual(CountingBox.renders, 23)
+        self.assertIn("<pose>100 0 0 0 0 0</pose>", xml)
+        self.assertIn("<size>5 1 1</size>", xml)
+
+    def test_cached_export_matches_uncached(self):
+        cached, uncached = make_world(cache_xml=True), make_world(cache_xml=False)
+        for world in (cached, uncached):
+            world.get_gz_xml()
+            world.get_objects()[0].yaw = 1.5
+            world.remove_object(world.get_objects()[5])
+            world.add_object(Box(width=2, height=2, depth=2))
+            world.set_physics(PhysicsEngine.BULLET, max_step_size=0.004)
+        self.assertEqual(cached.get_gz_xml(), uncached.get_gz_xml())
+        self.assertIn("<max_step_size>0.004</max_step_size>", cached.get_gz_xml())
+
+    def test_settings_changed_in_place(self):
+        world = make_world(cache_xml=True)
+        world.get_gz_xml()
+        world.settings["physics"]["real_time_factor"] = 2
+        self.assertIn("<real_time_factor>2</real_time_factor>", world.get_gz_xml())
+
+    def test_temporary_objects_are_not_cached(self):
+        world = make_world(cache_xml=True)
+        world.add_objects([Ellipsoid(1, 1, 1, y=i) for i in range(5)])
+        world.enable_collision_simplification(tolerance=0.05)
+        for _ in range(3):
+            xml = world.get_gz_xml()
+        self.assertEqual(xml.count("<sphere>"), 5)
+        self.assertEqual(len(world._xml_cache), 20)
+
+    def test_class_settings_and_types(self):
+        class CachedEllipsoid(Ellipsoid):
+            pass
+        world = World(naming=CounterNaming(), cache_xml=True)
+        shape = CachedEllipsoid(1, 1, 1)
+        world.add_object(shape)
+        self.assertNotIn("_lod3", world.get_gz_xml())
+        CachedEllipsoid.visual_lod = 3
+        self.assertIn("ellipsoid_lod3.dae", world.get_gz_xml())
+        box = Box(width=1, height=1, depth=1)
+        world.add_object(box)
+        world.get_gz_xml()
+        box.width = 1.0
+        self.assertIn("<size>1.0 1 1</size>", world.get_gz_xml())
+
+if __name__ == '__main__':
+    unittest.main()
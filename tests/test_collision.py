@@ -0,0 +1,77 @@
+# tests/test_collision.py
+
+import math
+import os
+import tempfile
+import unittest
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.collision import CollisionSimplifier, collision_cost, collision_proxies, collision_report
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.world import World
+from gazebo_world_gen.shapes import Box, Cone, Ellipsoid, SquarePyramid
+
+def proxies_by_kind(shape_cls, dimensions):
+    return {(p.kind, p.lod): p for p in collision_proxies(shape_cls, dimensions)}
+
+class TestCollision(unittest.TestCase):
+    def test_proxy_errors(self):
+        sphere = proxies_by_kind(Ellipsoid, (1.0, 1.0, 1.0))[("sphere", None)]
+        self.assertEqual((sphere.size, sphere.offset), ((1.0,), (0.0, 0.0, 0.0)))
+        self.assertAlmostEqual(sphere.error, 0)
+        # The best sphere of an ellipsoid deviates by half the spread of its radii
+        self.assertAlmostEqual(proxies_by_kind(Ellipsoid, (1.0, 1.2, 0.9))[("sphere", None)].error, 0.15, places=6)
+        cone = proxies_by_kind(Cone, (1.0, 2.0))
+        cylinder = cone[("cylinder", None)]
+        self.assertEqual((cylinder.size, cylinder.offset), ((1.0, 2.0), (0.0, 0.0, 1.0)))
+        # Distance from the rim of the top of the cylinder to the side of the cone
+        self.assertAlmostEqual(cylinder.error, 2 / math.sqrt(5), places=2)
+        self.assertLess(cone[("mesh", 3)].error, 0.2)
+        self.assertLess(cone[("mesh", 0)].error, cone[("mesh", 3)].error)
+        box = proxies_by_kind(SquarePyramid, (1.0, 1.0, 1.0))[("box", None)]
+        self.assertEqual((box.size, box.offset), ((1.0, 1.0, 1.0), (0.0, 0.0, 0.5)))
+
+    def test_choose_within_tolerance(self):
+        simplifier = CollisionSimplifier(tolerance=0.05)
+        nearly_round = Ellipsoid(1, 1.05, 0.97)
+        self.assertEqual(simplifier.choose(nearly_round, collision_cost(nearly_round)[1]).kind, "sphere")
+        cone = Cone(1, 2)
+        proxy = simplifier.choose(cone, collision_cost(cone)[1])
+        self.assertEqual((proxy.kind, proxy.lod), ("mesh", 2))
+        self.assertIsNone(CollisionSimplifier(tolerance=0).choose(SquarePyramid(1, 1, 1), 6))
+        self.assertEqual(CollisionSimplifier(tolerance=0.6, relative=True).choose(SquarePyramid(2, 2, 2), 6).kind, "sphere")
+
+    def test_export(self):
+        world = World(naming=CounterNaming())
+        shapes = [Ellipsoid(1, 1.02, 0.99, x=i) for i in range(3)] + [Cone(0.5, 1, y=1), SquarePyramid(1, 1, 1), Box(1, 1, 1)]
+        world.add_objects(shapes)
+        world.add_object(ShapeBatch(Ellipsoid, np.ones((2, 3)), np.zeros((2, 6)), name="batch"))
+        plain = world.get_gz_xml()
+        simplifier = world.enable_collision_simplification(tolerance=0.05)
+        simplified = world.get_gz_xml()
+        self.assertEqual(simplified.count("<model "), plain.count("<model "))
+        self.assertEqual(simplified.count("<sphere>"), 5)
+        self.assertEqual(simplified.count("<mesh>"), plain.count("<mesh>") - 5)
+        self.assertTrue(all(shape.collision is None for shape in shapes[:5]))
+        report = simplifier.report()
+        self.assertEqual(report["simplified"], 6)
+        self.assertEqual(report["before"]["shapes"], {"mesh": 7, "box": 1})
+        self.assertEqual(report["after"]["shapes"], {"sphere": 5, "mesh": 2, "box": 1})
+        self.assertLess(report["after"]["cost"], report["before"]["cost"] / 10)
+        self.assertLessEqual(report["max_error"], 0.05)
+        self.assertEqual(collision_report(world.objects, 0.05), report)
+
+    def test_round_trip(self):
+        world = World(naming=CounterNaming())
+        world.add_objects([Ellipsoid(1, 1.02, 0.99), Cone(0.5, 1, x=2), Box(1, 1, 1, x=4)])
+        world.enable_collision_simplification(tolerance=0.05)
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "world.sdf")
+            world.save_gz_world(filename)
+            loaded = World.load_gz_world(filename)
+            self.assertEqual([type(obj) for obj in loaded.objects], [Ellipsoid, Cone, Box])
+            with open(filename) as f:
+                self.assertEqual(loaded.get_gz_xml(), f.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_compression.py
+
+import gzip
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.compression import compact_xml, compression_for, world_filename
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.world import World
+from gazebo_world_gen.shapes import Box, Sphere, Cone
+
+def make_world():
+    world = World("compression_test", naming=CounterNaming())
+    for i in range(10):
+        world.add_object(Box(width=1, height=2, depth=3, x=i, color='1 0 0 1'))
+        world.add_object(Sphere(radius=0.5, y=i))
+        world.add_object(Cone(radius=1, height=2, z=i))
+    world.add_object(ShapeBatch(Box, np.ones((4, 3)), np.arange(24.0).reshape(4, 6), name="batch"))
+    return world
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_file_names(self):
+        self.assertEqual(compression_for("world.sdf.gz"), "gzip")
+        self.assertEqual(compression_for("world.sdf.zst"), "zstd")
+        self.assertIsNone(compression_for("world.sdf"))
+        self.assertEqual(world_filename("world", "gzip"), "world.sdf.gz")
+        self.assertEqual(world_filename("world.sdf.gz", "gzip"), "world.sdf.gz")
+        self.assertEqual(world_filename("world.sdf", None), "world.sdf")
+
+    def test_gzip_round_trip(self):
+        world = make_world()
+        world.save_gz_world(self.path("world"), compression="gzip")
+        with gzip.open(self.path("world.sdf.gz"), "rt") as f:
+            self.assertEqual(f.read(), world.get_gz_xml())
+        self.assertEqual(World.load_gz_world(self.path("world.sdf.gz")).get_gz_xml(), world.get_gz_xml())
+
+    def test_gzip_is_deterministic(self):
+        world = make_world()
+        world.save_gz_world(self.path("world.sdf.gz"))
+        with open(self.path("world.sdf.gz"), "rb") as f:
+            first = f.read()
+        world.save_gz_world(self.path("world.sdf.gz"))
+        with open(self.path("world.sdf.gz"), "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_compact(self):
+        world = make_world()
+        world.save_gz_world(self.path("compact"), compact=True)
+        with open(self.path("compact.sdf")) as f:
+            compact = f.read()
+        self.assertLess(len(compact), len(world.get_gz_xml()))
+        self.assertEqual(compact.count("\n"), 1)
+        self.assertEqual(ET.tostring(ET.fromstring(compact)), ET.tostring(ET.fromstring(compact_xml_reference(world))))
+        self.assertEqual(World.load_gz_world(self.path("compact.sdf")).get_gz_xml(), world.get_gz_xml())
+
+    def test_compact_keeps_text_across_chunks(self):
+        chunks = ["<a>\n  <b>1 ", "2 </b>", "\n  ", "\n", "<c>x", "\n y</c>\n", "</a>\n"]
+        self.assertEqual("".join(compact_xml(chunks)), "<a><b>1 2 </b><c>x\n y</c></a>\n")
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            make_world().save_gz_world(self.path("world"), compression="lz4")
+
+def compact_xml_reference(world):
+    root = ET.fromstring(world.get_gz_xml())
+    for elem in root.iter():
+        if elem.text is not None and not elem.text.strip():
+            elem.text = None
+        elem.tail = None
+    return ET.tostring(root, encoding="unicode")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_export.py
+
+import os
+import tempfile
+import unittest
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.parallel import iter_models_xml_parallel, iter_work_units
+from gazebo_world_gen.world import World
+from gazebo_world_gen.shapes import Box, Sphere, Cone
+
+def make_world():
+    world = World("export_test")
+    for i in range(10):
+        world.add_object(Box(width=1, height=2, depth=3, x=i, color='1 0 0 1'))
+        world.add_object(Sphere(radius=0.5, y=i))
+        world.add_object(Cone(radius=1, height=2, z=i))
+    return world
+
+# Expected export of make_fixed_world, any change to it must be deliberate
+EXPECTED_WORLD = os.path.join(os.path.dirname(__file__), "data", "export_world.sdf")
+
+def make_fixed_world():
+    world = World("export_test", naming=CounterNaming())
+    for i in range(3):
+        world.add_objects([Box(width=1, height=2, depth=3, x=i, color='1 0 0 1'), Sphere(radius=0.5, y=i), Cone(radius=1, height=2, z=i)])
+    return world
+
+class TestExport(unittest.TestCase):
+    def test_iter_matches_get_gz_xml(self):
+        with open(EXPECTED_WORLD) as f:
+            expected = f.read()
+        world = make_fixed_world()
+        self.assertEqual("".join(world.iter_gz_xml()), expected)
+        self.assertEqual(world.get_gz_xml(), expected)
+
+    def test_stream_save_matches_regular_save(self):
+        world = make_world()
+        with tempfile.TemporaryDirectory() as tmp:
+            regular = os.path.join(tmp, "regular.sdf")
+            streamed = os.path.join(tmp, "streamed.sdf")
+            world.save_gz_world(regular)
+            world.save_gz_world(streamed, stream=True)
+            with open(regular, "rb") as a, open(streamed, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_parallel_save_matches_serial(self):
+        world = make_world()
+        world.add_object(ShapeBatch(Sphere, [[0.1 * i] for i in range(1, 20)]))
+        world.add_object(Box(width=1, height=1, depth=1))
+        with tempfile.TemporaryDirectory() as tmp:
+            serial = os.path.join(tmp, "serial.sdf")
+            parallel = os.path.join(tmp, "parallel.sdf")
+            world.save_gz_world(serial)
+            world.save_gz_world(parallel, workers=2)
+            with open(serial, "rb") as a, open(parallel, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_parallel_small_chunks_keep_order(self):
+        world = World(naming=CounterNaming())
+        world.add_object(Box(width=1, height=1, depth=1))
+        world.add_object(ShapeBatch(Box, [[1, 1, 1]] * 7))
+        world.add_object(ShapeBatch(Box, [[1, 1, 1]] * 0))
+        for i in range(5):
+            world.add_object(Sphere(radius=i + 1))
+        expected = "\n".join(world.iter_models_xml())
+        self.assertEqual("\n".join(iter_models_xml_parallel(world.get_objects(), workers=3, chunk_size=2)), expected)
+        self.assertEqual(list(iter_work_units(world.get_objects(), chunk_size=3))[:4], [(0, 1, None, None), (1, 2, 0, 3), (1, 2, 3, 6), (1, 2, 6, 9)])
+
+    def test_empty_world(self):
+        world = World()
+        xml = world.get_gz_xml()
+        self.assertTrue(xml.startswith('<?xml version="1.0" ?>'))
+        self.assertTrue(xml.endswith("</sdf>\n"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# tests/test_group.py
+
+import math
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.geometry import compose_poses, rotation_matrices, rotation_to_rpy
+from gazebo_world_gen.group import ShapeGroup
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cone, Cylinder, Sphere
+from gazebo_world_gen.world import World
+
+def model_poses(xml):
+    root = ET.fromstring(xml)
+    return {m.get("name"): [float(v) for v in m.findtext("pose").split()] for m in root.iter("model")}
+
+class TestComposePoses(unittest.TestCase):
+    def test_rotation_to_rpy_round_trip(self):
+        rng = np.random.default_rng(0)
+        angles = rng.uniform(-3, 3, (500, 3))
+        angles[:, 1] = rng.uniform(-1.5, 1.5, 500)
+        angles[:2, 1] = [math.pi / 2, -math.pi / 2]
+        rotation = rotation_matrices(*angles.T)
+        np.testing.assert_allclose(rotation_matrices(*rotation_to_rpy(rotation).T), rotation, atol=1e-12)
+
+    def test_compose_matches_matrix_product(self):
+        rng = np.random.default_rng(1)
+        parent = [1, 2, 3, 0.4, -0.2, 1.1]
+        poses = rng.uniform(-2, 2, (100, 6))
+        world = compose_poses(parent, poses)
+        rotation = rotation_matrices(*np.array([parent[3:]]).T)[0]
+        np.testing.assert_allclose(world[:, :3], poses[:, :3] @ rotation.T + parent[:3])
+        np.testing.assert_allclose(rotation_matrices(*world[:, 3:].T), rotation @ rotation_matrices(*poses[:, 3:].T), atol=1e-12)
+
+    def test_unrotated_poses_keep_angles(self):
+        world = compose_poses([1, 0, 0, 0, 0, 0], np.array([[0, 0, 0, 0.1, 0.2, 0.3]]))
+        self.assertEqual(world.tolist(), [[1, 0, 0, 0.1, 0.2, 0.3]])
+        world = compose_poses([0, 0, 0, 0.1, 0.2, 0.3], np.array([[0, 0, 0, 0, 0, 0]]))
+        self.assertEqual(world[0, 3:].tolist(), [0.1, 0.2, 0.3])
+
+class TestShapeGroup(unittest.TestCase):
+    def make_world(self):
+        world = World(naming=CounterNaming())
+        inner = ShapeGroup([Sphere(1, z=1)], x=1, yaw=math.pi / 2)
+        batch = ShapeBatch(Cylinder, [[1, 2], [1, 2]], [[0, 1, 0, 0, 0, 0], [0, 2, 0, 0, 0, 0]])
+        group = ShapeGroup([Box(1, 1, 1, x=1), batch, inner, ShapeGroup([Cone(1, 1)], x=5, as_model=True)], x=10, yaw=math.pi / 2)
+        world.add_object(group)
+        return world, group
+
+    def test_flattened_world_poses(self):
+        world, group = self.make_world()
+        self.assertEqual(len(group), 5)
+        poses = model_poses(world.get_gz_xml())
+        self.assertEqual(list(poses), ["box_1", "cylinder_batch_2_0", "cylinder_batch_2_1", "sphere_4", "group_5"])
+        expected = {
+            "box_1": [10, 1, 0, 0, 0, math.pi / 2],
+            "cylinder_batch_2_0": [9, 0, 0, 0, 0, math.pi / 2],
+            "cylinder_batch_2_1": [8, 0, 0, 0, 0, math.pi / 2],
+            "sphere_4": [10, 1, 1, 0, 0, math.pi],
+            "group_5": [10, 5, 0, 0, 0, math.pi / 2],
+        }
+        for name, pose in expected.items():
+            np.testing.assert_allclose(poses[name], pose, atol=1e-12)
+
+    def test_moving_the_group_moves_its_shapes(self):
+        world, group = self.make_world()
+        before = model_poses(world.get_gz_xml())
+        group.x += 3
+        group.z = 2
+        after = model_poses(world.get_gz_xml())
+        for name in before:
+            np.testing.assert_allclose(np.subtract(after[name], before[name]), [3, 0, 2, 0, 0, 0], atol=1e-12)
+        # The children themselves keep their local poses
+        self.assertEqual(group.children[0].x, 1)
+
+    def test_as_model(self):
+        world, group = self.make_world()
+        group.as_model = True
+        root = ET.fromstring(world.get_gz_xml())
+        models = root.findall("world/model")
+        self.assertEqual([m.get("name") for m in models], ["group_0"])
+        self.assertEqual(models[0].findtext("pose"), f"10 0 0 0 0 {math.pi / 2}")
+        links = {l.get("name"): [float(v) for v in l.findtext("pose").split()] for l in models[0].findall("link")}
+        self.assertEqual(list(links), ["box_1", "cylinder_batch_2_0", "cylinder_batch_2_1", "sphere_4", "cone_6"])
+        np.testing.assert_allclose(links["sphere_4"], [1, 0, 1, 0, 0, math.pi / 2], atol=1e-12)
+        self.assertEqual(models[0].findtext("link[@name='box_1']/visual/geometry/box/size"), "1 1 1")
+
+    def test_spatial_index(self):
+        world, group = self.make_world()
+        index = world.enable_spatial_index()
+        self.assertEqual(len(index), 5)
+        lower, upper = group.get_aabbs()
+        np.testing.assert_allclose(lower[3], [9, 0, 0], atol=1e-12)
+        np.testing.assert_allclose(upper[3], [11, 2, 2], atol=1e-12)
+        # The sphere and the first cylinder of the batch
+        self.assertEqual(sorted(row for _, row in index.query_aabb((9.9, 0.9, 0.9), (10.1, 1.1, 1.1))), [1, 3])
+        self.assertTrue(index.would_overlap(Sphere(0.5, x=10, y=5)))
+        world.remove_object(group)
+        self.assertEqual(len(index), 0)
+
+    def test_export_passes_see_group_shapes(self):
+        world, group = self.make_world()
+        plain = world.get_gz_xml()
+        world.enable_merging(cell_size=100)
+        names = list(model_poses(world.get_gz_xml()))
+        self.assertIn("group_5", names)
+        self.assertNotIn("box_1", names)
+        self.assertEqual(len(names), 2)
+        world.merging = None
+        world.enable_collision_simplification(tolerance=0)
+        self.assertEqual(world.get_gz_xml(), plain)
+
+    def test_cannot_contain_itself(self):
+        inner = ShapeGroup()
+        outer = ShapeGroup([inner])
+        with self.assertRaises(ValueError):
+            inner.add(outer)
+        with self.assertRaises(TypeError):
+            outer.add("box")
+
+if __name__ == '__main__':
+    unittest.main()
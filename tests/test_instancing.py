@@ -0,0 +1,75 @@
+# tests/test_instancing.py
+
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.instancing import prototype_key, prototype_name
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Sphere
+from gazebo_world_gen.world import World
+
+class TestInstancing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.models_dir = os.path.join(self.tmp.name, "models")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_world(self):
+        world = World(naming=CounterNaming())
+        for i in range(3):
+            world.add_object(Box(width=1, height=1, depth=1, x=i, color='1 0 0 1'))
+        world.add_object(Sphere(radius=2, y=5))
+        return world
+
+    def test_repeated_shapes_become_includes(self):
+        world = self.make_world()
+        world.enable_instancing(self.models_dir)
+        root = ET.fromstring(world.get_gz_xml())
+        includes = root.findall("world/include")
+        self.assertEqual(len(includes), 3)
+        self.assertEqual([i.findtext("name") for i in includes], ["box_0", "box_1", "box_2"])
+        self.assertEqual(includes[2].findtext("pose"), "2 0 0 0 0 0")
+        self.assertEqual([m.get("name") for m in root.findall("world/model")], ["sphere_3"])
+
+        uri = includes[0].findtext("uri")
+        name = prototype_name(prototype_key(world.get_object("box_0")))
+        self.assertEqual(uri, f"model://{name}")
+        self.assertEqual(os.listdir(self.models_dir), [name])
+        model = ET.parse(os.path.join(self.models_dir, name, "model.sdf")).getroot().find("model")
+        self.assertEqual(model.get("name"), name)
+        self.assertEqual(model.findtext("pose"), "0 0 0 0 0 0")
+        self.assertEqual(model.findtext("link/visual/material/diffuse"), "1 0 0 1")
+        self.assertTrue(os.path.exists(os.path.join(self.models_dir, name, "model.config")))
+
+    def test_min_instances(self):
+        world = self.make_world()
+        world.enable_instancing(self.models_dir, min_instances=4)
+        self.assertEqual(world.get_gz_xml(), self.make_world().get_gz_xml())
+
+    def test_batch_rows_share_prototypes_with_shapes(self):
+        world = World(naming=CounterNaming())
+        world.add_object(Box(width=1.0, height=1.0, depth=1.0, color='1.0 0.0 0.0 1.0'))
+        dims = np.array([[1, 1, 1], [1, 1, 1], [2, 2, 2]])
+        batch = ShapeBatch(Box, dims, np.arange(18, dtype=float).reshape(3, 6), colors='1 0 0 1')
+        world.add_object(batch)
+        library = world.enable_instancing(self.models_dir)
+        root = ET.fromstring(world.get_gz_xml())
+        includes = root.findall("world/include")
+        self.assertEqual([i.findtext("name") for i in includes], ["box_0", "box_batch_1_0", "box_batch_1_1"])
+        self.assertEqual(includes[2].findtext("pose"), "6.0 7.0 8.0 9.0 10.0 11.0")
+        self.assertEqual(len({i.findtext("uri") for i in includes}), 1)
+        self.assertEqual(len(library.written), 1)
+        self.assertEqual(root.find("world/model").get("name"), "box_batch_1_2")
+
+    def test_parallel_matches_serial(self):
+        world = self.make_world()
+        world.enable_instancing(self.models_dir)
+        self.assertEqual("".join(world.iter_gz_xml(workers=2)), world.get_gz_xml())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# tests/test_instrumentation.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.instrumentation import Instrumentation, iter_with_progress
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.world import World
+from gazebo_world_gen.shapes import Box, Sphere
+
+def make_world():
+    world = World("instrumented", naming=CounterNaming())
+    world.add_objects([Box(1, 2, 3, x=i) for i in range(20)] + [Sphere(0.5, y=i) for i in range(10)])
+    world.add_object(ShapeBatch(Box, np.ones((5, 3)), np.zeros((5, 6)), name="batch"))
+    return world
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "world.sdf")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_disabled_by_default(self):
+        world = make_world()
+        self.assertIsNone(world.instrumentation)
+        world.save_gz_world(self.filename)
+
+    def test_counts_and_timers(self):
+        world = make_world()
+        instrumentation = world.enable_instrumentation()
+        world.add_objects([Box(1, 1, 1)])
+        world.save_gz_world(self.filename, stream=True)
+        report = instrumentation.report()
+        self.assertEqual(report["models"], {"Box": 21, "Sphere": 10, "ShapeBatch": 5})
+        self.assertEqual(sum(report["characters"].values()), sum(map(len, world.iter_models_xml())))
+        self.assertEqual(report["bytes_written"], os.path.getsize(self.filename))
+        self.assertEqual(set(report["timers"]), {"add", "render", "write", "save"})
+        self.assertGreaterEqual(report["timers"]["save"], report["timers"]["render"])
+        self.assertGreater(report["peak_rss"] or 1, 0)
+
+    def test_output_is_unchanged(self):
+        world = make_world()
+        expected = world.get_gz_xml()
+        world.enable_instrumentation(trace_memory=True)
+        self.assertEqual(world.get_gz_xml(), expected)
+        world.save_gz_world(self.filename, compact=True, compression="gzip")
+        self.assertGreater(world.instrumentation.peak_traced["save"], 0)
+
+    def test_hooks(self):
+        events = []
+        world = make_world()
+        world.enable_instrumentation(hooks=[lambda phase, seconds: events.append(phase)])
+        world.enable_merging(cell_size=5)
+        world.save_gz_world(self.filename)
+        self.assertEqual(events, ["merge", "render", "write", "save"])
+
+    def test_nested_phases(self):
+        instrumentation = Instrumentation(trace_memory=True)
+        with instrumentation.phase("outer"):
+            with instrumentation.phase("inner"):
+                data = bytearray(1 << 20)
+            del data
+        self.assertGreaterEqual(instrumentation.peak_traced["outer"], 1 << 20)
+        self.assertEqual(instrumentation.calls, {"inner": 1, "outer": 1})
+
+    def test_progress(self):
+        calls = []
+        world = make_world()
+        world.save_gz_world(self.filename, progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual(calls[-1], (31, 31))
+        self.assertEqual([done for done, _ in calls], sorted(set(done for done, _ in calls)))
+        self.assertEqual(list(iter_with_progress(range(5), 5, lambda done, total: calls.append(done), steps=2)), list(range(5)))
+        self.assertEqual(calls[-3:], [2, 4, 5])
+
+    def test_progress_in_parallel(self):
+        world = make_world()
+        world.save_gz_world(self.filename)
+        with open(self.filename) as f:
+            expected = f.read()
+        calls = []
+        parallel = os.path.join(self.tmp.name, "parallel.sdf")
+        world.save_gz_world(parallel, workers=2, progress=lambda done, total: calls.append((done, total)))
+        with open(parallel) as f:
+            self.assertEqual(f.read(), expected)
+        self.assertEqual(calls[-1], (31, 31))
+        self.assertEqual([done for done, _ in calls], sorted(set(done for done, _ in calls)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# tests/test_loader.py
+
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.instancing import ModelInclude
+from gazebo_world_gen.loader import RawElement, iter_world_elements, parse_number
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cone, Cylinder, Ellipsoid, Sphere, SquarePyramid, Tetrahedron
+from gazebo_world_gen.terrain import Heightmap
+from gazebo_world_gen.world import PhysicsEngine, SurfaceModel, World
+
+class TestLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def round_trip(self, world):
+        world.save_gz_world(self.path("first.sdf"))
+        loaded = World.load_gz_world(self.path("first.sdf"))
+        loaded.save_gz_world(self.path("second.sdf"))
+        with open(self.path("first.sdf")) as a, open(self.path("second.sdf")) as b:
+            self.assertEqual(a.read(), b.read())
+        return loaded
+
+    def test_shapes_and_settings(self):
+        world = World("loaded", naming=CounterNaming())
+        world.set_physics(PhysicsEngine.BULLET, max_step_size=0.002, real_time_update_rate=500)
+        world.set_gravity((0, 0, -9.81))
+        world.set_spherical_coordinates(SurfaceModel.MOON, latitude_deg=12.5)
+        shapes = [Box(1, 2, 3, x=1, color='1 0 0 1'), Sphere(0.5, y=0.1), Cylinder(1, 2.5, roll=0.2),
+                  Ellipsoid(1, 0.5, 0.5), Cone(1, 3, yaw=0.3), Tetrahedron(1, 1, 1.5), SquarePyramid(2, 2, 3)]
+        world.add_objects(shapes)
+        loaded = self.round_trip(world)
+        self.assertEqual(loaded.name, "loaded")
+        self.assertEqual(loaded.settings, world.settings)
+        for original, shape in zip(shapes, loaded.objects):
+            self.assertIs(type(shape), type(original))
+            self.assertEqual(shape.name, original.name)
+            self.assertEqual(shape.__dict__, original.__dict__)
+
+    def test_mesh_settings(self):
+        world = World(naming=CounterNaming())
+        cone = Cone(1, 2)
+        cone.collision, cone.visual_lod = "primitive", 2
+        ellipsoid = Ellipsoid(1, 1, 1)
+        ellipsoid.collision = 3
+        world.add_objects([cone, ellipsoid])
+        loaded = list(self.round_trip(world).objects)
+        self.assertEqual((loaded[0].collision, loaded[0].visual_lod), ("primitive", 2))
+        self.assertEqual((loaded[1].collision, loaded[1].visual_lod), (3, None))
+        self.assertNotIn("visual_lod", loaded[1].__dict__)
+
+    def test_other_objects(self):
+        world = World(naming=CounterNaming())
+        world.add_object(ShapeBatch(Box, [[1, 1, 1]] * 3, np.arange(18.0).reshape(3, 6)))
+        world.add_object(ModelInclude("crate_0", "crate", (1, 2, 0, 0, 0, 0)))
+        world.add_object(Heightmap(np.zeros((5, 5)), image_dir=self.path("terrain")))
+        loaded = list(self.round_trip(world).objects)
+        self.assertEqual([type(obj) for obj in loaded], [Box, Box, Box, ModelInclude, RawElement])
+        self.assertEqual(loaded[1].name, "box_batch_0_1")
+        self.assertEqual(loaded[3].pose, (1, 2, 0, 0, 0, 0))
+        self.assertEqual(loaded[4].name, "terrain")
+
+    def test_unknown_models_are_kept_as_xml(self):
+        xml = Box(1, 1, 1).get_gz_xml().replace("<static>true</static>", "<static>false</static>")
+        world = World()
+        world.add_object(RawElement("box", xml))
+        loaded = self.round_trip(world)
+        self.assertIsInstance(next(iter(loaded.objects)), RawElement)
+
+    def test_example_world(self):
+        example = os.path.join(os.path.dirname(__file__), os.pardir, "example_world.sdf")
+        loaded = World.load_gz_world(example)
+        self.assertEqual(len(loaded.get_objects()), 7)
+        loaded.save_gz_world(self.path("example.sdf"))
+        with open(example) as a, open(self.path("example.sdf")) as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_elements_are_released(self):
+        world = World()
+        world.add_objects(Sphere(1, x=i) for i in range(5))
+        source = io.BytesIO(world.get_gz_xml().encode())
+        events = iter_world_elements(source)
+        kind, world_elem = next(events)
+        self.assertEqual((kind, world_elem.get("name")), ("world", "default"))
+        tags = []
+        for kind, elem in events:
+            # Earlier elements are removed, later ones may already be parsed as the file is read in chunks
+            self.assertIs(world_elem[0], elem)
+            tags.append(elem.tag)
+        self.assertEqual(tags.count("model"), 5)
+
+    def test_parse_number(self):
+        for text in ("0", "-9.8", "6e-06", "1000", "0.001"):
+            self.assertEqual(str(parse_number(text)), text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_lod.py
+
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.collision import CollisionSimplifier
+from gazebo_world_gen.instancing import prototype_key
+from gazebo_world_gen.lod import assign_visual_lod, count_triangles, generate_lod_models
+from gazebo_world_gen.shapes import Box, Cone, Ellipsoid, Tetrahedron
+
+def parse(shape):
+    return ET.fromstring(shape.get_gz_xml())
+
+class TestLevels(unittest.TestCase):
+    def test_default_collides_with_visual_mesh(self):
+        model = parse(Cone(radius=1, height=2))
+        self.assertEqual(model.findtext("link/collision/geometry/mesh/uri"), "model://cone/meshes/cone.dae")
+        self.assertEqual(model.findtext("link/visual/geometry/mesh/uri"), "model://cone/meshes/cone.dae")
+
+    def test_separate_levels(self):
+        shape = Ellipsoid(1, 2, 3)
+        shape.visual_lod, shape.collision = 0, 3
+        model = parse(shape)
+        self.assertEqual(model.findtext("link/visual/geometry/mesh/uri"), "model://ellipsoid/meshes/ellipsoid_lod0.dae")
+        self.assertEqual(model.findtext("link/collision/geometry/mesh/uri"), "model://ellipsoid/meshes/ellipsoid_lod3.dae")
+        self.assertEqual(model.findtext("link/collision/geometry/mesh/scale"), "1 2 3")
+        shape.visual_lod = 10
+        self.assertIn("ellipsoid_lod3.dae", parse(shape).findtext("link/visual/geometry/mesh/uri"))
+
+    def test_levels_ignored_without_resolution(self):
+        shape = Tetrahedron(1, 1, 1)
+        shape.visual_lod = 2
+        self.assertEqual(parse(shape).findtext("link/visual/geometry/mesh/uri"), "model://tetrahedron/meshes/tetrahedron.dae")
+
+    def test_primitive_collision(self):
+        cone = Cone(radius=1, height=2)
+        cone.collision = "primitive"
+        collision = parse(cone).find("link/collision")
+        self.assertEqual(collision.findtext("pose"), "0 0 1.0 0 0 0")
+        self.assertEqual(collision.findtext("geometry/cylinder/length"), "2")
+        self.assertEqual(parse(cone).findtext("link/visual/geometry/mesh/uri"), "model://cone/meshes/cone.dae")
+
+        sphere, ellipsoid = Ellipsoid(2, 2, 2), Ellipsoid(1, 2, 3)
+        sphere.collision = ellipsoid.collision = "primitive"
+        self.assertEqual(parse(sphere).findtext("link/collision/geometry/sphere/radius"), "2")
+        self.assertEqual(parse(ellipsoid).findtext("link/collision/geometry/box/size"), "2 4 6")
+
+    def test_batch_follows_class_settings(self):
+        batch = ShapeBatch(Ellipsoid, [[1, 1, 1], [1, 2, 3]], [[0, 0, 0, 0, 0, 0], [1, 2, 3, 0, 0, 0]])
+        for visual_lod, collision in ((2, None), (0, "primitive"), (None, 3)):
+            Ellipsoid.visual_lod, Ellipsoid.collision = visual_lod, collision
+            try:
+                self.assertEqual(list(batch.iter_gz_xml()), [shape.get_gz_xml() for shape in batch])
+            finally:
+                del Ellipsoid.visual_lod, Ellipsoid.collision
+        self.assertIn("ellipsoid.dae", batch.get_gz_xml())
+
+    def test_instances_keep_levels_apart(self):
+        a, b = Cone(1, 1), Cone(1, 1)
+        b.visual_lod = 3
+        self.assertNotEqual(prototype_key(a), prototype_key(b))
+
+class TestHelpers(unittest.TestCase):
+    def test_assign_visual_lod(self):
+        shapes = [Cone(1, 1, x=x) for x in (0, 15, 30, 100)] + [Box(1, 1, 1)]
+        assign_visual_lod(shapes, (0, 0, 0), (10, 20, 50))
+        self.assertEqual([s.visual_lod for s in shapes[:4]], [0, 1, 2, 3])
+        self.assertNotIn("visual_lod", shapes[4].__dict__)
+
+    def test_count_triangles(self):
+        full, coarse = Ellipsoid(1, 1, 1), Ellipsoid(1, 1, 1)
+        coarse.visual_lod, coarse.collision = 3, "primitive"
+        self.assertEqual(count_triangles([full, Box(1, 1, 1)]), (2 * 32 * 14, 2 * 32 * 14))
+        self.assertEqual(count_triangles([coarse]), (2 * 8 * 3, 0))
+
+    def test_count_triangles_of_simplified_collisions(self):
+        shapes = CollisionSimplifier(tolerance=0.05).simplify_objects([Ellipsoid(1, 1.02, 0.99), Cone(1, 2)])
+        self.assertEqual([shape.collision.kind for shape in shapes], ["sphere", "mesh"])
+        cone = Cone(1, 2)
+        cone.visual_lod = shapes[1].collision.lod
+        self.assertEqual(count_triangles(shapes)[1], count_triangles([cone])[0])
+
+    def test_generate_lod_models(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_lod_models(tmp)
+            self.assertEqual(sorted(os.listdir(os.path.join(tmp, "cone", "meshes"))), [f"cone_lod{i}.dae" for i in range(4)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# tests/test_merge.py
+
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.instancing import ModelInclude
+from gazebo_world_gen.merge import StaticMerger, bake_mesh
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cone, Sphere
+from gazebo_world_gen.world import World
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.mesh_dir = os.path.join(self.tmp.name, "meshes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_world(self):
+        world = World(naming=CounterNaming())
+        world.add_object(Box(width=1, height=2, depth=3, x=1, y=1, yaw=0.5, color='1 0 0 1'))
+        world.add_object(Cone(radius=1, height=2, x=12, y=1))
+        world.add_object(Sphere(radius=1, x=-3, y=2, color='1.0 0.0 0.0 1.0'))
+        poses = np.array([[2, 2, 0, 0, 0, 0], [15, 3, 0, 0, 0, 0]], dtype=float)
+        world.add_object(ShapeBatch(Sphere, [[1], [2]], poses, colors='0 1 0 1'))
+        return world
+
+    def test_links_keep_shapes(self):
+        world = self.make_world()
+        plain = ET.fromstring(world.get_gz_xml())
+        world.enable_merging(cell_size=10)
+        root = ET.fromstring(world.get_gz_xml())
+        models = root.findall("world/model")
+        self.assertEqual([m.get("name") for m in models], ["merged_-1_0", "merged_0_0", "merged_1_0"])
+        self.assertEqual([l.get("name") for l in models[1].findall("link")], ["box_0", "sphere_batch_3_0"])
+
+        # Every shape keeps its pose, geometry and material, only moved from the model to its link
+        for model in plain.findall("world/model"):
+            link = root.find(f"world/model/link[@name='{model.get('name')}']")
+            self.assertEqual(link.findtext("pose"), model.findtext("pose"))
+            self.assertEqual(ET.tostring(link.find("visual")), ET.tostring(model.find("link/visual")))
+            self.assertEqual(ET.tostring(link.find("collision")), ET.tostring(model.find("link/collision")))
+
+    def test_other_objects_are_kept(self):
+        include = ModelInclude("crate_0", "crate", (1, 2, 3, 0, 0, 0))
+        merged = StaticMerger(10).merge_objects([Box(1, 1, 1), include])
+        self.assertIs(merged[0], include)
+        self.assertEqual(len(merged), 2)
+        self.assertEqual(len(merged[1]), 1)
+
+    def test_mesh_mode_bakes_one_visual_per_color(self):
+        world = self.make_world()
+        world.enable_merging(cell_size=10, mode="mesh", mesh_dir=self.mesh_dir)
+        root = ET.fromstring(world.get_gz_xml())
+        model = root.find("world/model[@name='merged_0_0']")
+        self.assertEqual(model.findtext("pose"), "5.0 5.0 0 0 0 0")
+        self.assertEqual([v.findtext("material/diffuse") for v in model.findall("link/visual")], ["0.0 1.0 0.0 1.0", "1 0 0 1"])
+        self.assertEqual([c.findtext("geometry/mesh/uri") for c in model.findall("link/collision")],
+                         [v.findtext("geometry/mesh/uri") for v in model.findall("link/visual")])
+        for uri in model.iter("uri"):
+            self.assertTrue(os.path.exists(uri.text[len("file://"):]))
+        # The red box and the red sphere of the neighbouring cell share their color by value only
+        model = root.find("world/model[@name='merged_-1_0']")
+        self.assertEqual(len(model.findall("link/visual")), 1)
+
+    def test_bake_mesh(self):
+        poses = np.array([[1, 2, 3, 0, 0, np.pi / 2], [0, 0, 0, 0, 0, 0], [5, 0, 0, 0, 0, 0]], dtype=float)
+        dimensions = np.array([[2, 4, 6], [1, 1, 1], [2, 4, 6]], dtype=float)
+        vertices, faces = bake_mesh(Box, dimensions, poses, origin=(1, 0, 0))
+        self.assertEqual((len(vertices), len(faces)), (24, 36))
+        self.assertLess(faces.max(), len(vertices))
+        # The first box is turned a quarter around z, so its width runs along y
+        box = vertices[faces[:12].ravel()]
+        np.testing.assert_allclose(box.min(axis=0), [-2, 1, 0], atol=1e-12)
+        np.testing.assert_allclose(box.max(axis=0), [2, 3, 6], atol=1e-12)
+
+    def test_bake_mesh_scales_unit_mesh(self):
+        vertices, faces = bake_mesh(Cone, np.array([[2.0, 3.0]]), np.zeros((1, 6)))
+        expected = Cone.build_mesh(2.0, 3.0, sections=32)
+        np.testing.assert_allclose(vertices, expected[0], atol=1e-12)
+        np.testing.assert_array_equal(faces, expected[1])
+
+if __name__ == '__main__':
+    unittest.main()
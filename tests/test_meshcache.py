@@ -0,0 +1,62 @@
+# tests/test_meshcache.py
+
+import os
+import tempfile
+import unittest
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.meshcache import MeshCache
+from gazebo_world_gen.shapes import Cone
+
+class TestMeshCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "meshes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_equal_shapes_share_a_file(self):
+        cache = MeshCache(self.directory, extension=".stl")
+        shapes = [Cone(radius=1 + i % 3, height=2) for i in range(30)]
+        for shape in shapes:
+            shape.mesh_cache = cache
+        uris = [shape.get_geometry_xml().split("<uri>")[1].split("</uri>")[0] for shape in shapes]
+        self.assertEqual(len(set(uris)), 3)
+        self.assertEqual((cache.misses, cache.hits), (3, 27))
+        self.assertEqual(len(os.listdir(self.directory)), 3)
+        self.assertTrue(uris[0].startswith("file://") and os.path.exists(uris[0][len("file://"):]))
+        self.assertIn("<scale>1 1 1</scale>", shapes[0].get_geometry_xml())
+
+    def test_reused_between_instances(self):
+        MeshCache(self.directory, extension=".stl").get("cone", (1, 2), Cone.build_mesh)
+        cache = MeshCache(self.directory, extension=".stl")
+        self.assertEqual(len(cache), 1)
+        cache.get("cone", (1.0, 2.0), Cone.build_mesh)
+        self.assertEqual((cache.misses, cache.hits), (0, 1))
+
+    def test_lru_eviction(self):
+        cache = MeshCache(self.directory, extension=".stl")
+        cache.get("cone", (1, 1), Cone.build_mesh)
+        size = cache.total_bytes
+        cache.max_bytes = 2 * size
+        first = cache.get("cone", (1, 1), Cone.build_mesh)
+        second = cache.get("cone", (2, 1), Cone.build_mesh)
+        cache.get("cone", (1, 1), Cone.build_mesh)
+        cache.get("cone", (3, 1), Cone.build_mesh)
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+
+    def test_batch_with_cache(self):
+        Cone.mesh_cache = MeshCache(self.directory, extension=".stl")
+        try:
+            batch = ShapeBatch(Cone, [[1, 2], [1, 2], [2, 2]])
+            xml = batch.get_gz_xml()
+        finally:
+            del Cone.mesh_cache
+        self.assertEqual(xml.count("file://"), 6)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
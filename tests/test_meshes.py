@@ -0,0 +1,100 @@
+# tests/test_meshes.py
+
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+from gazebo_world_gen.meshes import LOD_LEVELS, STL_DTYPE, ellipsoid_mesh, face_normals, lod_resolution, save_mesh
+from gazebo_world_gen.shapes import Box, Cone, Cylinder, Ellipsoid, Sphere, SquarePyramid, Tetrahedron
+
+def edge_counts(faces):
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    return np.unique(edges, axis=0, return_counts=True)[1]
+
+class TestBuilders(unittest.TestCase):
+    def meshes(self):
+        for shape in (Ellipsoid(1, 2, 3), Tetrahedron(1, 2, 3), SquarePyramid(1, 2, 3), Cone(2, 3), Box(1, 2, 3), Sphere(2), Cylinder(1, 2)):
+            dimensions = [getattr(shape, d) for d in shape.dimension_names]
+            yield shape, dimensions, shape.build_mesh(*dimensions)
+
+    def test_within_local_bounds(self):
+        for shape, dimensions, (vertices, faces) in self.meshes():
+            lower, upper = shape.local_bounds(*dimensions)
+            self.assertTrue((vertices.min(axis=0) >= np.array(lower) - 1e-9).all())
+            self.assertTrue((vertices.max(axis=0) <= np.array(upper) + 1e-9).all())
+            np.testing.assert_allclose(vertices[:, 2].max(), upper[2])
+            self.assertLess(faces.max(), len(vertices))
+
+    def test_faces_point_outwards(self):
+        meshes = [mesh for _, _, mesh in self.meshes()] + [ellipsoid_mesh(1, 2, 3, 64, 32, weld_poles=True)]
+        for vertices, faces in meshes:
+            centers = vertices[faces].mean(axis=1)
+            normals = face_normals((vertices, faces))
+            outward = np.einsum("ij,ij->i", normals, centers - vertices.mean(axis=0))
+            self.assertTrue((outward[np.abs(normals).sum(axis=1) > 0] > 0).all())
+
+    def test_resolution(self):
+        vertices, faces = ellipsoid_mesh(segments=64, rings=32)
+        self.assertEqual((len(vertices), len(faces)), (64 * 32, 2 * 63 * 31))
+
+    def test_lod_resolution(self):
+        self.assertEqual(lod_resolution("cone"), {"sections": 32})
+        self.assertEqual(lod_resolution("cone", 0), {"sections": 64})
+        self.assertEqual(lod_resolution("ellipsoid", 9), LOD_LEVELS["ellipsoid"][-1])
+        self.assertEqual(lod_resolution("tetrahedron", 2), {})
+        self.assertEqual(lod_resolution(None), {})
+
+    def test_weld_poles(self):
+        vertices, faces = ellipsoid_mesh(segments=16, rings=8, weld_poles=True)
+        self.assertEqual(len(vertices), 16 * 6 + 2)
+        self.assertEqual(len(faces), 2 * 16 * 6)
+        self.assertTrue((edge_counts(faces) == 2).all())
+
+    def test_primitives_are_closed(self):
+        for shape in (Box(1, 2, 3), Sphere(2), Cylinder(1, 2)):
+            vertices, faces = shape.build_mesh(*[getattr(shape, d) for d in shape.dimension_names])
+            self.assertTrue((edge_counts(faces) == 2).all())
+
+class TestWriters(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.mesh = ellipsoid_mesh(1, 2, 3, 12, 6, weld_poles=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stl(self):
+        filename = os.path.join(self.tmp.name, "m.stl")
+        save_mesh(self.mesh, filename)
+        with open(filename, "rb") as f:
+            f.seek(80)
+            count = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+            records = np.frombuffer(f.read(), dtype=STL_DTYPE)
+        vertices, faces = self.mesh
+        self.assertEqual(count, len(faces))
+        np.testing.assert_allclose(records["vertices"], vertices[faces], rtol=1e-6, atol=1e-6)
+
+    def test_obj(self):
+        filename = os.path.join(self.tmp.name, "m.obj")
+        save_mesh(self.mesh, filename)
+        with open(filename) as f:
+            lines = f.read().splitlines()
+        vertices, faces = self.mesh
+        self.assertEqual(sum(line.startswith("v ") for line in lines), len(vertices))
+        self.assertEqual(lines[len(vertices)], "f %d %d %d" % tuple(faces[0] + 1))
+
+    def test_dae(self):
+        filename = os.path.join(self.tmp.name, "m.dae")
+        save_mesh(self.mesh, filename)
+        ns = {"c": "http://www.collada.org/2005/11/COLLADASchema"}
+        root = ET.parse(filename).getroot()
+        positions = np.array(root.find(".//c:float_array", ns).text.split(), dtype=float).reshape(-1, 3)
+        np.testing.assert_allclose(positions, self.mesh[0], atol=1e-8)
+        triangles = root.find(".//c:triangles", ns)
+        self.assertEqual(int(triangles.get("count")), len(self.mesh[1]))
+        indices = np.array(triangles.find("c:p", ns).text.split(), dtype=int).reshape(-1, 3, 2)
+        np.testing.assert_array_equal(indices[..., 0], self.mesh[1])
+
+if __name__ == '__main__':
+    unittest.main()
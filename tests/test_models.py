@@ -0,0 +1,62 @@
+# tests/test_models.py
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from gazebo_world_gen.models import DEFAULT_MODELS, ModelSpec, generate_models, is_up_to_date, model_config
+
+class TestModels(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_import_has_no_side_effects(self):
+        code = "import sys, gazebo_world_gen.models; print('numpy' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=self.output_dir, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_builds_once(self):
+        self.assertEqual(generate_models(self.output_dir), [spec.name for spec in DEFAULT_MODELS])
+        for name in ("model.config", "model.sdf", "meshes/cone.dae", "meshes/cone_lod0.dae"):
+            self.assertTrue(os.path.exists(os.path.join(self.output_dir, "cone", name)))
+        self.assertEqual(generate_models(self.output_dir), [])
+        self.assertEqual(generate_models(self.output_dir, force=True), [spec.name for spec in DEFAULT_MODELS])
+
+    def test_rebuilds_changed_or_missing(self):
+        spec = ModelSpec("red_cone", "cone", (1.0, 2.0), {"sections": 8}, color='1 0 0 1')
+        generate_models(self.output_dir, [spec])
+        self.assertTrue(is_up_to_date(spec, self.output_dir))
+        changed = ModelSpec("red_cone", "cone", (1.0, 2.0), {"sections": 16}, color='1 0 0 1')
+        self.assertFalse(is_up_to_date(changed, self.output_dir))
+        os.remove(os.path.join(self.output_dir, "red_cone", "meshes", "red_cone.dae"))
+        self.assertEqual(generate_models(self.output_dir, [spec]), ["red_cone"])
+        self.assertTrue(is_up_to_date(spec, self.output_dir))
+
+    def test_parallel_matches_serial(self):
+        serial, parallel = os.path.join(self.output_dir, "serial"), os.path.join(self.output_dir, "parallel")
+        generate_models(serial)
+        generate_models(parallel, workers=2)
+        for spec in DEFAULT_MODELS:
+            for name in ("model.sdf", f"meshes/{spec.name}.dae"):
+                with open(os.path.join(serial, spec.name, name), "rb") as a, open(os.path.join(parallel, spec.name, name), "rb") as b:
+                    self.assertEqual(a.read(), b.read())
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            ModelSpec("torus", "torus", (1, 1))
+
+    def test_model_config(self):
+        with_author, without = ET.fromstring(model_config("crate")), ET.fromstring(model_config("crate", author=False))
+        self.assertEqual(with_author.findtext("author/name"), "Your Name")
+        self.assertIsNone(without.find("author"))
+        self.assertEqual([e.tag for e in without], ["name", "version", "sdf", "description"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# tests/test_naming.py
+
+import unittest
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.naming import CounterNaming, HashNaming, UUIDNaming
+from gazebo_world_gen.shapes import Box, Sphere
+from gazebo_world_gen.world import World
+
+def build_world(naming):
+    world = World(naming=naming)
+    for i in range(5):
+        world.add_object(Box(width=1, height=1, depth=1, x=i))
+        world.add_object(Sphere(radius=0.5))
+    world.add_object(ShapeBatch(Box, [[1, 2, 3]] * 3))
+    return world
+
+class TestNaming(unittest.TestCase):
+    def test_counter_naming(self):
+        world = build_world(CounterNaming())
+        names = [obj.name for obj in world.get_objects()]
+        self.assertEqual(names[:3], ["box_0", "sphere_1", "box_2"])
+        self.assertEqual(names[-1], "box_batch_10")
+
+    def test_deterministic_strategies_reproduce_output(self):
+        for strategy in (CounterNaming, HashNaming):
+            first = build_world(strategy()).get_gz_xml()
+            second = build_world(strategy()).get_gz_xml()
+            self.assertEqual(first, second, strategy.__name__)
+
+    def test_hash_naming_is_unique_and_seeded(self):
+        names = [obj.name for obj in build_world(HashNaming()).get_objects()]
+        self.assertEqual(len(set(names)), len(names))
+        self.assertNotEqual(HashNaming(seed=1)(Box(1, 1, 1)), HashNaming(seed=2)(Box(1, 1, 1)))
+
+    def test_uuid_naming_is_default_and_lazy(self):
+        box = Box(width=1, height=1, depth=1)
+        self.assertIsNone(box._name)
+        self.assertTrue(box.name.startswith("box_"))
+        self.assertNotEqual(box.name, Box(1, 1, 1).name)
+        self.assertTrue(UUIDNaming()(box).startswith("box_"))
+
+    def test_explicit_names_are_kept(self):
+        box = Box(width=1, height=1, depth=1)
+        box.name = "crate"
+        world = World(naming=CounterNaming())
+        world.add_object(box)
+        self.assertEqual(box.name, "crate")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+# tests/test_render.py
+
+import unittest
+import numpy as np
+from gazebo_world_gen.render import compile_template, format_column, render_columns, template_fields
+from gazebo_world_gen.shapes import Box, Sphere, Cylinder, Ellipsoid, Tetrahedron, SquarePyramid, Cone
+
+class DoubledSphere(Sphere):
+    def get_geometry_xml(self):
+        return f"<geometry><sphere><radius>{self.radius * 2}</radius></sphere></geometry>"
+
+class TestRender(unittest.TestCase):
+    def test_templates_match_get_gz_xml(self):
+        shapes = [
+            Box(width=1, height=2, depth=3, x=0.5, color='1 0 0 1'),
+            Sphere(radius=0.25, z=-1),
+            Cylinder(radius=1, length=2),
+            Ellipsoid(radius_x=1, radius_y=2, radius_z=3),
+            Tetrahedron(width=1, depth=1, height=1),
+            SquarePyramid(width=1, depth=1, height=1),
+            Cone(radius=1, height=2, roll=0.1),
+        ]
+        for shape in shapes:
+            columns = [[str(getattr(shape, field))] for field in template_fields(type(shape))]
+            self.assertEqual(render_columns(type(shape), columns), [shape.get_gz_xml()])
+
+    def test_computed_geometry_falls_back(self):
+        self.assertIsNone(compile_template(DoubledSphere))
+        with self.assertRaises(ValueError):
+            render_columns(DoubledSphere, [])
+
+    def test_format_column(self):
+        values = np.array([0.1, 0.1, -0.0, 0.0, 1e-7, 1.0, 2.5, 2.5])
+        self.assertEqual(format_column(values), [str(v) for v in values.tolist()])
+        self.assertEqual(format_column(np.array([1.0, 2.0])), ['1.0', '2.0'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_scatter.py
+
+import math
+import unittest
+import numpy as np
+from gazebo_world_gen.scatter import footprint_radius, poisson_disk_sample, scatter_shapes
+from gazebo_world_gen.shapes import Box, Cylinder, Sphere
+from gazebo_world_gen.world import World
+
+def min_distance(points):
+    diff = points[:, None, :] - points[None, :, :]
+    dist = np.sqrt((diff ** 2).sum(-1))
+    np.fill_diagonal(dist, np.inf)
+    return dist.min()
+
+class TestPoissonDisk(unittest.TestCase):
+    def test_spacing_and_region(self):
+        points = poisson_disk_sample((0, 0, 20, 10), 1.0, np.random.default_rng(0))
+        self.assertGreater(len(points), 100)
+        self.assertGreaterEqual(min_distance(points), 1.0)
+        self.assertTrue(((points >= 0) & (points <= (20, 10))).all())
+
+    def test_max_points(self):
+        points = poisson_disk_sample((0, 0, 20, 20), 1.0, np.random.default_rng(0), max_points=50)
+        self.assertEqual(len(points), 50)
+
+    def test_deterministic(self):
+        a = poisson_disk_sample((0, 0, 5, 5), 0.5, np.random.default_rng(3))
+        b = poisson_disk_sample((0, 0, 5, 5), 0.5, np.random.default_rng(3))
+        np.testing.assert_array_equal(a, b)
+
+class TestScatter(unittest.TestCase):
+    def test_footprint_radius(self):
+        self.assertAlmostEqual(footprint_radius(Box(width=2, height=4, depth=1, x=3)), math.hypot(1, 2))
+        self.assertAlmostEqual(footprint_radius(Sphere(radius=0.5, y=-2)), math.hypot(0.5, 0.5))
+
+    def test_prototype(self):
+        result = scatter_shapes(Box(width=1, height=1, depth=1, z=0.5), (0, 0, 30, 30), 100, min_spacing=0.2, seed=1)
+        self.assertEqual(result.placed, 100)
+        self.assertEqual(len({id(s) for s in result.shapes}), 100)
+        self.assertEqual(len({s.name for s in result.shapes}), 100)
+        points = np.array([(s.x, s.y) for s in result.shapes])
+        self.assertGreaterEqual(min_distance(points), result.spacing)
+        self.assertAlmostEqual(result.density, 100 / 900)
+
+    def test_factory_and_shortfall(self):
+        def factory(rng):
+            return Cylinder(radius=rng.uniform(0.2, 0.5), length=1, yaw=rng.uniform(0, math.pi))
+        result = scatter_shapes(factory, (0, 0, 5, 5), 1000, seed=2)
+        self.assertLess(result.placed, 1000)
+        for shape in result.shapes:
+            lower, upper = shape.get_aabb()
+            self.assertTrue(lower[0] >= 0 and lower[1] >= 0 and upper[0] <= 5 and upper[1] <= 5)
+
+    def test_world_avoids_indexed_objects(self):
+        world = World()
+        world.enable_spatial_index()
+        obstacle = Box(width=10, height=10, depth=1, x=5, y=5, z=0.5)
+        world.add_object(obstacle)
+        result = world.scatter(Sphere(radius=0.25, z=0.5), (0, 0, 20, 20), 200, seed=0)
+        self.assertEqual(result.placed, 200)
+        self.assertEqual(len(world.objects), result.placed + 1)
+        for shape in result.shapes:
+            self.assertFalse(world.spatial_index.would_overlap(shape))
+
+if __name__ == '__main__':
+    unittest.main()
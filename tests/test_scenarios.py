@@ -0,0 +1,73 @@
+# tests/test_scenarios.py
+
+import json
+import os
+import tempfile
+import unittest
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.scenarios import Choice, Normal, ScenarioSpec, Uniform, generate_scenarios
+from gazebo_world_gen.shapes import Box, Cylinder
+from gazebo_world_gen.world import World
+
+def make_base():
+    world = World(naming=CounterNaming())
+    world.add_object(Box(width=10, height=10, depth=0.1, color='0.2 0.2 0.2 1'))
+    for i in range(5):
+        world.add_object(Cylinder(radius=0.3, length=2, x=i))
+    world.add_object(ShapeBatch(Box, [[1, 1, 1]] * 4))
+    return world
+
+def make_spec():
+    return ScenarioSpec(
+        pose={"x": Uniform(-5, 5), "y": Uniform(-5, 5)},
+        pose_offset={"yaw": Normal(0, 0.1)},
+        dimensions={"radius": Uniform(0.1, 0.5)},
+        color=Choice(['1 0 0 1', '0 1 0 1']),
+        settings={"gravity": Uniform((0, 0, -10), (0, 0, -9)), "physics.max_step_size": Choice([0.001, 0.002])},
+        select=lambda obj: not (isinstance(obj, Box) and obj.width == 10),
+    )
+
+class TestScenarios(unittest.TestCase):
+    def test_apply_is_reproducible(self):
+        base, spec = make_base(), make_spec()
+        first = spec.apply(base, 7)
+        self.assertEqual(first.get_gz_xml(), spec.apply(base, 7).get_gz_xml())
+        self.assertNotEqual(first.get_gz_xml(), spec.apply(base, 8).get_gz_xml())
+        self.assertIs(first.get_objects()[0], base.get_objects()[0])
+        self.assertIn(first.settings["physics"]["max_step_size"], (0.001, 0.002))
+        self.assertEqual(len(first.settings["gravity"]), 3)
+        self.assertEqual(base.settings["physics"]["max_step_size"], 0.001)
+
+    def test_generate_scenarios(self):
+        base, spec = make_base(), make_spec()
+        with tempfile.TemporaryDirectory() as tmp:
+            serial = generate_scenarios(base, spec, 4, os.path.join(tmp, "serial"), seed=3)
+            parallel = generate_scenarios(base, spec, 4, os.path.join(tmp, "parallel"), seed=3, workers=2)
+            self.assertEqual(serial, parallel)
+            with open(os.path.join(tmp, "serial", "manifest.json")) as f:
+                self.assertEqual(json.load(f)["scenarios"], serial)
+            for entry in serial:
+                with open(os.path.join(tmp, "serial", entry["filename"])) as a, open(os.path.join(tmp, "parallel", entry["filename"])) as b:
+                    xml = a.read()
+                    self.assertEqual(xml, b.read())
+                self.assertEqual(xml, spec.apply(base, entry["seed"]).get_gz_xml())
+                self.assertIn(base.get_objects()[0].get_gz_xml(), xml)
+
+    def test_variants_keep_configuration(self):
+        base, spec = make_base(), make_spec()
+        with tempfile.TemporaryDirectory() as tmp:
+            base.enable_instancing(os.path.join(tmp, "models"))
+            base.enable_collision_simplification(tolerance=0.1)
+            variant = spec.apply(base, 1)
+            self.assertIs(variant.naming, base.naming)
+            self.assertEqual(variant.instancing.models_dir, base.instancing.models_dir)
+            self.assertEqual(variant.collision_simplifier.tolerance, 0.1)
+            (entry,) = generate_scenarios(base, spec, 1, os.path.join(tmp, "out"), seed=5)
+            with open(os.path.join(tmp, "out", entry["filename"])) as f:
+                xml = f.read()
+            self.assertIn("<include>", xml)
+            self.assertEqual(xml, spec.apply(base, entry["seed"]).get_gz_xml())
+
+if __name__ == '__main__':
+    unittest.main()
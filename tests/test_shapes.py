@@ -1,21 +1,21 @@
 # tests/test_shapes.py
 
 import unittest
-from gazebo_world_gen.shapes import Polygon, Circle, Rectangle
+from gazebo_world_gen.shapes import Box, Sphere, Cylinder
 
 class TestShapes(unittest.TestCase):
-    def test_polygon(self):
-        polygon = Polygon(points=[(0,0), (1,0), (1,1), (0,1)])
-        self.assertEqual(len(polygon.points), 4)
+    def test_box(self):
+        box = Box(width=4, height=2, depth=1)
+        self.assertEqual((box.width, box.height, box.depth), (4, 2, 1))
 
-    def test_circle(self):
-        circle = Circle(radius=5)
-        self.assertEqual(circle.radius, 5)
+    def test_sphere(self):
+        sphere = Sphere(radius=5)
+        self.assertEqual(sphere.radius, 5)
 
-    def test_rectangle(self):
-        rectangle = Rectangle(width=4, height=2)
-        self.assertEqual(rectangle.width, 4)
-        self.assertEqual(rectangle.height, 2)
+    def test_cylinder(self):
+        cylinder = Cylinder(radius=4, length=2)
+        self.assertEqual(cylinder.radius, 4)
+        self.assertEqual(cylinder.length, 2)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,94 @@
+# tests/test_snapshot.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.group import ShapeGroup
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Cone, Cylinder, Sphere
+from gazebo_world_gen.snapshot import SNAPSHOT_MAGIC, open_snapshot
+from gazebo_world_gen.world import PhysicsEngine, World
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "world.snap")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_world(self):
+        world = World("snapshot", naming=CounterNaming())
+        world.set_physics(PhysicsEngine.BULLET, max_step_size=0.002)
+        world.set_gravity((0, 0, -9.81))
+        world.add_objects([Box(1, 2, 3, x=1, color='1 0 0 1'), Sphere(0.5, y=0.25), Cylinder(1, 2.5, roll=0.2),
+                           Cone(1, 3, yaw=0.3), Box(0.5, 0.5, 0.5, z=2.0)])
+        world.add_object(ShapeBatch(Box, np.ones((3, 3)), np.arange(18.0).reshape(3, 6), name="batch"))
+        world.add_object(ShapeGroup([Sphere(1, x=1)], x=5, yaw=0.5))
+        return world
+
+    def test_round_trip(self):
+        world = self.make_world()
+        world.save_snapshot(self.filename)
+        loaded = World.load_snapshot(self.filename)
+        self.assertEqual(loaded.name, "snapshot")
+        self.assertEqual(loaded.settings, world.settings)
+        self.assertEqual(loaded.get_gz_xml(), world.get_gz_xml())
+
+    def test_ints_and_floats_are_kept(self):
+        world = World(naming=CounterNaming())
+        world.add_objects([Box(1, 2.0, 3, x=1.0, y=2), Box(0.5, 1, 1.5, z=-3)])
+        world.save_snapshot(self.filename)
+        loaded = list(World.load_snapshot(self.filename).objects)
+        self.assertEqual([(type(b.width), type(b.height), type(b.x), type(b.y)) for b in loaded[:1]],
+                         [(int, float, float, int)])
+        self.assertEqual(loaded[1].z, -3)
+        self.assertIsInstance(loaded[1].z, int)
+
+    def test_numpy_scalars_export_the_same(self):
+        world = World(naming=CounterNaming())
+        world.add_objects([Box(np.int64(2), np.float64(1.5), np.float32(0.1), x=np.int32(-4)), Box(1, 1, True)])
+        world.save_snapshot(self.filename)
+        loaded = World.load_snapshot(self.filename)
+        self.assertEqual(loaded.get_gz_xml(), world.get_gz_xml())
+
+    def test_shape_settings_are_kept(self):
+        cone = Cone(1, 2)
+        cone.visual_lod = 2
+        cone.collision = "primitive"
+        world = World(naming=CounterNaming())
+        world.add_object(cone)
+        world.save_snapshot(self.filename)
+        loaded = list(World.load_snapshot(self.filename).objects)[0]
+        self.assertEqual((loaded.visual_lod, loaded.collision), (2, "primitive"))
+        self.assertEqual(loaded.get_gz_xml(), cone.get_gz_xml())
+
+    def test_columns_without_loading(self):
+        self.make_world().save_snapshot(self.filename)
+        snapshot = open_snapshot(self.filename)
+        self.assertEqual(len(snapshot), 7)
+        boxes = snapshot.tables[0]
+        self.assertIs(boxes.shape_cls, Box)
+        np.testing.assert_array_equal(boxes.dimensions, [[1, 2, 3], [0.5, 0.5, 0.5]])
+        self.assertEqual(boxes.names(), ["box_0", "box_4"])
+        batch = snapshot.batch(0)
+        self.assertEqual(batch.poses.shape, (3, 6))
+        with self.assertRaises(ValueError):
+            batch.poses[0, 0] = 1
+        copied = [obj for obj in snapshot.iter_objects() if isinstance(obj, ShapeBatch)][0]
+        copied.poses[0, 0] = 1
+
+    def test_rejects_other_files(self):
+        with open(self.filename, "wb") as f:
+            f.write(b"not a snapshot at all")
+        with self.assertRaises(ValueError):
+            open_snapshot(self.filename)
+        with open(self.filename, "wb") as f:
+            f.write(SNAPSHOT_MAGIC + (99).to_bytes(4, "little") + bytes(8))
+        with self.assertRaisesRegex(ValueError, "version 99"):
+            open_snapshot(self.filename)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_spatial.py
+
+import math
+import unittest
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.shapes import Box, Cone, Sphere
+from gazebo_world_gen.spatial import SpatialIndex
+from gazebo_world_gen.world import World
+
+class TestBounds(unittest.TestCase):
+    def test_rotated_box(self):
+        lower, upper = Box(width=2, height=1, depth=1, x=5, yaw=math.pi / 2).get_aabb()
+        np.testing.assert_allclose(lower, (4.5, -1, -0.5), atol=1e-12)
+        np.testing.assert_allclose(upper, (5.5, 1, 0.5), atol=1e-12)
+
+    def test_cone_base_at_origin(self):
+        lower, upper = Cone(radius=1, height=3, z=1).get_aabb()
+        self.assertEqual(lower, (-1, -1, 1))
+        self.assertEqual(upper, (1, 1, 4))
+
+    def test_batch_matches_shapes(self):
+        rng = np.random.default_rng(1)
+        batch = ShapeBatch(Box, rng.uniform(0.1, 2, (20, 3)), rng.uniform(-3, 3, (20, 6)))
+        lower, upper = batch.get_aabbs()
+        for i, shape in enumerate(batch):
+            np.testing.assert_allclose(shape.get_aabb(), (lower[i], upper[i]))
+
+class TestSpatialIndex(unittest.TestCase):
+    def setUp(self):
+        self.world = World()
+        self.index = self.world.enable_spatial_index(cell_size=2.0)
+        self.boxes = [Box(width=1, height=1, depth=1, x=3 * i, y=3 * j) for i in range(10) for j in range(10)]
+        self.world.add_objects(self.boxes)
+
+    def test_query_aabb(self):
+        found = self.index.query_aabb((-0.1, -0.1, -1), (3.1, 0.1, 1))
+        self.assertEqual({(b.x, b.y) for b in found}, {(0, 0), (3, 0)})
+
+    def test_query_radius_and_nearest(self):
+        found = self.index.query_radius((6, 6, 0), 2.6)
+        self.assertEqual({(b.x, b.y) for b in found}, {(6, 6), (3, 6), (9, 6), (6, 3), (6, 9)})
+        nearest = self.index.nearest((8.2, 8.1, 0), k=3)
+        self.assertEqual((nearest[0].x, nearest[0].y), (9, 9))
+        self.assertEqual(len(nearest), 3)
+        far = self.index.nearest((200, 200, 0))
+        self.assertEqual((far[0].x, far[0].y), (27, 27))
+
+    def test_would_overlap_and_removal(self):
+        probe = Sphere(radius=0.4, x=3.8, y=0)
+        self.assertTrue(self.index.would_overlap(probe))
+        self.world.remove_object(self.boxes[10])
+        self.assertFalse(self.index.would_overlap(probe))
+        self.assertFalse(self.index.would_overlap(Sphere(radius=0.4, x=1.5, y=1.5)))
+        self.assertTrue(self.index.would_overlap(Sphere(radius=0.4, x=1.5, y=1.5), margin=0.7))
+
+    def test_large_objects_and_batches(self):
+        ground = Box(width=1000, height=1000, depth=0.1, z=-1)
+        self.world.add_object(ground)
+        self.assertIn(ground, self.index.query_aabb((450, 450, -2), (451, 451, 0)))
+        batch = ShapeBatch(Sphere, [[0.5], [0.5]], [[100, 0, 0, 0, 0, 0], [200, 0, 0, 0, 0, 0]])
+        self.world.add_object(batch)
+        self.assertEqual(self.index.query_radius((200, 0, 0), 0.1), [(batch, 1)])
+        self.world.remove_object(batch)
+        self.assertEqual(self.index.query_radius((200, 0, 0), 0.1), [])
+
+    def test_update_after_move(self):
+        box = self.boxes[0]
+        box.x = 100
+        self.index.update(box)
+        self.assertEqual(self.index.query_radius((100, 0, 0), 0.1), [box])
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(2)
+        index = SpatialIndex(cell_size=1.5)
+        shapes = [Box(*rng.uniform(0.2, 3, 3), *rng.uniform(-20, 20, 3), *rng.uniform(-3, 3, 3)) for _ in range(300)]
+        for shape in shapes:
+            index.insert(shape)
+        for _ in range(20):
+            lower = rng.uniform(-20, 15, 3)
+            upper = lower + rng.uniform(0, 8, 3)
+            expected = {id(s) for s in shapes if all(l < u2 and l2 < u for l, u, l2, u2 in zip(*s.get_aabb(), lower, upper))}
+            self.assertEqual({id(s) for s in index.query_aabb(lower, upper)}, expected)
+            point = rng.uniform(-25, 25, 3)
+            distances = sorted(np.linalg.norm(np.maximum(np.maximum(np.array(s.get_aabb()[0]) - point, point - np.array(s.get_aabb()[1])), 0)) for s in shapes)
+            nearest = index.nearest(point, k=4)
+            got = [np.linalg.norm(np.maximum(np.maximum(np.array(s.get_aabb()[0]) - point, point - np.array(s.get_aabb()[1])), 0)) for s in nearest]
+            np.testing.assert_allclose(got, distances[:4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# tests/test_store.py
+
+import unittest
+from gazebo_world_gen.naming import CounterNaming
+from gazebo_world_gen.shapes import Box, Sphere
+from gazebo_world_gen.world import World
+
+class TestObjectStore(unittest.TestCase):
+    def setUp(self):
+        self.world = World(naming=CounterNaming())
+        self.shapes = [Box(width=1, height=1, depth=1, x=i) for i in range(10)]
+        self.world.add_objects(self.shapes)
+
+    def test_lookup_by_name(self):
+        self.assertIs(self.world.get_object("box_3"), self.shapes[3])
+        self.assertIsNone(self.world.get_object("box_42"))
+        sphere = Sphere(radius=1)
+        self.world.add_object(sphere)
+        self.assertIs(self.world.get_object("sphere_10"), sphere)
+
+    def test_remove_keeps_order(self):
+        self.world.remove_objects(self.shapes[2:8:2])
+        self.assertEqual([s.x for s in self.world.get_objects()], [0, 1, 3, 5, 7, 8, 9])
+        self.assertNotIn(self.shapes[2], self.world.get_objects())
+        self.assertIsNone(self.world.get_object("box_2"))
+        xml = self.world.get_gz_xml()
+        self.assertLess(xml.index('"box_1"'), xml.index('"box_3"'))
+
+    def test_remove_missing_and_duplicate_add(self):
+        with self.assertRaises(ValueError):
+            self.world.remove_object(Box(1, 1, 1))
+        with self.assertRaises(ValueError):
+            self.world.add_object(self.shapes[0])
+
+    def test_renamed_object(self):
+        self.assertIs(self.world.get_object("box_0"), self.shapes[0])
+        self.shapes[0].name = "crate"
+        self.assertIsNone(self.world.get_object("box_0"))
+        self.world.objects.reindex()
+        self.assertIs(self.world.get_object("crate"), self.shapes[0])
+
+    def test_list_compatibility(self):
+        objects = self.world.objects
+        sphere = Sphere(radius=1)
+        sphere.name = "ball"
+        objects.append(sphere)
+        self.assertIs(objects[0], self.shapes[0])
+        self.assertIs(objects[-1], sphere)
+        self.assertEqual(objects[8:10], self.shapes[8:])
+        with self.assertRaises(IndexError):
+            objects[11]
+        objects.remove(self.shapes[0])
+        self.assertIs(objects[0], self.shapes[1])
+        self.assertIn('"ball"', self.world.get_gz_xml())
+
+if __name__ == '__main__':
+    unittest.main()
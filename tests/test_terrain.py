@@ -0,0 +1,122 @@
+# tests/test_terrain.py
+
+import os
+import struct
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import zlib
+import numpy as np
+from gazebo_world_gen.batch import ShapeBatch
+from gazebo_world_gen.shapes import Box, Cone
+from gazebo_world_gen.terrain import Heightmap, heightmap_size, write_png16
+from gazebo_world_gen.world import World
+
+def read_png16(filename):
+    with open(filename, "rb") as f:
+        data = f.read()[8:]
+    chunks, idat = {}, b""
+    while data:
+        length, kind = struct.unpack(">I4s", data[:8])
+        body = data[8:8 + length]
+        if kind == b"IDAT":
+            idat += body
+        chunks[kind] = body
+        data = data[12 + length:]
+    width, height = struct.unpack(">II", chunks[b"IHDR"][:8])
+    rows = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, 1 + 2 * width)
+    return rows[:, 1:].copy().view(">u2")
+
+class TestHeightmap(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.image_dir = os.path.join(self.tmp.name, "terrain")
+        rng = np.random.default_rng(0)
+        self.heights = rng.uniform(0, 10, (7, 11)).astype(np.float32)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_png_round_trip(self):
+        filename = os.path.join(self.tmp.name, "image.png")
+        image = np.arange(5 * 3, dtype=np.uint16).reshape(5, 3) * 4000
+        write_png16(filename, 3, 5, [image[:2], image[2:]])
+        np.testing.assert_array_equal(read_png16(filename), image)
+
+    def test_heightmap_size(self):
+        self.assertEqual([heightmap_size(n) for n in (2, 3, 4, 5, 6, 8193)], [3, 3, 5, 5, 9, 8193])
+
+    def test_single_tile(self):
+        terrain = Heightmap(self.heights, size=(20, 12), position=(1, 2, 3), image_dir=self.image_dir)
+        model = ET.fromstring(terrain.get_gz_xml())
+        heightmap = model.find("link/collision/geometry/heightmap")
+        low, high = float(self.heights.min()), float(self.heights.max())
+        self.assertEqual(heightmap.findtext("size").split(), ["32.0", "32.0", str(high - low)])
+        self.assertEqual(heightmap.findtext("pos"), f"0 0 {low}")
+        # The 17 x 17 image starts at the terrain's -x, +y corner
+        self.assertEqual(model.findtext("pose"), "7.0 -8.0 3 0 0 0")
+        image = read_png16(heightmap.findtext("uri")[len("file://"):])
+        self.assertEqual(image.shape, (17, 17))
+        expected = np.rint((self.heights - low) * 65535 / (high - low))
+        np.testing.assert_array_equal(image[:7, :11], expected)
+        np.testing.assert_array_equal(image[10, :11], expected[-1])
+
+    def test_tiles(self):
+        terrain = Heightmap(self.heights, image_dir=self.image_dir, tile_size=5)
+        tiles = terrain.tiles()
+        self.assertEqual([(t.name, t.row, t.col) for t in tiles],
+                         [("terrain_0_0", 0, 0), ("terrain_0_1", 0, 4), ("terrain_0_2", 0, 8),
+                          ("terrain_1_0", 4, 0), ("terrain_1_1", 4, 4), ("terrain_1_2", 4, 8)])
+        world = World()
+        world.add_object(terrain)
+        models = ET.fromstring(world.get_gz_xml()).findall("world/model")
+        self.assertEqual(len(models), 6)
+        self.assertEqual(models[4].findtext("pose"), "1.0 -3.0 0 0 0 0")
+        self.assertEqual(len(os.listdir(self.image_dir)), 6)
+
+    def test_images_written_by_world_writer(self):
+        world = World()
+        terrain = Heightmap(self.heights, image_dir=self.image_dir, tile_size=5)
+        world.add_object(terrain)
+        self.assertIs(terrain.writer, world.asset_writer)
+        world.save_gz_world(os.path.join(self.tmp.name, "world.sdf"))
+        self.assertEqual(world.asset_writer.stats()["files"], 6)
+        self.assertEqual(sorted(os.listdir(self.image_dir)), sorted(f"{t.name}.png" for t in terrain.tiles()))
+        with self.assertRaises(ValueError):
+            Heightmap(self.heights, tile_size=6)
+
+    def test_height_at(self):
+        terrain = Heightmap(self.heights, size=(20, 12), position=(0, 0, 1))
+        # Sample (row 2, col 3) sits at x = -10 + 3 * 2, y = 6 - 2 * 2
+        self.assertAlmostEqual(float(terrain.height_at(-4, 2)), self.heights[2, 3] + 1, places=5)
+        between = terrain.height_at(-3, 1)
+        corners = self.heights[2:4, 3:5].astype(np.float64)
+        self.assertAlmostEqual(float(between), corners.mean() + 1, places=5)
+        heights = terrain.height_at(np.array([-10, 10, 11]), np.array([6, -6, 0]))
+        np.testing.assert_allclose(heights[:2], [self.heights[0, 0] + 1, self.heights[-1, -1] + 1], rtol=1e-6)
+        self.assertTrue(np.isnan(heights[2]))
+
+    def test_memory_mapped(self):
+        path = os.path.join(self.tmp.name, "heights.npy")
+        np.save(path, self.heights)
+        terrain = Heightmap(path, image_dir=self.image_dir)
+        self.assertIsInstance(terrain.heights, np.memmap)
+        self.assertEqual(terrain.height_range(), (float(self.heights.min()), float(self.heights.max())))
+
+    def test_drop(self):
+        terrain = Heightmap(np.full((5, 5), 2.0, dtype=np.float32))
+        cone, box, away = Cone(1, 2, x=1, z=10), Box(1, 1, 1, y=-1), Box(1, 1, 1, x=100, z=7)
+        batch = ShapeBatch(Box, [[1, 1, 2]], [[0, 0, 5, 0, 0, 0]])
+        terrain.drop([cone, box, away, batch])
+        self.assertEqual((cone.z, box.z, away.z), (2.0, 2.5, 7))
+        self.assertEqual(batch.poses[0, 2], 3.0)
+
+    def test_scatter_onto_terrain(self):
+        terrain = Heightmap(np.linspace(0, 4, 25, dtype=np.float32).reshape(5, 5))
+        world = World()
+        result = world.scatter(Box(0.2, 0.2, 0.2), (-2, -2, 2, 2), 10, seed=0, terrain=terrain)
+        for shape in result.shapes:
+            self.assertAlmostEqual(shape.z - 0.1, float(terrain.height_at(shape.x, shape.y)))
+
+if __name__ == '__main__':
+    unittest.main()
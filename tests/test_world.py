@@ -2,21 +2,21 @@
 
 import unittest
 from gazebo_world_gen.world import World
-from gazebo_world_gen.shapes import Circle
+from gazebo_world_gen.shapes import Sphere
 
 class TestWorld(unittest.TestCase):
     def test_add_object(self):
         world = World()
-        circle = Circle(radius=5)
-        world.add_object(circle)
-        self.assertIn(circle, world.get_objects())
+        sphere = Sphere(radius=5)
+        world.add_object(sphere)
+        self.assertIn(sphere, world.get_objects())
 
     def test_remove_object(self):
         world = World()
-        circle = Circle(radius=5)
-        world.add_object(circle)
-        world.remove_object(circle)
-        self.assertNotIn(circle, world.get_objects())
+        sphere = Sphere(radius=5)
+        world.add_object(sphere)
+        world.remove_object(sphere)
+        self.assertNotIn(sphere, world.get_objects())
 
 if __name__ == '__main__':
     unittest.main()